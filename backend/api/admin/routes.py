@@ -1,6 +1,15 @@
-from flask import Blueprint, request, jsonify
+import concurrent.futures
+import os
+from datetime import datetime
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from db.connection import get_connection
-from services.translation_service import translate_to_hindi
+from services.aggregation_service import AggregationService
+from services.export_service import EXPORT_FORMATS, EXPORT_TABLES, HistoryExporter, parse_date
+from services.job_queue import get_job_queue
+from services.monitoring_control import get_monitoring_events
+from services.translation_service import get_translation_service
+from services.translation_worker import get_translation_worker
+from api.auth.decorators import token_required
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -13,8 +22,10 @@ def translate_question():
         english_text = data.get('question_text', '')
         if not english_text:
             return jsonify({'error': 'No question_text provided'}), 400
-        hindi_text = translate_to_hindi(english_text)
+        hindi_text = get_translation_worker().translate(english_text, src='en', dest='hi')
         return jsonify({'hindi_text': hindi_text}), 200
+    except concurrent.futures.TimeoutError:
+        return jsonify({'error': 'Translation timed out'}), 504
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -26,9 +37,25 @@ def translate_answer():
         hindi_text = data.get('answer_text', '')
         if not hindi_text:
             return jsonify({'error': 'No answer_text provided'}), 400
-        from services.translation_service import translate_to_english
-        english_text = translate_to_english(hindi_text)
+        english_text = get_translation_worker().translate(hindi_text, src='hi', dest='en')
         return jsonify({'english_text': english_text}), 200
+    except concurrent.futures.TimeoutError:
+        return jsonify({'error': 'Translation timed out'}), 504
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Batch translation endpoint (only uncached texts reach the translation backend)
+@admin_bp.route('/translate-batch', methods=['POST'])
+def translate_batch():
+    try:
+        data = request.json
+        texts = data.get('texts', [])
+        src = data.get('src', 'en')
+        dest = data.get('dest', 'hi')
+        if not texts or not isinstance(texts, list):
+            return jsonify({'error': 'No texts provided'}), 400
+        translations = get_translation_service().translate_batch(texts, src=src, dest=dest)
+        return jsonify({'translations': translations}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 from flask import Blueprint, request, jsonify
@@ -110,3 +137,102 @@ def add_question():
     finally:
         cursor.close()
         db.close()
+
+
+# Dashboard summaries (read from the materialized summary tables, keyset-paginated)
+@admin_bp.route('/summaries/soldiers/<force_id>/weekly', methods=['GET'])
+@token_required(roles=['admin'])
+def soldier_weekly_summary(force_id):
+    try:
+        before = request.args.get('before', type=int)
+        limit = min(request.args.get('limit', 12, type=int), 200)
+        return jsonify(AggregationService().get_soldier_weekly(force_id, before, limit)), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@admin_bp.route('/summaries/weekly/<int:year_week>', methods=['GET'])
+@token_required(roles=['admin'])
+def weekly_overview(year_week):
+    try:
+        after = request.args.get('after', '')
+        limit = min(request.args.get('limit', 50, type=int), 500)
+        return jsonify(AggregationService().get_weekly_overview(year_week, after, limit)), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@admin_bp.route('/summaries/daily', methods=['GET'])
+@token_required(roles=['admin'])
+def unit_daily_summary():
+    try:
+        before = request.args.get('before')
+        before_date = datetime.strptime(before, '%Y-%m-%d').date() if before else None
+        limit = min(request.args.get('limit', 30, type=int), 366)
+        return jsonify(AggregationService().get_unit_daily(before_date, limit)), 200
+    except ValueError:
+        return jsonify({"error": "before must be YYYY-MM-DD"}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# History exports for offline analytics
+@admin_bp.route('/exports', methods=['POST'])
+@token_required(roles=['admin'])
+def create_export():
+    """Export tables to date-partitioned columnar files as a background job"""
+    data = request.json or {}
+    tables = data.get('tables') or list(EXPORT_TABLES)
+    fmt = data.get('format', 'parquet')
+    if any(table not in EXPORT_TABLES for table in tables):
+        return jsonify({"error": f"tables must be among {list(EXPORT_TABLES)}"}), 400
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"format must be one of {list(EXPORT_FORMATS)}"}), 400
+    try:
+        parse_date(data.get('start'))
+        parse_date(data.get('end'))
+    except ValueError:
+        return jsonify({"error": "start and end must be YYYY-MM-DD"}), 400
+
+    output_dir = os.path.join('storage', 'exports', datetime.now().strftime('%Y%m%d-%H%M%S'))
+    job_id = get_job_queue().enqueue('export_history', {
+        'tables': tables,
+        'format': fmt,
+        'start': data.get('start'),
+        'end': data.get('end'),
+        'output_dir': output_dir
+    })
+    return jsonify({"job_id": job_id, "output_dir": output_dir}), 202
+
+@admin_bp.route('/exports/<table>/stream', methods=['GET'])
+@token_required(roles=['admin'])
+def stream_export(table):
+    """Stream a table as a compressed Arrow IPC stream"""
+    if table not in EXPORT_TABLES:
+        return jsonify({"error": "Unknown table"}), 404
+    try:
+        start = parse_date(request.args.get('start'))
+        end = parse_date(request.args.get('end'))
+    except ValueError:
+        return jsonify({"error": "start and end must be YYYY-MM-DD"}), 400
+    return Response(
+        stream_with_context(HistoryExporter().stream_ipc(table, start, end)),
+        mimetype='application/vnd.apache.arrow.stream',
+        headers={'Content-Disposition': f'attachment; filename={table}.arrows'}
+    )
+
+
+@admin_bp.route('/monitoring/events', methods=['GET'])
+@token_required(roles=['admin'])
+def monitoring_events():
+    """
+    Live monitoring events as Server-Sent Events, in batches every 250 ms:
+    detections, stored 3-second averages and monitoring start/stop. The
+    token goes in the Authorization header, so read the stream with fetch()
+    rather than EventSource. Streams end after SSE_MAX_STREAM_SECONDS
+    (default 300) and should be reopened.
+    """
+    subscription = get_monitoring_events().subscribe()
+    return Response(
+        stream_with_context(subscription.iter_sse(max_seconds=int(os.getenv('SSE_MAX_STREAM_SECONDS', 300)))),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
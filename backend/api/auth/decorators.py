@@ -0,0 +1,38 @@
+from functools import wraps
+from flask import g, jsonify, request
+import jwt
+from services.token_service import get_token_service
+
+
+def token_required(roles=None):
+    """
+    Require a valid access token in the Authorization header.
+
+    On success the caller is available as g.user = {'force_id', 'role'}.
+
+    Args:
+        roles (list, optional): Roles allowed to call the endpoint
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            header = request.headers.get('Authorization', '')
+            scheme, _, token = header.partition(' ')
+            if scheme.lower() != 'bearer' or not token:
+                return jsonify({'error': 'Missing bearer token'}), 401
+
+            try:
+                claims = get_token_service().verify(token)
+            except jwt.ExpiredSignatureError:
+                return jsonify({'error': 'Token has expired'}), 401
+            except jwt.InvalidTokenError as e:
+                return jsonify({'error': f'Invalid token: {str(e)}'}), 401
+
+            if roles and claims.get('role') not in roles:
+                return jsonify({'error': 'Insufficient permissions'}), 403
+
+            g.user = {'force_id': claims['sub'], 'role': claims.get('role')}
+            g.token_claims = claims
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
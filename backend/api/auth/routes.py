@@ -1,5 +1,10 @@
-from flask import Blueprint, jsonify, request
+from concurrent.futures import TimeoutError as HashingTimeoutError
+from flask import Blueprint, g, jsonify, request
+import jwt
 from services.auth_service import AuthService
+from services.hashing_service import HashingOverloadedError
+from services.token_service import RevocationStoreError, get_token_service
+from api.auth.decorators import token_required
 
 auth_bp = Blueprint('auth', __name__)
 auth_service = AuthService()
@@ -31,17 +36,66 @@ def login():
                 'user': {
                     'force_id': user['force_id'],
                     'role': user['role']
-                }
+                },
+                **get_token_service().issue_tokens(user['force_id'], user['role'])
             }), 200
         else:
             return jsonify({
                 'error': 'Invalid credentials'
             }), 401
+    except (HashingOverloadedError, HashingTimeoutError):
+        return jsonify({
+            'error': 'Too many pending password operations, try again shortly'
+        }), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({
             'error': str(e)
         }), 500
 
+@auth_bp.route('/refresh', methods=['POST'])
+def refresh():
+    """Exchange a refresh token for a new access/refresh token pair"""
+    data = request.get_json()
+    
+    if not data or 'refresh_token' not in data:
+        return jsonify({
+            'error': 'Missing required field: refresh_token'
+        }), 400
+    
+    try:
+        tokens = get_token_service().refresh(data['refresh_token'])
+        return jsonify(tokens), 200
+    except jwt.InvalidTokenError as e:
+        return jsonify({
+            'error': f'Invalid refresh token: {str(e)}'
+        }), 401
+    except RevocationStoreError:
+        return jsonify({
+            'error': 'Token service temporarily unavailable, try again shortly'
+        }), 503, {'Retry-After': '1'}
+
+@auth_bp.route('/logout', methods=['POST'])
+@token_required()
+def logout():
+    """Revoke the caller's access token and, if given, their refresh token"""
+    token_service = get_token_service()
+    data = request.get_json(silent=True) or {}
+    try:
+        token_service.revoke(g.token_claims)
+        if data.get('refresh_token'):
+            try:
+                token_service.revoke(token_service.verify(data['refresh_token'], token_type='refresh'))
+            except jwt.InvalidTokenError:
+                pass
+    except RevocationStoreError:
+        return jsonify({
+            'error': 'Token service temporarily unavailable, try again shortly'
+        }), 503, {'Retry-After': '1'}
+    
+    return jsonify({
+        'message': 'Logged out successfully'
+    }), 200
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """Handle registration for new soldiers"""
@@ -71,6 +125,10 @@ def register():
         return jsonify({
             'error': str(e)
         }), 400
+    except (HashingOverloadedError, HashingTimeoutError):
+        return jsonify({
+            'error': 'Too many pending password operations, try again shortly'
+        }), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({
             'error': str(e)
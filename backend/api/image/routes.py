@@ -1,15 +1,10 @@
 from flask import Blueprint, jsonify, request
 import logging
-from services.image_collection import ImageCollectionService
-from services.face_recognition_service import FaceRecognitionService
-from services.emotion_detection_service import EmotionDetectionService
-from services.cctv_monitoring_service import CCTVMonitoringService
+from services.job_queue import get_job_queue
+from services.monitoring_control import get_monitoring_controller
 from datetime import datetime
 
 image_bp = Blueprint('image', __name__)
-image_collection_service = ImageCollectionService()
-face_recognition_service = FaceRecognitionService()
-monitoring_service = CCTVMonitoringService()
 
 @image_bp.route('/collect', methods=['POST'])
 def collect_images():
@@ -30,11 +25,12 @@ def collect_images():
         }), 400
     
     try:
-        folder_path = image_collection_service.collect_images(force_id)
+        # Capture runs in a job worker; poll /api/jobs/<job_id> for progress
+        job_id = get_job_queue().enqueue('collect_images', {'force_id': force_id})
         return jsonify({
-            'message': 'Image collection successful',
-            'folder_path': folder_path
-        }), 200
+            'message': 'Image collection queued',
+            'job_id': job_id
+        }), 202
     except Exception as e:
         return jsonify({
             'error': str(e)
@@ -42,10 +38,45 @@ def collect_images():
 
 @image_bp.route('/train', methods=['POST'])
 def train_model():
-    """Train the face recognition model on new soldiers"""
+    """Queue training of the face recognition model on new soldiers"""
     try:
-        result = face_recognition_service.train_model()
-        return jsonify(result)
+        job_id = get_job_queue().enqueue('train_model', max_attempts=3)
+        return jsonify({
+            'message': 'Model training queued',
+            'job_id': job_id
+        }), 202
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@image_bp.route('/soldiers/<force_id>/retrain', methods=['POST'])
+def retrain_soldier(force_id):
+    """Queue re-enrollment of one soldier from their newly collected images"""
+    if not force_id.isdigit() or len(force_id) != 9:
+        return jsonify({
+            'error': 'Invalid force ID format. Must be 9 digits.'
+        }), 400
+    try:
+        job_id = get_job_queue().enqueue('replace_soldier', {'force_id': force_id})
+        return jsonify({
+            'message': f'Retraining queued for soldier {force_id}',
+            'job_id': job_id
+        }), 202
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@image_bp.route('/soldiers/<force_id>', methods=['DELETE'])
+def delete_soldier_from_model(force_id):
+    """Queue removal of one soldier from the face recognition model"""
+    if not force_id.isdigit() or len(force_id) != 9:
+        return jsonify({
+            'error': 'Invalid force ID format. Must be 9 digits.'
+        }), 400
+    try:
+        job_id = get_job_queue().enqueue('delete_soldier', {'force_id': force_id})
+        return jsonify({
+            'message': f'Removal queued for soldier {force_id}',
+            'job_id': job_id
+        }), 202
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -60,7 +91,7 @@ def start_monitoring():
         
     date = data['date']
     try:
-        if monitoring_service.start_monitoring(date):
+        if get_monitoring_controller().start_monitoring(date):
             return jsonify({
                 'message': 'Monitoring started successfully'
             }), 200
@@ -86,9 +117,9 @@ def end_monitoring():
     date = data['date']
     try:
         # Stop monitoring
-        if monitoring_service.stop_monitoring():
+        if get_monitoring_controller().stop_monitoring():
             # Calculate daily scores
-            if monitoring_service.calculate_daily_scores(date):
+            if get_monitoring_controller().calculate_daily_scores(date):
                 return jsonify({
                     'message': 'Monitoring ended and scores calculated successfully'
                 }), 200
@@ -109,7 +140,7 @@ def end_monitoring():
 def process_frame():
     """Process a single frame from CCTV feed"""
     try:
-        result = monitoring_service.process_frame()
+        result = get_monitoring_controller().process_frame()
         if result:
             return jsonify(result), 200
         else:
@@ -119,4 +150,14 @@ def process_frame():
     except Exception as e:
         return jsonify({
             'error': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+@image_bp.route('/monitoring-status', methods=['GET'])
+def monitoring_status():
+    """Monitoring state and camera health (uptime, outages, reconnects)"""
+    try:
+        return jsonify(get_monitoring_controller().status()), 200
+    except Exception as e:
+        return jsonify({
+            'error': str(e)
+        }), 500
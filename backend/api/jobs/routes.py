@@ -0,0 +1,26 @@
+from flask import Blueprint, jsonify
+from services.job_queue import get_job_queue
+
+jobs_bp = Blueprint('jobs', __name__)
+
+@jobs_bp.route('/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """Return the full status of a background job"""
+    job = get_job_queue().get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job), 200
+
+@jobs_bp.route('/<int:job_id>/progress', methods=['GET'])
+def get_job_progress(job_id):
+    """Return just the status and progress of a background job, for polling"""
+    job = get_job_queue().get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify({
+        'job_id': job['job_id'],
+        'status': job['status'],
+        'progress': job['progress'],
+        'progress_message': job['progress_message'],
+        'error': job['error']
+    }), 200
@@ -1,5 +1,6 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, g, request, jsonify
 from db.connection import get_connection
+from api.auth.decorators import token_required
 from services.sentiment_analysis_service import analyze_sentiment, calculate_average_score
 import logging
 
@@ -62,6 +63,7 @@ def get_active_questionnaire():
         db.close()
 
 @survey_bp.route('/submit', methods=['POST'])
+@token_required(roles=['soldier'])
 def submit_survey():
     db = get_connection()
     cursor = db.cursor()
@@ -70,11 +72,8 @@ def submit_survey():
         data = request.json
         questionnaire_id = data['questionnaire_id']
         responses = data['responses']
-        # Use a dummy force_id for now (replace with real authentication later)
-        # Try to get force_id from data, or fallback to dummy for now
-        force_id = data.get('force_id')
-        if not force_id:
-            force_id = '100000001'
+        # The soldier is identified by their access token, not the request body
+        force_id = g.user['force_id']
 
         # Create a new weekly session
         cursor.execute("""
@@ -1,50 +1,34 @@
-from flask import Flask, jsonify
-from flask_cors import CORS
-from api import api_bp
-from api.auth.routes import auth_bp
-from api.image.routes import image_bp
-from api.admin.routes import admin_bp
-from api.survey.routes import survey_bp
-from services.scheduler_service import MonitoringScheduler
+import atexit
+import os
+from app_factory import create_app
 
-def create_app():
-    app = Flask(__name__)
-    
-    # Update CORS configuration to specifically allow your frontend
-    CORS(app, resources={
-        r"/api/*": {
-            "origins": ["http://localhost:3000"],
-            "methods": ["GET", "POST", "PUT", "DELETE"],
-            "allow_headers": ["Content-Type"]
-        }
-    })
+def start_background_jobs():
+    """
+    Start the monitoring scheduler and job workers from this process
+    (development only).
 
-    # Register the main API blueprint
-    app.register_blueprint(api_bp)
-    app.register_blueprint(auth_bp, url_prefix='/api/auth')
-    app.register_blueprint(image_bp, url_prefix='/api/image')
-    app.register_blueprint(admin_bp, url_prefix='/api/admin')
-    app.register_blueprint(survey_bp, url_prefix='/api/survey')
+    In production the scheduler, CCTV and job workers run in worker.py
+    instead, so API processes stay stateless.
+    """
+    from services.job_queue import JobWorkerPool, get_job_queue_path
+    from services.monitoring_control import get_monitoring_controller
+    from services.scheduler_service import MonitoringScheduler
 
-    # Initialize scheduler
-    scheduler = MonitoringScheduler()
-    
-    # Start scheduler within app context
-    with app.app_context():
-        scheduler.start()
-
-    # Cleanup on app shutdown
-    @app.teardown_appcontext
-    def cleanup(error):
-        scheduler.stop()
-    
-    return app
+    scheduler = MonitoringScheduler(get_monitoring_controller())
+    scheduler.start()
+    job_workers = JobWorkerPool(get_job_queue_path(), concurrency=int(os.getenv('JOB_CONCURRENCY', 1)))
+    job_workers.start()
+    # Stop once on interpreter exit, not after every request
+    atexit.register(scheduler.stop)
+    atexit.register(job_workers.stop)
 
 app = create_app()
 
-@app.route('/')
-def hello():
-    return jsonify({"message": "Hello from Flask!"})
-
 if __name__ == '__main__':
+    # The development server runs monitoring itself instead of in worker.py
+    from services.monitoring_control import use_in_process_monitoring
+    use_in_process_monitoring()
+    # With the debug reloader only the child process (WERKZEUG_RUN_MAIN) serves requests
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_jobs()
     app.run(debug=True, port=5000)
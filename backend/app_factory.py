@@ -0,0 +1,41 @@
+"""
+Flask application factory, importable without side effects (wsgi.py and
+app.py both build their app from it).
+"""
+import os
+from flask import Flask, jsonify
+from flask_cors import CORS
+from api import api_bp
+from api.auth.routes import auth_bp
+from api.image.routes import image_bp
+from api.admin.routes import admin_bp
+from api.survey.routes import survey_bp
+from api.jobs.routes import jobs_bp
+from utils.logging_config import setup_logging
+
+def create_app():
+    setup_logging()
+    app = Flask(__name__)
+    
+    # Update CORS configuration to specifically allow your frontend
+    CORS(app, resources={
+        r"/api/*": {
+            "origins": os.getenv("CORS_ORIGINS", "http://localhost:3000").split(","),
+            "methods": ["GET", "POST", "PUT", "DELETE"],
+            "allow_headers": ["Content-Type", "Authorization"]
+        }
+    })
+
+    # Register the main API blueprint
+    app.register_blueprint(api_bp)
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(image_bp, url_prefix='/api/image')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    app.register_blueprint(survey_bp, url_prefix='/api/survey')
+    app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
+
+    @app.route('/')
+    def hello():
+        return jsonify({"message": "Hello from Flask!"})
+    
+    return app
@@ -0,0 +1,37 @@
+import json
+import urllib.error
+import urllib.request
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of `values` (0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def post_json(url, payload, token=None, timeout=60):
+    """POST JSON and return (status, decoded body)"""
+    return request_json(url, 'POST', payload, token, timeout)
+
+
+def request_json(url, method='GET', payload=None, token=None, timeout=60):
+    """Send a JSON request and return (status, decoded body); HTTP errors are returned, not raised"""
+    headers = {'Content-Type': 'application/json'}
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    request = urllib.request.Request(url, data=data, headers=headers, method=method)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read() or b'null')
+    except urllib.error.HTTPError as e:
+        try:
+            body = json.loads(e.read() or b'null')
+        except ValueError:
+            body = None
+        return e.code, body
+    except OSError:
+        return 0, None  # Connection refused/reset or timed out
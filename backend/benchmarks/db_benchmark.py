@@ -0,0 +1,310 @@
+"""
+Benchmark suite for the hot SQL paths.
+
+For each data size (number of soldiers) the suite seeds synthetic data with
+benchmarks.synthetic_data and times the statement sequences issued by
+submit_survey, get_active_questionnaire, stop_monitoring,
+calculate_daily_scores, _calculate_and_store_average and
+update_session_scores. Writes run inside a transaction that is rolled back,
+so every iteration sees the same data. It reports p50/p95/p99 latency and
+rows/sec per path, and compares the results to a JSON baseline: a path is
+flagged as a regression when its p95 grows by more than --tolerance, and
+the exit status is then 1.
+
+Needs a dedicated local MySQL/MariaDB benchmark database with the schema
+loaded (db/init_db.py; see benchmarks.synthetic_data for how it is
+marked); the synthetic soldiers are removed again afterwards.
+
+    python -m benchmarks.db_benchmark --sizes 100 1000 --update-baseline
+    python -m benchmarks.db_benchmark --sizes 100 1000
+"""
+import argparse
+import json
+import os
+import platform
+import time
+from datetime import date, datetime
+
+from benchmarks.common import percentile
+from benchmarks.synthetic_data import SyntheticDataGenerator
+from db.connection import get_connection
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baselines', 'db_benchmark.json')
+
+# Fixed so every run (and the baseline) sees identical data
+END_DATE = date(2025, 6, 29)
+
+
+# Each path runs the statements of the function it is named after and returns
+# the number of rows it touched. tests/test_db_benchmark.py checks that the
+# SQL still matches the source.
+
+def get_active_questionnaire(cursor, ctx, i):
+    cursor.execute("""
+        SELECT questionnaire_id, title, description, total_questions
+        FROM questionnaires
+        WHERE status = 'Active'
+        LIMIT 1
+    """)
+    questionnaire_id = cursor.fetchone()[0]
+    cursor.execute("""
+        SELECT question_id, question_text, question_text_hindi
+        FROM questions
+        WHERE questionnaire_id = %s
+        ORDER BY created_at ASC
+    """, (questionnaire_id,))
+    return 1 + len(cursor.fetchall())
+
+
+def submit_survey(cursor, ctx, i):
+    force_id = ctx['force_ids'][i % len(ctx['force_ids'])]
+    cursor.execute("""
+        INSERT INTO weekly_sessions
+        (force_id, questionnaire_id, year, start_timestamp, completion_timestamp, status, nlp_avg_score, image_avg_score, combined_avg_score)
+        VALUES (%s, %s, YEAR(NOW()), NOW(), NOW(), 'completed', %s, %s, %s)
+    """, (force_id, ctx['questionnaire_id'], 0, 0, 0))
+    session_id = cursor.lastrowid
+    for question_id in ctx['question_ids']:
+        cursor.execute("""
+            INSERT INTO question_responses
+            (session_id, question_id, answer_text, nlp_depression_score, image_depression_score, combined_depression_score)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, (session_id, question_id, "I am feeling okay.", 0.4, None, 0.4))
+    cursor.execute("""
+        UPDATE weekly_sessions
+        SET nlp_avg_score = %s, combined_avg_score = %s
+        WHERE session_id = %s
+    """, (0.4, 0.4, session_id))
+    return 2 + len(ctx['question_ids'])
+
+
+def stop_monitoring(cursor, ctx, i):
+    monitoring_date = ctx['monitoring_date']
+    cursor.execute("""
+        SELECT DISTINCT force_id
+        FROM cctv_detections
+        WHERE monitoring_id = %s
+    """, (ctx['monitoring_id'],))
+    force_ids = [row[0] for row in cursor.fetchall()]
+    for force_id in force_ids:
+        cursor.execute("""
+            SELECT AVG(depression_score)
+            FROM cctv_detections
+            WHERE force_id = %s
+            AND detection_timestamp >= %s
+            AND detection_timestamp < %s + INTERVAL 1 DAY
+        """, (force_id, monitoring_date, monitoring_date))
+        daily_avg = cursor.fetchone()[0]
+        cursor.execute("""
+            INSERT INTO daily_depression_scores
+            (force_id, date, avg_depression_score)
+            VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+            avg_depression_score = VALUES(avg_depression_score)
+        """, (force_id, monitoring_date, daily_avg))
+    return len(force_ids)
+
+
+def calculate_daily_scores(cursor, ctx, i):
+    day = ctx['monitoring_date']
+    cursor.execute("""
+        SELECT force_id, AVG(depression_score) as avg_score, COUNT(*) as count
+        FROM cctv_detections cd
+        JOIN cctv_daily_monitoring cdm ON cd.monitoring_id = cdm.monitoring_id
+        WHERE DATE(cdm.date) = %s
+        AND cd.detection_timestamp >= %s
+        AND cd.detection_timestamp < %s + INTERVAL 1 DAY
+        GROUP BY force_id
+    """, (day, day, day))
+    rows = cursor.fetchall()
+    for force_id, avg_score, count in rows:
+        cursor.execute("""
+            INSERT INTO daily_depression_scores
+            (force_id, date, avg_depression_score, detection_count)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+            avg_depression_score = VALUES(avg_depression_score),
+            detection_count = VALUES(detection_count)
+        """, (force_id, day, avg_score, count))
+    return len(rows)
+
+
+def calculate_and_store_average(cursor, ctx, i):
+    force_id = ctx['force_ids'][i % len(ctx['force_ids'])]
+    cursor.execute("""
+        INSERT INTO cctv_detections
+        (monitoring_id, force_id, detection_timestamp, depression_score, emotion_probs, face_crop_hash)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, (ctx['monitoring_id'], force_id, datetime.now(), 0.42, bytes([20, 5, 10, 30, 150, 30, 10]), None))
+    return 1
+
+
+def update_session_scores(cursor, ctx, i):
+    session_id = ctx['session_ids'][i % len(ctx['session_ids'])]
+    cursor.execute("""
+        SELECT nlp_depression_score
+        FROM question_responses
+        WHERE session_id = %s AND nlp_depression_score IS NOT NULL
+    """, (session_id,))
+    scores = [row[0] for row in cursor.fetchall()]
+    if scores:
+        avg_score = sum(scores) / len(scores)
+        cursor.execute("""
+            UPDATE weekly_sessions
+            SET nlp_avg_score = %s, combined_avg_score = %s
+            WHERE session_id = %s
+        """, (avg_score, avg_score, session_id))
+    return len(scores) + 1
+
+
+# name -> (function, whether it loops over every soldier of a day)
+PATHS = {
+    'get_active_questionnaire': (get_active_questionnaire, False),
+    'submit_survey': (submit_survey, False),
+    'stop_monitoring': (stop_monitoring, True),
+    'calculate_daily_scores': (calculate_daily_scores, True),
+    '_calculate_and_store_average': (calculate_and_store_average, False),
+    'update_session_scores': (update_session_scores, False),
+}
+
+
+def load_context(cursor, generator):
+    """Parameters for the paths, drawn from the synthetic data just generated"""
+    force_ids = [generator.force_id(index) for index in range(1, generator.soldiers + 1)]
+    cursor.execute("""
+        SELECT questionnaire_id FROM questionnaires
+        WHERE status = 'Active' ORDER BY questionnaire_id DESC LIMIT 1
+    """)
+    questionnaire_id = cursor.fetchone()[0]
+    cursor.execute("SELECT question_id FROM questions WHERE questionnaire_id = %s", (questionnaire_id,))
+    question_ids = [row[0] for row in cursor.fetchall()]
+    cursor.execute("""
+        SELECT session_id FROM weekly_sessions
+        WHERE force_id LIKE %s AND status = 'completed'
+        ORDER BY session_id LIMIT 1000
+    """, (f"{generator.id_prefix}%",))
+    session_ids = [row[0] for row in cursor.fetchall()]
+    cursor.execute("SELECT monitoring_id FROM cctv_daily_monitoring WHERE date = %s ORDER BY monitoring_id DESC LIMIT 1",
+                   (generator.end_date,))
+    monitoring_id = cursor.fetchone()[0]
+    return {
+        'force_ids': force_ids,
+        'questionnaire_id': questionnaire_id,
+        'question_ids': question_ids,
+        'session_ids': session_ids,
+        'monitoring_id': monitoring_id,
+        'monitoring_date': generator.end_date
+    }
+
+
+def run_path(conn, fn, ctx, iterations):
+    cursor = conn.cursor(buffered=True)
+    latencies = []
+    rows = 0
+    try:
+        for i in range(iterations):
+            start = time.perf_counter()
+            rows += fn(cursor, ctx, i)
+            latencies.append(time.perf_counter() - start)
+            conn.rollback()
+    finally:
+        cursor.close()
+    total = sum(latencies)
+    return {
+        'iterations': iterations,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'rows_per_sec': round(rows / total, 1) if total > 0 else None
+    }
+
+
+def compare(results, baseline, tolerance, min_delta_ms=1.0):
+    """List the paths whose p95 regressed against the baseline"""
+    regressions = []
+    for size, paths in results.items():
+        for name, current in paths.items():
+            previous = baseline.get(size, {}).get(name)
+            if not previous:
+                continue
+            limit = previous['p95_ms'] * (1 + tolerance)
+            if current['p95_ms'] > limit and current['p95_ms'] - previous['p95_ms'] >= min_delta_ms:
+                regressions.append({
+                    'size': size,
+                    'path': name,
+                    'baseline_p95_ms': previous['p95_ms'],
+                    'p95_ms': current['p95_ms'],
+                    'change': f"{current['p95_ms'] / previous['p95_ms'] - 1:+.0%}"
+                })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000], help='soldier counts to seed')
+    parser.add_argument('--weeks', type=int, default=4)
+    parser.add_argument('--detections-per-day', type=int, default=50)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--bulk-iterations', type=int, default=5,
+                        help='iterations for paths that loop over every soldier')
+    parser.add_argument('--paths', nargs='+', choices=list(PATHS), default=list(PATHS))
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed p95 growth before flagging')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    results = {}
+    for size in args.sizes:
+        generator = SyntheticDataGenerator(
+            soldiers=size, weeks=args.weeks, detections_per_day=args.detections_per_day,
+            seed=args.seed, end_date=END_DATE
+        )
+        generator.clear()
+        generator.generate()
+        conn = get_connection()
+        try:
+            cursor = conn.cursor(buffered=True)
+            ctx = load_context(cursor, generator)
+            cursor.close()
+            results[str(size)] = {}
+            for name in args.paths:
+                fn, bulk = PATHS[name]
+                stats = run_path(conn, fn, ctx, args.bulk_iterations if bulk else args.iterations)
+                results[str(size)][name] = stats
+                print(json.dumps({'size': size, 'path': name, **stats}))
+        finally:
+            conn.close()
+            generator.clear()
+
+    report = {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'host': platform.node(),
+            'weeks': args.weeks,
+            'detections_per_day': args.detections_per_day,
+            'seed': args.seed
+        },
+        'results': results
+    }
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline['results'], args.tolerance)
+    print(json.dumps({'regressions': regressions}, indent=2))
+    if regressions:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
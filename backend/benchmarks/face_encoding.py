@@ -0,0 +1,85 @@
+"""
+Face encoding throughput and agreement benchmark.
+
+Encodes every image in the given directories with the full-resolution HOG
+path (the reference) and with the downscaled Haar/HOG fast paths, then
+reports images/sec and how closely each fast path's embeddings agree with
+the reference (L2 distance, and the share within the 0.6 match tolerance).
+
+    python -m benchmarks.face_encoding tests/test_images storage/uploads --scales 0.25 0.5
+"""
+import argparse
+import json
+import os
+import time
+
+import face_recognition
+import numpy as np
+
+from services.face_recognition_service import FaceRecognitionService
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def find_images(paths):
+    images = []
+    for path in paths:
+        if os.path.isfile(path):
+            images.append(path)
+            continue
+        for root, _, files in os.walk(path):
+            images.extend(os.path.join(root, f) for f in sorted(files) if f.lower().endswith(IMAGE_EXTENSIONS))
+    return images
+
+
+def encode_all(service, images):
+    start = time.perf_counter()
+    encodings = [service.encode_face(image) for image in images]
+    return encodings, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='*', default=['tests/test_images'])
+    parser.add_argument('--scales', type=float, nargs='+', default=[0.25, 0.5])
+    parser.add_argument('--detectors', nargs='+', default=['haar', 'hog'], choices=['haar', 'hog'])
+    parser.add_argument('--tolerance', type=float, default=0.6)
+    args = parser.parse_args()
+
+    paths = find_images(args.paths)
+    if not paths:
+        parser.error("No images found")
+    # Decode once so only detection and encoding are timed
+    images = [face_recognition.load_image_file(path) for path in paths]
+
+    reference, reference_time = encode_all(FaceRecognitionService(detector='full'), images)
+    print(json.dumps({
+        'mode': 'full',
+        'images': len(images),
+        'images_per_s': round(len(images) / reference_time, 2),
+        'faces_found': sum(e is not None for e in reference)
+    }))
+
+    for detector in args.detectors:
+        for scale in args.scales:
+            service = FaceRecognitionService(detector=detector, detection_scale=scale)
+            encodings, elapsed = encode_all(service, images)
+            distances = [
+                float(np.linalg.norm(ref - enc))
+                for ref, enc in zip(reference, encodings)
+                if ref is not None and enc is not None
+            ]
+            print(json.dumps({
+                'mode': f'{detector}@{scale}',
+                'images': len(images),
+                'images_per_s': round(len(images) / elapsed, 2),
+                'speedup': round(reference_time / elapsed, 2),
+                'faces_found': sum(e is not None for e in encodings),
+                'mean_distance': round(float(np.mean(distances)), 4) if distances else None,
+                'max_distance': round(float(np.max(distances)), 4) if distances else None,
+                'within_tolerance': round(float(np.mean([d <= args.tolerance for d in distances])), 4) if distances else None
+            }))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Cross-process frame transfer benchmark.
+
+A producer process publishes 1280x720 BGR frames at a fixed rate and the
+benchmark process consumes them, once through a multiprocessing.Queue
+(frames are pickled and sent through a pipe) and once through a
+services.frame_bus.SharedFrameRing (frames stay in shared memory and the
+consumer reads a view of the latest one). For every transport and rate it
+reports the frames delivered and skipped, publish-to-receive latency
+(p50/p95/p99) and the CPU time per frame of producer and consumer.
+
+--work-ms emulates inference time per consumed frame: the queue then
+delivers ever older frames (up to its depth), the ring always the newest.
+--copy makes ring consumers copy each frame out, as CCTVMonitoringService
+does for the frames it annotates.
+
+    python -m benchmarks.frame_bus
+    python -m benchmarks.frame_bus --fps 15 30 --seconds 10 --work-ms 50
+"""
+import argparse
+import json
+import multiprocessing
+import queue
+import time
+
+import numpy as np
+
+from benchmarks.common import percentile
+from services.frame_bus import FRAME_SHAPE, STATE_RUNNING, STATE_STOPPED, SharedFrameRing
+
+
+def _frames(count=4, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, FRAME_SHAPE, dtype=np.uint8) for _ in range(count)]
+
+
+def produce_queue(frame_queue, results, fps, seconds):
+    frames = _frames()
+    sent = dropped = 0
+    interval = 1.0 / fps
+    cpu_start = time.process_time()
+    start = next_frame = time.monotonic()
+    while time.monotonic() - start < seconds:
+        try:
+            frame_queue.put_nowait((time.time(), frames[sent % len(frames)]))
+            sent += 1
+        except queue.Full:
+            dropped += 1  # Consumer is behind; a camera would drop the frame too
+        next_frame += interval
+        time.sleep(max(0.0, next_frame - time.monotonic()))
+    frame_queue.put(None)
+    results.put({'published': sent, 'dropped_at_producer': dropped, 'producer_cpu_s': time.process_time() - cpu_start})
+
+
+def produce_ring(ring_name, results, fps, seconds):
+    ring = SharedFrameRing.attach(ring_name)
+    frames = _frames()
+    sent = 0
+    interval = 1.0 / fps
+    ring.state = STATE_RUNNING
+    cpu_start = time.process_time()
+    start = next_frame = time.monotonic()
+    while time.monotonic() - start < seconds:
+        ring.publish(frames[sent % len(frames)])
+        sent += 1
+        next_frame += interval
+        time.sleep(max(0.0, next_frame - time.monotonic()))
+    ring.state = STATE_STOPPED
+    ring.close()
+    results.put({'published': sent, 'dropped_at_producer': 0, 'producer_cpu_s': time.process_time() - cpu_start})
+
+
+def consume(receive, work_ms):
+    """Call receive() until it returns None; returns the latencies of received frames"""
+    latencies = []
+    while True:
+        item = receive()
+        if item is None:
+            return latencies
+        latencies.append(time.time() - item)
+        if work_ms:
+            time.sleep(work_ms / 1000)
+
+
+def run(transport, fps, seconds, slots, work_ms, copy, context):
+    results = context.Queue()
+    cpu_before = time.process_time()
+    if transport == 'queue':
+        frame_queue = context.Queue(maxsize=slots)
+        producer = context.Process(target=produce_queue, args=(frame_queue, results, fps, seconds))
+        producer.start()
+
+        def receive():
+            item = frame_queue.get()
+            return None if item is None else item[0]
+
+        latencies = consume(receive, work_ms)
+    else:
+        ring = SharedFrameRing.create(FRAME_SHAPE, slots)
+        producer = context.Process(target=produce_ring, args=(ring.name, results, fps, seconds))
+        producer.start()
+        last_seq = 0
+
+        def receive():
+            nonlocal last_seq
+            frame = ring.wait(last_seq, copy=copy)
+            if frame is None:
+                return None
+            last_seq = frame.seq
+            return frame.timestamp
+
+        latencies = consume(receive, work_ms)
+
+    consumer_cpu = time.process_time() - cpu_before
+    producer_stats = results.get()
+    producer.join()
+    if transport == 'ring':
+        ring.close()
+        ring.unlink()
+
+    received = len(latencies)
+    return {
+        'transport': transport,
+        'fps': fps,
+        'work_ms': work_ms,
+        'published': producer_stats['published'],
+        'received': received,
+        'dropped_at_producer': producer_stats['dropped_at_producer'],
+        'skipped': producer_stats['published'] - received,
+        'latency_p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'latency_p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'latency_p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'producer_cpu_ms_per_frame': round(producer_stats['producer_cpu_s'] * 1000 / max(producer_stats['published'], 1), 3),
+        'consumer_cpu_ms_per_frame': round(consumer_cpu * 1000 / max(received, 1), 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fps', type=float, nargs='+', default=[15, 30])
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--slots', type=int, default=8, help='ring slots / queue depth')
+    parser.add_argument('--work-ms', type=float, default=0, help='emulated inference time per frame')
+    parser.add_argument('--copy', action='store_true', help='ring consumers copy frames out')
+    parser.add_argument('--transports', nargs='+', choices=['queue', 'ring'], default=['queue', 'ring'])
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')
+    for fps in args.fps:
+        for transport in args.transports:
+            result = run(transport, fps, args.seconds, args.slots, args.work_ms, args.copy, context)
+            print(json.dumps(result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+HTTP load-test harness for the auth and survey endpoints.
+
+Each virtual user runs the selected scenario in a loop for --duration
+seconds against a running server (dev server, gunicorn or waitress) and the
+harness reports requests/sec and latency percentiles per endpoint.
+
+    python -m benchmarks.load_test --url http://localhost:5000 --users 50 --duration 30
+    python -m benchmarks.load_test --scenario survey --users 200
+"""
+import argparse
+import json
+import threading
+import time
+from collections import defaultdict
+
+from benchmarks.common import percentile, post_json, request_json
+
+SCENARIOS = ('login', 'survey', 'mixed')
+
+
+class Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint, status, latency):
+        with self._lock:
+            if 200 <= status < 300:
+                self.latencies[endpoint].append(latency)
+            else:
+                self.errors[endpoint] += 1
+
+    def report(self, elapsed):
+        report = {}
+        for endpoint in sorted(set(self.latencies) | set(self.errors)):
+            latencies = self.latencies[endpoint]
+            report[endpoint] = {
+                'requests': len(latencies),
+                'errors': self.errors[endpoint],
+                'req_per_s': round(len(latencies) / elapsed, 2),
+                'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+                'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+                'p99_ms': round(percentile(latencies, 99) * 1000, 1)
+            }
+        return report
+
+
+def timed(stats, endpoint, fn):
+    start = time.perf_counter()
+    status, body = fn()
+    stats.record(endpoint, status, time.perf_counter() - start)
+    return status, body
+
+
+def virtual_user(base_url, scenario, credentials, deadline, stats):
+    login_payload = {'force_id': credentials[0], 'password': credentials[1]}
+    token = None
+
+    def login():
+        return post_json(f'{base_url}/api/auth/login', login_payload)
+
+    while time.monotonic() < deadline:
+        if scenario == 'login' or token is None:
+            status, body = timed(stats, 'POST /api/auth/login', login)
+            if status == 200:
+                token = body.get('access_token')
+            if scenario == 'login':
+                continue
+            if not token:
+                time.sleep(0.1)
+                continue
+
+        status, body = timed(
+            stats, 'GET /api/survey/active-questionnaire',
+            lambda: request_json(f'{base_url}/api/survey/active-questionnaire')
+        )
+        if status != 200:
+            continue
+
+        if scenario == 'mixed':
+            responses = [
+                {'question_id': question['id'], 'answer_text': 'I am feeling okay.'}
+                for question in body['questions']
+            ]
+            payload = {'questionnaire_id': body['questionnaire']['id'], 'responses': responses}
+            status, _ = timed(
+                stats, 'POST /api/survey/submit',
+                lambda: post_json(f'{base_url}/api/survey/submit', payload, token=token)
+            )
+            if status == 401:
+                token = None  # Access token expired, log in again
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--scenario', choices=SCENARIOS, default='mixed',
+                        help='login: logins only; survey: read questionnaire; mixed: read and submit surveys')
+    parser.add_argument('--users', type=int, default=50, help='concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=30, help='seconds to run')
+    parser.add_argument('--force-id', default='100000001')
+    parser.add_argument('--password', default='soldier123')
+    args = parser.parse_args()
+
+    base_url = args.url.rstrip('/')
+    stats = Stats()
+    deadline = time.monotonic() + args.duration
+    threads = [
+        threading.Thread(
+            target=virtual_user,
+            args=(base_url, args.scenario, (args.force_id, args.password), deadline, stats),
+            daemon=True
+        )
+        for _ in range(args.users)
+    ]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        'scenario': args.scenario,
+        'users': args.users,
+        'elapsed_s': round(elapsed, 2),
+        'endpoints': stats.report(elapsed)
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Login throughput benchmark.
+
+Simulates N soldiers logging in at once and reports logins/sec, latency
+percentiles and overload rejections.
+
+    # bcrypt verification inline on request threads vs in the hashing pool
+    python -m benchmarks.login_throughput --users 50 200 1000
+
+    # against a running server (uses the dummy soldier credentials)
+    python -m benchmarks.login_throughput --url http://localhost:5000 --users 50 200
+"""
+import argparse
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import percentile, post_json
+from services.hashing_service import HashingOverloadedError, HashingService
+from utils.hash import check_password, hash_password
+
+
+def run_concurrent(login, users):
+    """Run `users` logins concurrently, one thread per user"""
+    latencies = []
+    rejected = 0
+
+    def one_login(_):
+        start = time.perf_counter()
+        ok = login()
+        return ok, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        for ok, latency in pool.map(one_login, range(users)):
+            if ok:
+                latencies.append(latency)
+            else:
+                rejected += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        'users': users,
+        'elapsed_s': round(elapsed, 3),
+        'logins_per_s': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'rejected': rejected,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+        'mean_ms': round(statistics.mean(latencies) * 1000, 1) if latencies else 0.0
+    }
+
+
+def bench_local(users_list, rounds, workers, max_pending):
+    password = 'soldier123'
+    hashed = hash_password(password, rounds=rounds)
+    service = HashingService(max_workers=workers, max_pending=max_pending, timeout=600)
+    # Warm up the pool so process start-up isn't measured
+    service.check_password(password, hashed)
+
+    def inline_login():
+        return check_password(password, hashed)
+
+    def pooled_login():
+        try:
+            return service.check_password(password, hashed)
+        except HashingOverloadedError:
+            return False
+
+    results = []
+    try:
+        for users in users_list:
+            for mode, login in (('inline', inline_login), ('pool', pooled_login)):
+                result = run_concurrent(login, users)
+                result['mode'] = mode
+                results.append(result)
+                print(json.dumps(result))
+    finally:
+        service.shutdown()
+    return results
+
+
+def bench_http(url, users_list, force_id, password):
+    endpoint = url.rstrip('/') + '/api/auth/login'
+    payload = {'force_id': force_id, 'password': password}
+
+    def http_login():
+        status, _ = post_json(endpoint, payload, timeout=600)
+        return status == 200
+
+    results = []
+    for users in users_list:
+        result = run_concurrent(http_login, users)
+        result['mode'] = 'http'
+        results.append(result)
+        print(json.dumps(result))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, nargs='+', default=[50, 200, 1000])
+    parser.add_argument('--rounds', type=int, default=12, help='bcrypt cost factor for local mode')
+    parser.add_argument('--workers', type=int, default=None, help='hashing pool processes')
+    parser.add_argument('--max-pending', type=int, default=None, help='hashing queue bound')
+    parser.add_argument('--url', help='benchmark a running server instead of the local hashing paths')
+    parser.add_argument('--force-id', default='100000001')
+    parser.add_argument('--password', default='soldier123')
+    args = parser.parse_args()
+
+    if args.url:
+        bench_http(args.url, args.users, args.force_id, args.password)
+    else:
+        # Default to an unbounded queue so the comparison measures throughput, not rejections
+        max_pending = args.max_pending or max(args.users)
+        bench_local(args.users, args.rounds, args.workers, max_pending)
+
+
+if __name__ == '__main__':
+    main()
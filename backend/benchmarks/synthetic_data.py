@@ -0,0 +1,364 @@
+"""
+Deterministic synthetic data generator for load and scale testing.
+
+Fills users, questionnaires, questions, weekly_sessions, question_responses,
+cctv_daily_monitoring and cctv_detections with reproducible data: the same
+--seed and parameters always produce the same rows. Rows are generated
+lazily and bulk-loaded with multi-row INSERTs or LOAD DATA LOCAL INFILE, so
+memory stays flat at any scale.
+
+Synthetic soldiers get force IDs <prefix><8 digits> (default prefix 8) and
+the password soldier123; the admin is <prefix>00000000 / admin123. CCTV
+detection scores use the production emotion_mapping scale (-1..3), survey
+scores the 0..1 sentiment scale.
+
+Only runs against a dedicated benchmark database, marked by the
+system_settings row 'benchmark_database'. The first run claims an empty
+database (no users) by adding the marker; any other unmarked database is
+refused, so --clear can never delete real soldiers that share the prefix.
+
+    python -m benchmarks.synthetic_data --soldiers 100 --weeks 4
+    python -m benchmarks.synthetic_data --soldiers 10000 --weeks 52 --detections-per-day 200 --method load-data
+    python -m benchmarks.synthetic_data --clear
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from db.connection import get_connection
+from services.risk_engine import CCTV_SCORE_RANGE
+
+# Same hashes as insert_dummy_data.py
+ADMIN_PASSWORD_HASH = "$2b$12$/ut9lTTVvcqj7XmR5l71b.huCLg6lLUhDSYQOWFOnL3X2lC3SzjSm"  # admin123
+SOLDIER_PASSWORD_HASH = "$2b$12$xDOSBxFahty99A9c.Kosp.Ndw6.S5m8yuUiv/I0ZrE6zqo6pL6GiC"  # soldier123
+
+QUESTIONNAIRE_TITLE = 'Synthetic Weekly Assessment'
+
+BENCHMARK_MARKER = 'benchmark_database'
+
+ANSWERS = [
+    "I am feeling okay.",
+    "I feel good and rested this week.",
+    "Work has been stressful and I am tired.",
+    "I have trouble sleeping and feel low.",
+    "Everything is fine, thank you.",
+    "I miss my family and feel lonely.",
+]
+
+MONITORING_START = 9 * 3600   # 09:00
+MONITORING_END = 17 * 3600    # 17:00
+
+
+class BulkLoader:
+    """
+    Buffers rows for one table and loads them in bulk.
+
+    'insert' sends multi-row INSERT statements of `batch_size` rows;
+    'load-data' spools rows to a temporary tab-separated file and loads each
+    `batch_size` * 20 rows with LOAD DATA LOCAL INFILE. Loaders in
+    `depends_on` (parent tables) are flushed first so foreign keys hold.
+    """
+
+    def __init__(self, conn, table, columns, method='insert', batch_size=5000, depends_on=()):
+        self.conn = conn
+        self.depends_on = depends_on
+        self.table = table
+        self.columns = columns
+        self.method = method
+        self.batch_size = batch_size if method == 'insert' else batch_size * 20
+        self.rows = 0
+        self.elapsed = 0.0
+        self._pending = []
+
+    def add(self, row):
+        self._pending.append(row)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        for parent in self.depends_on:
+            parent.flush()
+        start = time.perf_counter()
+        cursor = self.conn.cursor()
+        try:
+            if self.method == 'insert':
+                placeholders = ', '.join(['%s'] * len(self.columns))
+                cursor.executemany(
+                    f"INSERT INTO {self.table} ({', '.join(self.columns)}) VALUES ({placeholders})",
+                    self._pending
+                )
+            else:
+                self._load_data(cursor)
+            self.conn.commit()
+        finally:
+            cursor.close()
+        self.rows += len(self._pending)
+        self.elapsed += time.perf_counter() - start
+        self._pending = []
+
+    def _load_data(self, cursor):
+        # Generated values never contain tabs, newlines or backslashes, so no escaping is needed
+        with tempfile.NamedTemporaryFile('w', suffix='.tsv', delete=False, newline='', encoding='utf-8') as f:
+            for row in self._pending:
+                f.write('\t'.join('\\N' if value is None else str(value) for value in row))
+                f.write('\n')
+            path = f.name
+        try:
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {self.table} "
+                f"CHARACTER SET utf8mb4 FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' "
+                f"({', '.join(self.columns)})",
+                (path,)
+            )
+        finally:
+            os.remove(path)
+
+    def stats(self):
+        return {
+            'table': self.table,
+            'rows': self.rows,
+            'elapsed_s': round(self.elapsed, 3),
+            'rows_per_sec': round(self.rows / self.elapsed, 1) if self.elapsed > 0 else None
+        }
+
+
+def clamp(value):
+    return min(1.0, max(0.0, value))
+
+
+def to_cctv_scale(value):
+    """Map a 0..1 depression level onto the emotion_mapping scale (Happy = -1 ... Sad = 3)"""
+    low, high = CCTV_SCORE_RANGE
+    return low + clamp(value) * (high - low)
+
+
+def ensure_benchmark_database(conn):
+    """
+    Raise unless the database is marked as a benchmark database; an empty
+    database (no users yet) is marked on first use
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT setting_value FROM system_settings WHERE setting_name = %s", (BENCHMARK_MARKER,))
+        if cursor.fetchone():
+            return
+        cursor.execute("SELECT COUNT(*) FROM users")
+        if cursor.fetchone()[0]:
+            raise Exception(
+                "Refusing to generate or clear synthetic data: this database has users but is not marked as a "
+                f"benchmark database (system_settings '{BENCHMARK_MARKER}'). Use a dedicated, empty database."
+            )
+        cursor.execute("""
+            INSERT INTO system_settings (setting_name, setting_value, description)
+            VALUES (%s, 'true', 'Holds synthetic data from benchmarks.synthetic_data')
+        """, (BENCHMARK_MARKER,))
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+class SyntheticDataGenerator:
+    def __init__(self, soldiers=100, weeks=4, questions=10, detections_per_day=100,
+                 seed=42, end_date=None, id_prefix='8', method='insert', batch_size=5000):
+        self.soldiers = soldiers
+        self.weeks = weeks
+        self.questions = questions
+        self.detections_per_day = detections_per_day
+        self.seed = seed
+        self.end_date = end_date or date.today()
+        self.start_date = self.end_date - timedelta(days=weeks * 7 - 1)
+        self.id_prefix = id_prefix
+        self.method = method
+        self.batch_size = batch_size
+
+    def _rng(self, stream):
+        # Independent streams so changing one parameter doesn't reshuffle other tables
+        return random.Random(f"{self.seed}:{stream}")
+
+    def force_id(self, index):
+        return f"{self.id_prefix}{index:08d}"
+
+    def _baselines(self):
+        """Per-soldier baseline depression score, mostly low with a high-risk tail"""
+        rng = self._rng('baselines')
+        return [clamp(rng.betavariate(2, 5)) for _ in range(self.soldiers)]
+
+    def _next_id(self, cursor, table, column):
+        cursor.execute(f"SELECT COALESCE(MAX({column}), 0) + 1 FROM {table}")
+        return cursor.fetchone()[0]
+
+    def _loader(self, conn, table, columns, depends_on=()):
+        return BulkLoader(conn, table, columns, self.method, self.batch_size, depends_on)
+
+    def generate(self):
+        """Insert all synthetic data; returns per-table load statistics"""
+        conn = get_connection(allow_local_infile=self.method == 'load-data')
+        cursor = None
+        results = []
+        try:
+            ensure_benchmark_database(conn)
+            cursor = conn.cursor()
+            cursor.execute("SET SESSION unique_checks = 0")
+            baselines = self._baselines()
+
+            users = self._loader(conn, 'users', ['force_id', 'password_hash', 'user_type'])
+            users.add((self.force_id(0), ADMIN_PASSWORD_HASH, 'admin'))
+            for index in range(1, self.soldiers + 1):
+                users.add((self.force_id(index), SOLDIER_PASSWORD_HASH, 'soldier'))
+            users.flush()
+            results.append(users.stats())
+
+            cursor.execute("""
+                INSERT INTO questionnaires (title, description, status, total_questions)
+                VALUES (%s, %s, 'Active', %s)
+            """, (QUESTIONNAIRE_TITLE, 'Generated by benchmarks.synthetic_data', self.questions))
+            questionnaire_id = cursor.lastrowid
+            first_question_id = self._next_id(cursor, 'questions', 'question_id')
+            question_ids = list(range(first_question_id, first_question_id + self.questions))
+            questions = self._loader(conn, 'questions',
+                                     ['question_id', 'questionnaire_id', 'question_text', 'question_text_hindi'])
+            for number, question_id in enumerate(question_ids, 1):
+                questions.add((question_id, questionnaire_id,
+                               f"Synthetic question {number}: how have you been feeling?",
+                               f"कृत्रिम प्रश्न {number}: आप कैसा महसूस कर रहे हैं?"))
+            questions.flush()
+            results.append(questions.stats())
+
+            results.extend(self._generate_surveys(conn, cursor, baselines, questionnaire_id, question_ids))
+            results.extend(self._generate_detections(conn, cursor, baselines))
+            return results
+        finally:
+            if cursor:
+                cursor.close()
+            conn.close()
+
+    def _generate_surveys(self, conn, cursor, baselines, questionnaire_id, question_ids):
+        rng = self._rng('surveys')
+        sessions = self._loader(conn, 'weekly_sessions', [
+            'session_id', 'force_id', 'questionnaire_id', 'year', 'start_timestamp',
+            'completion_timestamp', 'status', 'nlp_avg_score', 'image_avg_score', 'combined_avg_score'
+        ])
+        responses = self._loader(conn, 'question_responses', [
+            'session_id', 'question_id', 'answer_text', 'nlp_depression_score',
+            'image_depression_score', 'combined_depression_score', 'timestamp'
+        ], depends_on=[sessions])
+        session_id = self._next_id(cursor, 'weekly_sessions', 'session_id')
+
+        for week in range(self.weeks):
+            week_start = datetime.combine(self.start_date + timedelta(days=week * 7), datetime.min.time())
+            for index, baseline in enumerate(baselines, 1):
+                started = week_start + timedelta(seconds=rng.randrange(5 * 86400))
+                if rng.random() < 0.05:
+                    sessions.add((session_id, self.force_id(index), questionnaire_id, started.year,
+                                  started, None, 'missed', None, None, None))
+                    session_id += 1
+                    continue
+
+                scores = [clamp(baseline + rng.gauss(0, 0.15)) for _ in question_ids]
+                average = sum(scores) / len(scores) if scores else None
+                completed = started + timedelta(seconds=rng.randrange(120, 900))
+                sessions.add((session_id, self.force_id(index), questionnaire_id, started.year,
+                              started, completed, 'completed', average, None, average))
+                for question_id, score in zip(question_ids, scores):
+                    responses.add((session_id, question_id, rng.choice(ANSWERS),
+                                   round(score, 4), None, round(score, 4), completed))
+                session_id += 1
+
+        responses.flush()
+        sessions.flush()
+        return [sessions.stats(), responses.stats()]
+
+    def _generate_detections(self, conn, cursor, baselines):
+        rng = self._rng('detections')
+        monitoring = self._loader(conn, 'cctv_daily_monitoring',
+                                  ['monitoring_id', 'date', 'start_time', 'end_time', 'status'])
+        detections = self._loader(conn, 'cctv_detections',
+                                  ['monitoring_id', 'force_id', 'detection_timestamp', 'depression_score'])
+        monitoring_id = self._next_id(cursor, 'cctv_daily_monitoring', 'monitoring_id')
+        spacing = (MONITORING_END - MONITORING_START) / max(self.detections_per_day, 1)
+
+        for day_offset in range(self.weeks * 7):
+            day = self.start_date + timedelta(days=day_offset)
+            midnight = datetime.combine(day, datetime.min.time())
+            monitoring.add((monitoring_id, day, '09:00:00', '17:00:00', 'completed'))
+            monitoring.flush()  # Detections reference the monitoring row
+
+            for index, baseline in enumerate(baselines, 1):
+                daily = clamp(baseline + rng.gauss(0, 0.05))
+                force_id = self.force_id(index)
+                for n in range(self.detections_per_day):
+                    offset = MONITORING_START + n * spacing + rng.random() * spacing
+                    detections.add((monitoring_id, force_id,
+                                    midnight + timedelta(seconds=int(offset)),
+                                    round(to_cctv_scale(daily + rng.gauss(0, 0.1)), 4)))
+            monitoring_id += 1
+
+        detections.flush()
+        return [monitoring.stats(), detections.stats()]
+
+    def clear(self):
+        """Delete synthetic soldiers and everything generated for them"""
+        conn = get_connection()
+        cursor = None
+        pattern = f"{self.id_prefix}%"
+        try:
+            ensure_benchmark_database(conn)
+            cursor = conn.cursor()
+            # Detections have no foreign keys (partitioned table), so delete them explicitly in batches
+            while True:
+                cursor.execute("DELETE FROM cctv_detections WHERE force_id LIKE %s LIMIT 50000", (pattern,))
+                conn.commit()
+                if cursor.rowcount < 50000:
+                    break
+            # Sessions, responses and scores cascade from users
+            cursor.execute("DELETE FROM users WHERE force_id LIKE %s", (pattern,))
+            cursor.execute("DELETE FROM questionnaires WHERE title = %s", (QUESTIONNAIRE_TITLE,))
+            cursor.execute("""
+                DELETE m FROM cctv_daily_monitoring m
+                LEFT JOIN cctv_detections d ON d.monitoring_id = m.monitoring_id
+                WHERE d.monitoring_id IS NULL
+            """)
+            conn.commit()
+        finally:
+            if cursor:
+                cursor.close()
+            conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--soldiers', type=int, default=100)
+    parser.add_argument('--weeks', type=int, default=4)
+    parser.add_argument('--questions', type=int, default=10)
+    parser.add_argument('--detections-per-day', type=int, default=100,
+                        help='detections per soldier per day (a full 8h day at 3s intervals is 9600)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--end-date', type=lambda s: datetime.strptime(s, '%Y-%m-%d').date(),
+                        help='last generated day (default: today); fix it for byte-identical reruns')
+    parser.add_argument('--id-prefix', default='8', help='first digit of synthetic force IDs')
+    parser.add_argument('--method', choices=['insert', 'load-data'], default='insert')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--clear', action='store_true', help='delete previously generated data and exit')
+    args = parser.parse_args()
+
+    generator = SyntheticDataGenerator(
+        soldiers=args.soldiers, weeks=args.weeks, questions=args.questions,
+        detections_per_day=args.detections_per_day, seed=args.seed, end_date=args.end_date,
+        id_prefix=args.id_prefix, method=args.method, batch_size=args.batch_size
+    )
+    if args.clear:
+        generator.clear()
+        print(json.dumps({'cleared': args.id_prefix}))
+        return
+    for stats in generator.generate():
+        print(json.dumps(stats))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+"""
+Vision pipeline micro-benchmarks.
+
+Times the stages of EmotionDetectionService.detect_face_and_emotion in
+isolation and end to end:
+
+  haar     - Haar cascade face detection on the grayscale frame
+  roi      - the same with RoiFaceDetector scanning around tracked faces
+  encode   - dlib face encoding of each detected face
+  match    - compare_faces against galleries of --gallery-sizes encodings
+  cnn      - emotion CNN prediction at --batch-sizes
+  pipeline - detect_face_and_emotion itself on every frame
+
+Frames are the images under the given paths (default tests/test_images) plus
+synthetic composites tiling --faces copies of them into one frame. Each stage
+reports throughput, p50/p95 latency and the peak RSS growth of the process.
+Runs offline on CPU; when model/emotion_model.h5 is missing the CNN keeps its
+random initial weights, which doesn't change its speed.
+
+    python -m benchmarks.vision_pipeline
+    python -m benchmarks.vision_pipeline storage/uploads --gallery-sizes 100 10000 --batch-sizes 1 32 128
+"""
+import os
+
+# Benchmark the CPU path even on machines with a GPU
+os.environ.setdefault('CUDA_VISIBLE_DEVICES', '-1')
+
+import argparse
+import json
+import math
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.common import percentile
+from benchmarks.face_encoding import find_images
+from services.roi_face_detector import RoiFaceDetector, load_face_cascade
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if os.uname().sysname == 'Darwin' else peak / 1024
+
+
+def measure(stage, fn, items, repeat, unit_count=lambda item: 1, **extra):
+    """Run fn over items `repeat` times and print one JSON result line"""
+    rss_before = peak_rss_mb()
+    latencies = []
+    units = 0
+    for _ in range(repeat):
+        for item in items:
+            start = time.perf_counter()
+            fn(item)
+            latencies.append(time.perf_counter() - start)
+            units += unit_count(item)
+    total = sum(latencies)
+    rss_after = peak_rss_mb()
+    result = {
+        'stage': stage,
+        **extra,
+        'calls': len(latencies),
+        'per_sec': round(units / total, 2) if total > 0 else None,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'peak_rss_mb': round(rss_after, 1) if rss_after is not None else None,
+        'peak_rss_growth_mb': round(rss_after - rss_before, 1) if rss_after is not None else None
+    }
+    print(json.dumps(result))
+    return result
+
+
+def make_composites(images, faces, tile=320):
+    """Tile `faces` images (cycling through them) into one grid frame"""
+    cols = math.ceil(math.sqrt(faces))
+    rows = math.ceil(faces / cols)
+    frame = np.zeros((rows * tile, cols * tile, 3), dtype=np.uint8)
+    for n in range(faces):
+        image = cv2.resize(images[n % len(images)], (tile, tile), interpolation=cv2.INTER_AREA)
+        r, c = divmod(n, cols)
+        frame[r * tile:(r + 1) * tile, c * tile:(c + 1) * tile] = image
+    return frame
+
+
+def load_emotion_model(model_dir):
+    from keras.models import model_from_json
+    with open(os.path.join(model_dir, 'emotion_model.json')) as f:
+        model = model_from_json(f.read())
+    weights = os.path.join(model_dir, 'emotion_model.h5')
+    if os.path.exists(weights):
+        model.load_weights(weights)
+    return model
+
+
+def synthetic_gallery(size, seed=0):
+    """Random unit-length 128-d encodings, roughly the spread of real ones"""
+    rng = np.random.default_rng(seed)
+    encodings = rng.normal(size=(size, 128))
+    encodings /= np.linalg.norm(encodings, axis=1, keepdims=True)
+    return encodings * 0.9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='*', default=['tests/test_images'])
+    parser.add_argument('--faces', type=int, nargs='+', default=[2, 4, 9], help='faces per synthetic composite')
+    parser.add_argument('--gallery-sizes', type=int, nargs='+', default=[10, 100, 1000, 10000])
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 32, 64])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--model-dir', default='model')
+    parser.add_argument('--full-scan-interval', type=int, default=10, help='for the roi stage')
+    parser.add_argument('--stages', nargs='+', default=['haar', 'roi', 'encode', 'match', 'cnn', 'pipeline'],
+                        choices=['haar', 'roi', 'encode', 'match', 'cnn', 'pipeline'])
+    args = parser.parse_args()
+
+    import face_recognition
+
+    paths = find_images(args.paths)
+    if not paths:
+        parser.error("No images found")
+    images = [cv2.imread(path) for path in paths]
+    frames = [('image', image) for image in images]
+    frames += [(f'composite_{n}', make_composites(images, n)) for n in args.faces]
+
+    detector = load_face_cascade()
+
+    def detect(frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return detector.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
+
+    # Detections and encodings computed once feed the later isolated stages
+    detections = [(kind, frame, detect(frame)) for kind, frame in frames]
+    rgb_faces = [
+        (cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), [(y, x + w, y + h, x) for x, y, w, h in faces])
+        for _, frame, faces in detections if len(faces)
+    ]
+    encodings = [enc for rgb, locations in rgb_faces for enc in face_recognition.face_encodings(rgb, locations)]
+    print(json.dumps({
+        'frames': len(frames),
+        'faces_detected': sum(len(faces) for _, _, faces in detections),
+        'encodings': len(encodings)
+    }))
+
+    if 'haar' in args.stages:
+        for kind in sorted({kind for kind, _ in frames}):
+            measure('haar', detect, [frame for k, frame in frames if k == kind], args.repeat, frames=kind)
+
+    if 'roi' in args.stages:
+        # Each frame is repeated as a static "video" so tracks can be reused
+        for kind in sorted({kind for kind, _ in frames}):
+            roi = RoiFaceDetector(detector, full_scan_interval=args.full_scan_interval)
+            grays = [cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for k, frame in frames if k == kind]
+            for gray in grays:
+                roi.reset()
+                measure('roi', roi.detect, [gray] * args.full_scan_interval * 2, args.repeat,
+                        frames=kind, full_scan_interval=args.full_scan_interval)
+
+    if 'encode' in args.stages and rgb_faces:
+        measure('encode', lambda item: face_recognition.face_encodings(*item), rgb_faces, args.repeat,
+                unit_count=lambda item: len(item[1]))
+
+    if 'match' in args.stages and encodings:
+        for size in args.gallery_sizes:
+            gallery = list(synthetic_gallery(size))
+            measure('match', lambda enc: face_recognition.compare_faces(gallery, enc, tolerance=0.6),
+                    encodings, args.repeat, gallery_size=size)
+
+    model = None
+    if 'cnn' in args.stages or 'pipeline' in args.stages:
+        model = load_emotion_model(args.model_dir)
+
+    if 'cnn' in args.stages:
+        rng = np.random.default_rng(0)
+        for batch_size in args.batch_sizes:
+            batch = rng.random((batch_size, 48, 48, 1)).astype('float32')
+            model.predict(batch, verbose=0)  # Warm-up builds the graph
+            measure('cnn', lambda b: model.predict(b, verbose=0), [batch], args.repeat * 4,
+                    unit_count=lambda b: len(b), batch_size=batch_size)
+
+    if 'pipeline' in args.stages and encodings:
+        from services.emotion_detection_service import EmotionDetectionService
+
+        class BenchmarkEmotionService(EmotionDetectionService):
+            """Uses the models loaded here instead of the trained gallery on disk"""
+
+            def _load_models(self):
+                self.emotion_model = model
+                self.face_detector = detector
+                self.face_locator = RoiFaceDetector(detector, full_scan_interval=1)
+
+        service = BenchmarkEmotionService()
+        for size in args.gallery_sizes:
+            gallery = list(synthetic_gallery(max(size - len(encodings), 0))) + encodings
+            service.known_face_encodings = gallery
+            service.known_force_ids = [f"{n:09d}" for n in range(len(gallery))]
+            measure('pipeline', service.detect_face_and_emotion, [frame for _, frame in frames],
+                    args.repeat, gallery_size=len(gallery))
+
+
+if __name__ == '__main__':
+    main()
@@ -18,9 +18,10 @@
 print(f"Loading environment from: {env_path}")
 print(f"Connecting to database: {DB_NAME} on {DB_HOST}:{DB_PORT} as {DB_USER}")
 
-def get_connection():
+def get_connection(**options):
     """
     Returns a new MySQL connection.
+    Extra keyword arguments (e.g. allow_local_infile=True) are passed to mysql.connector.connect.
     """
     try:
         connection = mysql.connector.connect(
@@ -28,7 +29,8 @@ def get_connection():
             port=DB_PORT,
             user=DB_USER,
             password=DB_PASSWORD,
-            database=DB_NAME
+            database=DB_NAME,
+            **options
         )
         return connection
     except mysql.connector.Error as e:
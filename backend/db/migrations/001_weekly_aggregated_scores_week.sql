@@ -0,0 +1,16 @@
+-- Adds the ISO week to weekly_aggregated_scores so each soldier has one row per week.
+--
+-- DATA LOSS: existing rows carry no week and cannot satisfy the new unique
+-- key, so they are removed from weekly_aggregated_scores. They are copied to
+-- weekly_aggregated_scores_legacy first; drop that table once it is no longer
+-- needed. Re-run the risk engine (python -m services.risk_engine
+-- --year-week <YYYYWW>) to repopulate the weeks still of interest.
+CREATE TABLE weekly_aggregated_scores_legacy AS SELECT * FROM weekly_aggregated_scores;
+
+DELETE FROM weekly_aggregated_scores;
+
+ALTER TABLE weekly_aggregated_scores
+    ADD COLUMN week INT NOT NULL AFTER year,
+    ADD COLUMN computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    ADD UNIQUE KEY uq_weekly_scores (force_id, year, week),
+    ADD INDEX idx_weekly_scores_week (year, week);
@@ -0,0 +1,19 @@
+-- Converts cctv_detections to a monthly range-partitioned table.
+-- Partitioned tables cannot have foreign keys, so the constraints are dropped
+-- (names are MySQL's defaults; check SHOW CREATE TABLE cctv_detections first).
+-- This copies the table once; run it in a maintenance window. Monthly
+-- partitions are then created by DetectionRetentionService.ensure_partitions().
+ALTER TABLE cctv_detections
+    DROP FOREIGN KEY cctv_detections_ibfk_1,
+    DROP FOREIGN KEY cctv_detections_ibfk_2;
+
+ALTER TABLE cctv_detections
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (detection_id, detection_timestamp),
+    ADD INDEX idx_detections_monitoring (monitoring_id),
+    ADD INDEX idx_detections_soldier_time (force_id, detection_timestamp);
+
+ALTER TABLE cctv_detections
+    PARTITION BY RANGE (UNIX_TIMESTAMP(detection_timestamp)) (
+        PARTITION p_future VALUES LESS THAN MAXVALUE
+    );
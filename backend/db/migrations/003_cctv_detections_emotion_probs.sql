@@ -0,0 +1,5 @@
+-- Stores the quantized emotion probability vector of each averaged detection,
+-- so scores can be recomputed offline without re-running inference. Existing
+-- rows keep NULL.
+ALTER TABLE cctv_detections
+    ADD COLUMN emotion_probs BINARY(7) NULL AFTER depression_score;
@@ -0,0 +1,6 @@
+-- Face crops live in the content-addressed blob store under storage/ (see
+-- services/blob_store.py); detections only reference a sampled crop by hash.
+-- The crop is written in the background, so a hash may name a blob that was
+-- never written; readers treat that as no crop.
+ALTER TABLE cctv_detections
+    ADD COLUMN face_crop_hash CHAR(64) CHARACTER SET ascii NULL AFTER emotion_probs;
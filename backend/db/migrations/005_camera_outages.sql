@@ -0,0 +1,15 @@
+-- Camera health: outage intervals per monitoring session and the session's
+-- camera uptime.
+ALTER TABLE cctv_daily_monitoring
+    ADD COLUMN camera_uptime_ratio FLOAT NULL AFTER status;
+
+CREATE TABLE IF NOT EXISTS camera_outages (
+    outage_id INT AUTO_INCREMENT PRIMARY KEY,
+    monitoring_id INT NOT NULL,
+    started_at DATETIME NOT NULL,
+    ended_at DATETIME NULL,
+    reason ENUM('read_failures', 'stale') NOT NULL,
+    reconnect_attempts INT NOT NULL DEFAULT 0,
+    INDEX idx_outages_monitoring (monitoring_id),
+    FOREIGN KEY (monitoring_id) REFERENCES cctv_daily_monitoring(monitoring_id) ON DELETE CASCADE
+);
@@ -0,0 +1,9 @@
+-- Token revocations shared between API workers: logouts and used refresh
+-- tokens are recorded here instead of in each process's memory.
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    jti CHAR(32) CHARACTER SET ascii PRIMARY KEY,
+    expires_at DATETIME NOT NULL,
+    revoked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_revoked_tokens_revoked (revoked_at),
+    INDEX idx_revoked_tokens_expires (expires_at)
+);
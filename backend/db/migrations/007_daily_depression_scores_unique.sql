@@ -0,0 +1,11 @@
+-- One daily_depression_scores row per soldier and day: stop_monitoring and
+-- calculate_daily_scores both upsert it. Older duplicates are dropped first,
+-- keeping the most recent row of each (force_id, date).
+DELETE older FROM daily_depression_scores older
+JOIN daily_depression_scores newer
+    ON newer.force_id = older.force_id
+    AND newer.date = older.date
+    AND newer.score_id > older.score_id;
+
+ALTER TABLE daily_depression_scores
+    ADD UNIQUE KEY uq_daily_scores_soldier_date (force_id, date);
@@ -64,18 +64,45 @@ CREATE TABLE IF NOT EXISTS cctv_daily_monitoring (
     date DATE NOT NULL,
     start_time TIME NOT NULL,
     end_time TIME NULL,
-    status ENUM('completed', 'partial', 'failed') NOT NULL
+    status ENUM('completed', 'partial', 'failed') NOT NULL,
+    -- Share of the session the camera delivered frames, set when monitoring stops
+    camera_uptime_ratio FLOAT NULL
+);
+
+-- Camera outages during a monitoring session (recorded by CCTVMonitoringService)
+CREATE TABLE IF NOT EXISTS camera_outages (
+    outage_id INT AUTO_INCREMENT PRIMARY KEY,
+    monitoring_id INT NOT NULL,
+    started_at DATETIME NOT NULL,
+    ended_at DATETIME NULL,
+    reason ENUM('read_failures', 'stale') NOT NULL,
+    reconnect_attempts INT NOT NULL DEFAULT 0,
+    INDEX idx_outages_monitoring (monitoring_id),
+    FOREIGN KEY (monitoring_id) REFERENCES cctv_daily_monitoring(monitoring_id) ON DELETE CASCADE
 );
 
 -- CCTV Detections Table
+-- Partitioned by month (partitions are added and expired by DetectionRetentionService).
+-- Partitioned tables cannot have foreign keys, and the partition column must be
+-- part of the primary key.
 CREATE TABLE IF NOT EXISTS cctv_detections (
-    detection_id INT AUTO_INCREMENT PRIMARY KEY,
+    detection_id INT AUTO_INCREMENT,
     monitoring_id INT NOT NULL,
     force_id CHAR(9),
     detection_timestamp TIMESTAMP NOT NULL,
     depression_score FLOAT,
-    FOREIGN KEY (monitoring_id) REFERENCES cctv_daily_monitoring(monitoring_id) ON DELETE CASCADE,
-    FOREIGN KEY (force_id) REFERENCES users(force_id) ON DELETE SET NULL
+    -- Mean emotion probabilities of the averaging window, one byte per class
+    -- (emotion_dict order) summing to 255; see services/emotion_smoothing.py
+    emotion_probs BINARY(7) NULL,
+    -- SHA-256 of the sampled face crop in the blob store (storage/face_crops);
+    -- written in the background, so the blob may be missing if that failed
+    face_crop_hash CHAR(64) CHARACTER SET ascii NULL,
+    PRIMARY KEY (detection_id, detection_timestamp),
+    INDEX idx_detections_monitoring (monitoring_id),
+    INDEX idx_detections_soldier_time (force_id, detection_timestamp)
+)
+PARTITION BY RANGE (UNIX_TIMESTAMP(detection_timestamp)) (
+    PARTITION p_future VALUES LESS THAN MAXVALUE
 );
 
 -- Daily Depression Scores Table
@@ -85,6 +112,7 @@ CREATE TABLE IF NOT EXISTS daily_depression_scores (
     date DATE NOT NULL,
     avg_depression_score FLOAT,
     detection_count INT,
+    UNIQUE KEY uq_daily_scores_soldier_date (force_id, date),
     FOREIGN KEY (force_id) REFERENCES users(force_id) ON DELETE CASCADE
 );
 
@@ -93,10 +121,16 @@ CREATE TABLE IF NOT EXISTS weekly_aggregated_scores (
     aggregation_id INT AUTO_INCREMENT PRIMARY KEY,
     force_id CHAR(9) NOT NULL,
     year INT NOT NULL,
+    week INT NOT NULL,
+    -- All three scores are 0..1; cctv_score is the weekly CCTV average
+    -- rescaled from the emotion_mapping scale (-1..3), see services/risk_engine.py
     questionnaire_score FLOAT,
     cctv_score FLOAT,
     combined_weekly_score FLOAT,
     risk_level ENUM('low', 'medium', 'high', 'critical'),
+    computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_weekly_scores (force_id, year, week),
+    INDEX idx_weekly_scores_week (year, week),
     FOREIGN KEY (force_id) REFERENCES users(force_id) ON DELETE CASCADE
 );
 
@@ -119,3 +153,61 @@ CREATE TABLE IF NOT EXISTS system_settings (
     updated_by INT,
     FOREIGN KEY (updated_by) REFERENCES users(user_id) ON DELETE SET NULL
 );
+
+-- Per-Soldier Daily Summary (maintained incrementally from cctv_detections)
+CREATE TABLE IF NOT EXISTS soldier_daily_summary (
+    force_id CHAR(9) NOT NULL,
+    summary_date DATE NOT NULL,
+    detection_count INT NOT NULL DEFAULT 0,
+    detection_score_sum DOUBLE NOT NULL DEFAULT 0,
+    avg_depression_score DOUBLE AS (detection_score_sum / NULLIF(detection_count, 0)) VIRTUAL,
+    PRIMARY KEY (force_id, summary_date),
+    INDEX idx_soldier_daily_date (summary_date),
+    FOREIGN KEY (force_id) REFERENCES users(force_id) ON DELETE CASCADE
+);
+
+-- Per-Soldier Weekly Summary (ISO weeks, year_week = YEARWEEK(ts, 3))
+CREATE TABLE IF NOT EXISTS soldier_weekly_summary (
+    force_id CHAR(9) NOT NULL,
+    year_week INT NOT NULL,
+    week_start DATE NOT NULL,
+    detection_count INT NOT NULL DEFAULT 0,
+    detection_score_sum DOUBLE NOT NULL DEFAULT 0,
+    cctv_avg_score DOUBLE AS (detection_score_sum / NULLIF(detection_count, 0)) VIRTUAL,
+    survey_count INT NOT NULL DEFAULT 0,
+    survey_score_sum DOUBLE NOT NULL DEFAULT 0,
+    survey_avg_score DOUBLE AS (survey_score_sum / NULLIF(survey_count, 0)) VIRTUAL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (force_id, year_week),
+    INDEX idx_soldier_weekly_week (year_week, force_id),
+    FOREIGN KEY (force_id) REFERENCES users(force_id) ON DELETE CASCADE
+);
+
+-- Unit Daily Summary (all soldiers)
+CREATE TABLE IF NOT EXISTS unit_daily_summary (
+    summary_date DATE PRIMARY KEY,
+    soldiers_detected INT NOT NULL DEFAULT 0,
+    detection_count INT NOT NULL DEFAULT 0,
+    detection_score_sum DOUBLE NOT NULL DEFAULT 0,
+    avg_depression_score DOUBLE AS (detection_score_sum / NULLIF(detection_count, 0)) VIRTUAL,
+    surveys_completed INT NOT NULL DEFAULT 0,
+    survey_score_sum DOUBLE NOT NULL DEFAULT 0,
+    avg_survey_score DOUBLE AS (survey_score_sum / NULLIF(surveys_completed, 0)) VIRTUAL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Summary Refresh Watermarks (last source row folded into the summaries)
+CREATE TABLE IF NOT EXISTS summary_watermarks (
+    source_table VARCHAR(64) PRIMARY KEY,
+    last_id BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Revoked JWTs (logouts and used refresh tokens), shared by all API workers
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    jti CHAR(32) CHARACTER SET ascii PRIMARY KEY,
+    expires_at DATETIME NOT NULL,
+    revoked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_revoked_tokens_revoked (revoked_at),
+    INDEX idx_revoked_tokens_expires (expires_at)
+);
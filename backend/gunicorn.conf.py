@@ -0,0 +1,11 @@
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("WEB_THREADS", 4))
+# Each open /api/admin/monitoring/events stream holds a thread; use e.g. gevent
+# when many dashboards stay connected
+worker_class = os.getenv("WEB_WORKER_CLASS", "gthread")
+timeout = int(os.getenv("WEB_TIMEOUT", 120))
+accesslog = "-"
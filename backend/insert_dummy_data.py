@@ -30,29 +30,29 @@ def insert_dummy_data():
                 """, (force_id, hashed_pw, role)
             )
 
+        # Questions (English, Hindi)
+        questions = [
+            ("How do you feel today?", "आज आप कैसा महसूस कर रहे हैं?"),
+            ("Did you experience any stress this week?", "क्या इस सप्ताह आपको कोई तनाव हुआ?"),
+            ("Are you sleeping well?", "क्या आप अच्छी तरह सो रहे हैं?"),
+            ("Do you feel emotionally supported?", "क्या आपको भावनात्मक सहारा महसूस होता है?")
+        ]
+
         # Questionnaires
         cursor.execute("""
-            INSERT INTO questionnaires (title, description, status, created_at)
-            VALUES ('Weekly Mental Health Check', 'Standard weekly assessment for emotional well-being.', 'Active', NOW())
-        """)
+            INSERT INTO questionnaires (title, description, status, total_questions, created_at)
+            VALUES ('Weekly Mental Health Check', 'Standard weekly assessment for emotional well-being.', 'Active', %s, NOW())
+        """, (len(questions),))
 
         cursor.execute("SELECT LAST_INSERT_ID()")
         questionnaire_id = cursor.fetchone()[0]
 
-        # Questions
-        questions = [
-            "How do you feel today?",
-            "Did you experience any stress this week?",
-            "Are you sleeping well?",
-            "Do you feel emotionally supported?"
-        ]
-
         question_ids = []
-        for q in questions:
+        for q, q_hindi in questions:
             cursor.execute("""
-                INSERT INTO questions (questionnaire_id, question_text, created_at)
-                VALUES (%s, %s, NOW())
-            """, (questionnaire_id, q))
+                INSERT INTO questions (questionnaire_id, question_text, question_text_hindi, created_at)
+                VALUES (%s, %s, %s, NOW())
+            """, (questionnaire_id, q, q_hindi))
             cursor.execute("SELECT LAST_INSERT_ID()")
             question_ids.append(cursor.fetchone()[0])
 
@@ -107,14 +107,16 @@ def insert_dummy_data():
             cursor.execute("""
                 INSERT INTO daily_depression_scores (force_id, date, avg_depression_score, detection_count)
                 VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE avg_depression_score = VALUES(avg_depression_score),
+                detection_count = VALUES(detection_count)
             """, (force_id, datetime.now().date(), 0.68, 5))
 
         # Weekly Aggregated Scores
         for force_id in dummy_soldiers:
             cursor.execute("""
-                INSERT INTO weekly_aggregated_scores (force_id, year, questionnaire_score, cctv_score, combined_weekly_score, risk_level)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (force_id, datetime.now().year, 0.6, 0.7, 0.65, 'medium'))
+                INSERT INTO weekly_aggregated_scores (force_id, year, week, questionnaire_score, cctv_score, combined_weekly_score, risk_level)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """, (force_id, *datetime.now().isocalendar()[:2], 0.6, 0.7, 0.65, 'medium'))
 
         conn.commit()
         print("✅ Dummy data inserted successfully with correct password hashes.")
@@ -0,0 +1,326 @@
+import argparse
+import logging
+import os
+from datetime import date
+from typing import Dict, List, Optional
+from db.connection import get_connection
+
+logger = logging.getLogger(__name__)
+
+# Source rows folded into the summaries per statement batch
+BATCH_SIZE = 100000
+
+
+class AggregationService:
+    """
+    Maintains materialized dashboard summaries:
+
+    - soldier_daily_summary:  per soldier per day CCTV detection counts/sums
+    - soldier_weekly_summary: per soldier per ISO week CCTV and survey counts/sums
+    - unit_daily_summary:     per day totals across all soldiers
+
+    refresh() folds only source rows newer than the watermark in
+    summary_watermarks into the summaries by adding their counts and sums, so
+    its cost depends on the new rows rather than on history. Averages are
+    generated columns.
+
+    AUTO_INCREMENT ids can commit out of order (a survey transaction that
+    started first may commit after a later one), and a row folded past the
+    watermark would be skipped for good. So refresh() only advances to the
+    highest id inserted at least `safety_lag` seconds ago: every id below it
+    was allocated even earlier, and its transaction has had that long to
+    commit. The default matches the web worker timeout, the longest a
+    request can keep a transaction open. Survey scores changed after
+    submission (for example by update_sentiment_scores.py) are only picked
+    up by rebuild().
+    """
+
+    def __init__(self, safety_lag: Optional[int] = None):
+        self.safety_lag = safety_lag if safety_lag is not None else int(
+            os.getenv('SUMMARY_SAFETY_LAG_SECONDS', os.getenv('WEB_TIMEOUT', 120))
+        )
+
+    def _get_watermark(self, cursor, source_table: str) -> int:
+        cursor.execute(
+            "SELECT last_id FROM summary_watermarks WHERE source_table = %s FOR UPDATE",
+            (source_table,)
+        )
+        row = cursor.fetchone()
+        return row[0] if row else 0
+
+    def _set_watermark(self, cursor, source_table: str, last_id: int):
+        cursor.execute("""
+            INSERT INTO summary_watermarks (source_table, last_id)
+            VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE last_id = VALUES(last_id)
+        """, (source_table, last_id))
+
+    def _fold_detections(self, cursor, low: int, high: int):
+        """Add cctv_detections rows with low < detection_id <= high to the summaries"""
+        cursor.execute("""
+            INSERT INTO soldier_daily_summary (force_id, summary_date, detection_count, detection_score_sum)
+            SELECT force_id, DATE(detection_timestamp), COUNT(*), SUM(depression_score)
+            FROM cctv_detections
+            WHERE detection_id > %s AND detection_id <= %s
+            AND force_id IS NOT NULL AND depression_score IS NOT NULL
+            GROUP BY force_id, DATE(detection_timestamp)
+            ON DUPLICATE KEY UPDATE
+                detection_count = detection_count + VALUES(detection_count),
+                detection_score_sum = detection_score_sum + VALUES(detection_score_sum)
+        """, (low, high))
+
+        cursor.execute("""
+            INSERT INTO soldier_weekly_summary (force_id, year_week, week_start, detection_count, detection_score_sum)
+            SELECT force_id, YEARWEEK(detection_timestamp, 3),
+                   MIN(DATE(detection_timestamp) - INTERVAL WEEKDAY(detection_timestamp) DAY),
+                   COUNT(*), SUM(depression_score)
+            FROM cctv_detections
+            WHERE detection_id > %s AND detection_id <= %s
+            AND force_id IS NOT NULL AND depression_score IS NOT NULL
+            GROUP BY force_id, YEARWEEK(detection_timestamp, 3)
+            ON DUPLICATE KEY UPDATE
+                detection_count = detection_count + VALUES(detection_count),
+                detection_score_sum = detection_score_sum + VALUES(detection_score_sum)
+        """, (low, high))
+
+        # Distinct soldiers per day can't be summed, so recompute the touched
+        # days from the (small) per-soldier daily summary
+        cursor.execute("""
+            SELECT MIN(DATE(detection_timestamp)), MAX(DATE(detection_timestamp))
+            FROM cctv_detections
+            WHERE detection_id > %s AND detection_id <= %s
+        """, (low, high))
+        first_day, last_day = cursor.fetchone()
+        if first_day is None:
+            return
+        cursor.execute("""
+            INSERT INTO unit_daily_summary (summary_date, soldiers_detected, detection_count, detection_score_sum)
+            SELECT summary_date, COUNT(*), SUM(detection_count), SUM(detection_score_sum)
+            FROM soldier_daily_summary
+            WHERE summary_date BETWEEN %s AND %s
+            GROUP BY summary_date
+            ON DUPLICATE KEY UPDATE
+                soldiers_detected = VALUES(soldiers_detected),
+                detection_count = VALUES(detection_count),
+                detection_score_sum = VALUES(detection_score_sum)
+        """, (first_day, last_day))
+
+    def _fold_sessions(self, cursor, low: int, high: int):
+        """Add completed weekly_sessions with low < session_id <= high to the summaries"""
+        cursor.execute("""
+            INSERT INTO soldier_weekly_summary (force_id, year_week, week_start, survey_count, survey_score_sum)
+            SELECT force_id, YEARWEEK(completion_timestamp, 3),
+                   MIN(DATE(completion_timestamp) - INTERVAL WEEKDAY(completion_timestamp) DAY),
+                   COUNT(*), SUM(combined_avg_score)
+            FROM weekly_sessions
+            WHERE session_id > %s AND session_id <= %s
+            AND status = 'completed' AND completion_timestamp IS NOT NULL AND combined_avg_score IS NOT NULL
+            GROUP BY force_id, YEARWEEK(completion_timestamp, 3)
+            ON DUPLICATE KEY UPDATE
+                survey_count = survey_count + VALUES(survey_count),
+                survey_score_sum = survey_score_sum + VALUES(survey_score_sum)
+        """, (low, high))
+
+        cursor.execute("""
+            INSERT INTO unit_daily_summary (summary_date, surveys_completed, survey_score_sum)
+            SELECT DATE(completion_timestamp), COUNT(*), SUM(combined_avg_score)
+            FROM weekly_sessions
+            WHERE session_id > %s AND session_id <= %s
+            AND status = 'completed' AND completion_timestamp IS NOT NULL AND combined_avg_score IS NOT NULL
+            GROUP BY DATE(completion_timestamp)
+            ON DUPLICATE KEY UPDATE
+                surveys_completed = surveys_completed + VALUES(surveys_completed),
+                survey_score_sum = survey_score_sum + VALUES(survey_score_sum)
+        """, (low, high))
+
+    def _refresh_source(self, conn, source_table: str, id_column: str, inserted_column: str, fold) -> int:
+        """
+        Fold new rows of one source table in batches; each batch commits with its watermark.
+        `inserted_column` is the row's insert time, used for the safety lag.
+        """
+        cursor = conn.cursor()
+        folded = 0
+        try:
+            # Walks back from the newest id, so only the last safety_lag seconds of rows are read
+            cursor.execute(f"""
+                SELECT {id_column} FROM {source_table}
+                WHERE {inserted_column} <= NOW() - INTERVAL %s SECOND
+                ORDER BY {id_column} DESC
+                LIMIT 1
+            """, (self.safety_lag,))
+            row = cursor.fetchone()
+            high = row[0] if row else 0
+            while True:
+                low = self._get_watermark(cursor, source_table)
+                if low >= high:
+                    conn.commit()
+                    break
+                batch_high = min(high, low + BATCH_SIZE)
+                fold(cursor, low, batch_high)
+                self._set_watermark(cursor, source_table, batch_high)
+                conn.commit()
+                folded += batch_high - low
+            return folded
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def refresh(self) -> Dict:
+        """
+        Fold new detections and sessions into the summaries
+
+        Returns:
+            dict: Number of source ids folded per table
+        """
+        conn = None
+        try:
+            conn = get_connection()
+            result = {
+                'cctv_detections': self._refresh_source(conn, 'cctv_detections', 'detection_id',
+                                                        'detection_timestamp', self._fold_detections),
+                'weekly_sessions': self._refresh_source(conn, 'weekly_sessions', 'session_id',
+                                                        'start_timestamp', self._fold_sessions)
+            }
+            logger.info(f"Refreshed dashboard summaries: {result}")
+            return result
+        finally:
+            if conn:
+                conn.close()
+
+    def rebuild(self) -> Dict:
+        """
+        Clear all summaries and watermarks and rebuild them from the source tables
+
+        Days whose raw detections were already expired by DetectionRetentionService
+        survive only in soldier_daily_summary, so those rows are kept and the
+        weekly and unit summaries are re-seeded from them.
+        """
+        conn = None
+        cursor = None
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT DATE(MIN(detection_timestamp)) FROM cctv_detections")
+            raw_start = cursor.fetchone()[0]
+            if raw_start is not None:
+                cursor.execute("DELETE FROM soldier_daily_summary WHERE summary_date >= %s", (raw_start,))
+            for table in ('soldier_weekly_summary', 'unit_daily_summary', 'summary_watermarks'):
+                cursor.execute(f"DELETE FROM {table}")
+
+            cursor.execute("""
+                INSERT INTO soldier_weekly_summary (force_id, year_week, week_start, detection_count, detection_score_sum)
+                SELECT force_id, YEARWEEK(summary_date, 3),
+                       MIN(summary_date - INTERVAL WEEKDAY(summary_date) DAY),
+                       SUM(detection_count), SUM(detection_score_sum)
+                FROM soldier_daily_summary
+                GROUP BY force_id, YEARWEEK(summary_date, 3)
+            """)
+            cursor.execute("""
+                INSERT INTO unit_daily_summary (summary_date, soldiers_detected, detection_count, detection_score_sum)
+                SELECT summary_date, COUNT(*), SUM(detection_count), SUM(detection_score_sum)
+                FROM soldier_daily_summary
+                GROUP BY summary_date
+            """)
+            conn.commit()
+        except Exception:
+            if conn:
+                conn.rollback()
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+        return self.refresh()
+
+    def get_soldier_weekly(self, force_id: str, before_year_week: Optional[int] = None,
+                           limit: int = 12) -> Dict:
+        """
+        One soldier's weekly trend, newest first, keyset-paginated by year_week
+
+        Returns:
+            dict: rows and next_before (pass back as before_year_week for the next page)
+        """
+        rows = self._fetch_page("""
+            SELECT force_id, year_week, week_start, detection_count, cctv_avg_score,
+                   survey_count, survey_avg_score
+            FROM soldier_weekly_summary
+            WHERE force_id = %s AND year_week < %s
+            ORDER BY year_week DESC
+            LIMIT %s
+        """, (force_id, before_year_week or 999999, limit))
+        return {
+            'rows': rows,
+            'next_before': rows[-1]['year_week'] if len(rows) == limit else None
+        }
+
+    def get_weekly_overview(self, year_week: int, after_force_id: str = '', limit: int = 50) -> Dict:
+        """
+        All soldiers' summaries for one week, keyset-paginated by force_id
+
+        Returns:
+            dict: rows and next_after (pass back as after_force_id for the next page)
+        """
+        rows = self._fetch_page("""
+            SELECT force_id, year_week, week_start, detection_count, cctv_avg_score,
+                   survey_count, survey_avg_score
+            FROM soldier_weekly_summary
+            WHERE year_week = %s AND force_id > %s
+            ORDER BY force_id
+            LIMIT %s
+        """, (year_week, after_force_id, limit))
+        return {
+            'rows': rows,
+            'next_after': rows[-1]['force_id'] if len(rows) == limit else None
+        }
+
+    def get_unit_daily(self, before_date: Optional[date] = None, limit: int = 30) -> Dict:
+        """
+        Unit-wide daily summaries, newest first, keyset-paginated by date
+
+        Returns:
+            dict: rows and next_before (pass back as before_date for the next page)
+        """
+        rows = self._fetch_page("""
+            SELECT summary_date, soldiers_detected, detection_count, avg_depression_score,
+                   surveys_completed, avg_survey_score
+            FROM unit_daily_summary
+            WHERE summary_date < %s
+            ORDER BY summary_date DESC
+            LIMIT %s
+        """, (before_date or date.max, limit))
+        return {
+            'rows': rows,
+            # _fetch_page already turned the date into an ISO string
+            'next_before': rows[-1]['summary_date'] if len(rows) == limit else None
+        }
+
+    def _fetch_page(self, query: str, params: tuple) -> List[Dict]:
+        conn = None
+        cursor = None
+        try:
+            conn = get_connection()
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            for row in rows:
+                for key, value in row.items():
+                    if isinstance(value, date):
+                        row[key] = value.isoformat()
+            return rows
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh the materialized dashboard summaries")
+    parser.add_argument('--rebuild', action='store_true', help='rebuild all summaries from scratch')
+    args = parser.parse_args()
+
+    service = AggregationService()
+    print(service.rebuild() if args.rebuild else service.refresh())
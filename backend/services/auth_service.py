@@ -1,6 +1,5 @@
-import bcrypt
 from db.connection import get_connection
-from utils.hash import check_password
+from services.hashing_service import get_hashing_service
 from typing import Optional, Dict
 
 class AuthService:
@@ -33,27 +32,24 @@ def verify_login(self, force_id: str, password: str) -> Optional[Dict]:
             )
             
             user = cursor.fetchone()
-            
-            if not user:
-                return None
-                
-            stored_hash = user['password_hash']
-            
-            if check_password(password, stored_hash):
-                return {
-                    'force_id': user['force_id'],
-                    'role': user['user_type']  # Changed from role to user_type
-                }
-            
-            return None
-            
-        except Exception as e:
-            raise e
         finally:
             if cursor:
                 cursor.close()
             if conn:
                 conn.close()
+        
+        if not user:
+            return None
+        
+        # Verify after releasing the connection: a check can wait up to
+        # HASHING_TIMEOUT and must not hold a MySQL connection meanwhile
+        if get_hashing_service().check_password(password, user['password_hash']):
+            return {
+                'force_id': user['force_id'],
+                'role': user['user_type']  # Changed from role to user_type
+            }
+        
+        return None
                 
     def register_soldier(self, force_id: str, password: str) -> Dict:
         """
@@ -69,10 +65,8 @@ def register_soldier(self, force_id: str, password: str) -> Dict:
         conn = None
         cursor = None
         try:
-            # Hash the password
-            password_bytes = password.encode('utf-8')
-            salt = bcrypt.gensalt()
-            hashed = bcrypt.hashpw(password_bytes, salt)
+            # Hash the password in the hashing pool
+            hashed = get_hashing_service().hash_password(password)
             
             conn = get_connection()
             cursor = conn.cursor(dictionary=True)
@@ -92,7 +86,7 @@ def register_soldier(self, force_id: str, password: str) -> Dict:
                 INSERT INTO users (force_id, password_hash, user_type)
                 VALUES (%s, %s, %s)
                 """,
-                (force_id, hashed.decode('utf-8'), 'soldier')
+                (force_id, hashed, 'soldier')
             )
             
             conn.commit()
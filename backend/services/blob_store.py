@@ -0,0 +1,190 @@
+import hashlib
+import logging
+import os
+import queue
+import tempfile
+import threading
+import time
+from datetime import date
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class BlobStore:
+    """
+    Content-addressed files on disk: a blob is stored once under the
+    SHA-256 of its bytes, sharded two levels deep by the leading hex digits
+    (<root>/ab/cd/abcd...<suffix>) so no directory grows too large. Writes go
+    to a temporary file and are renamed into place, so readers never see a
+    partial blob and concurrent writers of the same content are harmless.
+    """
+
+    def __init__(self, root: str, suffix: str = ''):
+        self.root = root
+        self.suffix = suffix
+
+    @staticmethod
+    def hash(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:4], digest + self.suffix)
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self.path(digest))
+
+    def put(self, data: bytes, digest: Optional[str] = None) -> Tuple[str, bool]:
+        """Store `data`; returns (hash, whether it was newly written)"""
+        digest = digest or self.hash(data)
+        path = self.path(digest)
+        if os.path.exists(path):
+            # Refresh the mtime so prune() keeps blobs that are still referenced
+            os.utime(path)
+            return digest, False
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return digest, True
+
+    def get(self, digest: str) -> bytes:
+        with open(self.path(digest), 'rb') as f:
+            return f.read()
+
+    def get_if_exists(self, digest: str) -> Optional[bytes]:
+        """The blob, or None if it was never written or has been pruned"""
+        try:
+            return self.get(digest)
+        except FileNotFoundError:
+            return None
+
+    def _iter_files(self) -> Iterator[str]:
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                yield os.path.join(directory, name)
+
+    def prune(self, older_than: float) -> int:
+        """Remove blobs last written or re-stored before the UNIX time `older_than`; returns the count"""
+        removed = 0
+        for path in self._iter_files():
+            try:
+                if os.path.getmtime(path) < older_than:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+
+def get_face_crop_store() -> BlobStore:
+    """The blob store for face crops, under FACE_CROP_DIR (default storage/face_crops)"""
+    return BlobStore(os.getenv('FACE_CROP_DIR', os.path.join('storage', 'face_crops')), suffix='.jpg')
+
+
+class FaceCropArchiver:
+    """
+    Samples face crops and writes them to a BlobStore from a background thread.
+
+    Only every `sample_every`-th crop submitted per soldier per day is kept
+    (the first one of the day always is). submit() JPEG-encodes and hashes
+    the crop on the caller's thread and returns the hash for the database
+    row; the file write happens on the writer thread. When the write queue
+    is full the crop is skipped rather than blocking the caller. A write
+    that fails afterwards (counted in stats['failed']) leaves the row with
+    a hash but no blob, so readers use BlobStore.get_if_exists and treat a
+    missing crop as not archived.
+    """
+
+    def __init__(self, store: BlobStore, sample_every: int = 20, jpeg_quality: int = 90, max_pending: int = 256):
+        self.store = store
+        self.sample_every = sample_every
+        self.jpeg_quality = jpeg_quality
+        self._counts: Dict[str, int] = {}
+        self._counts_day = None
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._stats_lock = threading.Lock()  # Updated from the caller and the writer thread
+        self.stats = {'submitted': 0, 'sampled': 0, 'written': 0, 'deduplicated': 0, 'dropped': 0, 'failed': 0}
+
+    @classmethod
+    def from_env(cls) -> 'FaceCropArchiver':
+        """FACE_CROP_SAMPLE_EVERY (default 20, 0 disables archiving)"""
+        return cls(get_face_crop_store(), sample_every=int(os.getenv('FACE_CROP_SAMPLE_EVERY', 20)))
+
+    def _should_keep(self, force_id: str, day: date) -> bool:
+        with self._lock:
+            if day != self._counts_day:
+                # Counters are per day; forget the previous day's
+                self._counts = {}
+                self._counts_day = day
+            count = self._counts.get(force_id, 0)
+            self._counts[force_id] = count + 1
+        return count % self.sample_every == 0
+
+    def submit(self, force_id: str, image: np.ndarray, day: Optional[date] = None) -> Optional[str]:
+        """Archive the crop if it is sampled; returns its hash, or None if it is not kept"""
+        if self.sample_every <= 0 or image is None or image.size == 0:
+            return None
+        self._count('submitted')
+        if not self._should_keep(force_id, day or date.today()):
+            return None
+        self._count('sampled')
+
+        import cv2
+        ok, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            self._count('failed')
+            return None
+        data = encoded.tobytes()
+        digest = self.store.hash(data)
+
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait((digest, data))
+        except queue.Full:
+            self._count('dropped')
+            logger.warning("Face crop write queue is full; skipping crop")
+            return None
+        return digest
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _ensure_writer(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._write_loop, name='face-crop-writer', daemon=True)
+                self._thread.start()
+
+    def _write_loop(self):
+        while True:
+            digest, data = self._queue.get()
+            try:
+                _, written = self.store.put(data, digest)
+                self._count('written' if written else 'deduplicated')
+            except Exception as e:
+                self._count('failed')
+                logger.error(f"Failed to write face crop {digest}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until queued crops are written; False if `timeout` expired first"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
@@ -0,0 +1,167 @@
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+
+class Outage:
+    """A period without usable frames; ended_at is None while it lasts"""
+
+    def __init__(self, reason: str, started_at: datetime, started_mono: float):
+        self.reason = reason
+        self.started_at = started_at
+        self.ended_at = None
+        self.reconnect_attempts = 0
+        self.outage_id = None  # Row in camera_outages, once recorded
+        self._started_mono = started_mono
+        self._ended_mono = None
+
+    def duration(self, now: float) -> float:
+        return (self._ended_mono if self._ended_mono is not None else now) - self._started_mono
+
+    def to_dict(self, now: float) -> Dict:
+        return {
+            'reason': self.reason,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'ended_at': self.ended_at.isoformat(timespec='seconds') if self.ended_at else None,
+            'duration_s': round(self.duration(now), 1),
+            'reconnect_attempts': self.reconnect_attempts
+        }
+
+
+class CameraHealthMonitor:
+    """
+    Tracks whether a camera is delivering frames and when to reconnect it.
+
+    The camera is considered down after `failure_threshold` consecutive
+    failed reads or when no frame arrived for `stale_after` seconds; that
+    opens an Outage. While down, should_reconnect() says when to try
+    reopening the device, backing off exponentially from `initial_backoff`
+    to `max_backoff` seconds between attempts. A reopen only counts once a
+    frame arrives: that closes the outage and resets the backoff. Uptime is
+    the share of the monitored time not spent in outages.
+
+    Pure bookkeeping: the caller reads frames, reopens the camera and
+    persists outages. `clock` is monotonic seconds (injectable for tests).
+    """
+
+    def __init__(self, stale_after: float = 5.0, failure_threshold: int = 10, initial_backoff: float = 1.0,
+                 max_backoff: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.stale_after = stale_after
+        self.failure_threshold = failure_threshold
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.started = clock()
+        self.last_frame = None
+        self.frames = 0
+        self.failed_reads = 0
+        self.consecutive_failures = 0
+        self.reconnects = 0
+        self.outages: List[Outage] = []
+        self._backoff = initial_backoff
+        self._next_attempt = None
+
+    @classmethod
+    def from_env(cls, **kwargs) -> 'CameraHealthMonitor':
+        """CAMERA_STALE_SECONDS (default 5), CAMERA_FAILURE_THRESHOLD (10), CAMERA_MAX_BACKOFF (60)"""
+        return cls(
+            stale_after=float(os.getenv('CAMERA_STALE_SECONDS', 5)),
+            failure_threshold=int(os.getenv('CAMERA_FAILURE_THRESHOLD', 10)),
+            max_backoff=float(os.getenv('CAMERA_MAX_BACKOFF', 60)),
+            **kwargs
+        )
+
+    @property
+    def current_outage(self) -> Optional[Outage]:
+        if self.outages and self.outages[-1].ended_at is None:
+            return self.outages[-1]
+        return None
+
+    @property
+    def healthy(self) -> bool:
+        return self.current_outage is None
+
+    def _open_outage(self, reason: str, now: float) -> Outage:
+        # The camera has been down since its last good frame, not since we noticed
+        since = self.last_frame if self.last_frame is not None else self.started
+        outage = Outage(reason, datetime.now() - timedelta(seconds=now - since), since)
+        self.outages.append(outage)
+        self._next_attempt = now  # First reconnect right away
+        return outage
+
+    def record_frame(self) -> Optional[Outage]:
+        """A frame was read; returns the outage this ended, if any"""
+        now = self.clock()
+        self.last_frame = now
+        self.frames += 1
+        self.consecutive_failures = 0
+        self._backoff = self.initial_backoff
+        outage = self.current_outage
+        if outage:
+            outage.ended_at = datetime.now()
+            outage._ended_mono = now
+            return outage
+        return None
+
+    def record_failure(self) -> Optional[Outage]:
+        """A read failed; returns the outage this started, if any"""
+        self.failed_reads += 1
+        self.consecutive_failures += 1
+        if self.healthy and self.consecutive_failures >= self.failure_threshold:
+            return self._open_outage('read_failures', self.clock())
+        return None
+
+    def check(self) -> Optional[Outage]:
+        """Detect a stalled feed; returns the outage this started, if any"""
+        now = self.clock()
+        last = self.last_frame if self.last_frame is not None else self.started
+        if self.healthy and now - last > self.stale_after:
+            return self._open_outage('stale', now)
+        return None
+
+    def close_outage(self) -> Optional[Outage]:
+        """End the outage still open, e.g. when monitoring stops"""
+        outage = self.current_outage
+        if outage:
+            outage.ended_at = datetime.now()
+            outage._ended_mono = self.clock()
+        return outage
+
+    def should_reconnect(self) -> bool:
+        return not self.healthy and self.clock() >= self._next_attempt
+
+    def record_reconnect(self, success: bool):
+        """A reconnect was attempted; each attempt not followed by a frame doubles the wait"""
+        now = self.clock()
+        self.reconnects += 1
+        outage = self.current_outage
+        if outage:
+            outage.reconnect_attempts += 1
+        if success:
+            # The outage ends with the first frame; give the device time to deliver it.
+            # A device that opens but never delivers is retried ever more slowly.
+            self.consecutive_failures = 0
+            self._next_attempt = now + max(self.stale_after, self._backoff)
+        else:
+            self._next_attempt = now + self._backoff
+        self._backoff = min(self._backoff * 2, self.max_backoff)
+
+    def metrics(self) -> Dict:
+        now = self.clock()
+        elapsed = now - self.started
+        downtime = sum(outage.duration(now) for outage in self.outages)
+        current = self.current_outage
+        return {
+            'state': 'up' if current is None else 'down',
+            'monitored_s': round(elapsed, 1),
+            'downtime_s': round(downtime, 1),
+            'uptime_ratio': round(1 - downtime / elapsed, 4) if elapsed > 0 else None,
+            'frames': self.frames,
+            'failed_reads': self.failed_reads,
+            'consecutive_failures': self.consecutive_failures,
+            'last_frame_age_s': round(now - self.last_frame, 1) if self.last_frame is not None else None,
+            'outages': len(self.outages),
+            'current_outage': current.to_dict(now) if current else None,
+            'reconnects': self.reconnects
+        }
@@ -8,91 +8,207 @@
 from collections import deque, defaultdict
 from statistics import mean
 from db.connection import get_connection
+from services.blob_store import FaceCropArchiver
+from services.camera_health import CameraHealthMonitor, Outage
 from services.emotion_detection_service import EmotionDetectionService
+from services.emotion_smoothing import EmotionSmoother
+from services.event_stream import get_event_broker
+from services.frame_bus import FrameCaptureProcess
+from utils.logging_config import LogRateLimiter
+
+logger = logging.getLogger(__name__)
 
 class CCTVMonitoringService:
     def __init__(self):
         self.emotion_service = EmotionDetectionService()
         self.monitoring_id = None
         self.cap = None
+        # Set when frames come from a separate capture process (CCTV_CAPTURE_PROCESS=true)
+        self.capture = None
+        self._use_capture_process = False
+        self._last_frame_seq = 0
+        self.camera_health = None  # CameraHealthMonitor of the current (or last) session
         self.is_monitoring = False
         self.monitor_thread = None
-        self.detection_buffer = {}  # Buffer for storing detections for 3-second averaging
         self.last_average_time = {}  # Track last average calculation time per force_id
+        self.crop_archiver = FaceCropArchiver.from_env()
         self.AVERAGE_INTERVAL = 3  # Calculate average every 3 seconds
-        self.setup_logging()
-        
-    def setup_logging(self):
-        logging.basicConfig(
-            filename="cctv_monitoring.log",
-            level=logging.DEBUG,
-            format='%(asctime)s - %(levelname)s - %(message)s'
+        self.STOP_TIMEOUT = 10  # Seconds stop_monitoring waits for the monitoring thread
+        # Per-soldier ring buffers of the detections of the last AVERAGE_INTERVAL seconds
+        self.smoother = EmotionSmoother.from_env(
+            [self.emotion_service.emotion_dict[i] for i in sorted(self.emotion_service.emotion_dict)],
+            window_seconds=self.AVERAGE_INTERVAL
         )
-        
+        self._frame_log_limiter = LogRateLimiter(interval=5.0)
+        # Live detections for dashboards (see /api/admin/monitoring/events)
+        self.events = get_event_broker()
+
     def _find_available_camera(self):
         """Try different camera indices to find an available camera"""
         # Try external webcam first (usually index 1)
-        logging.info("Trying external webcam (index 1)...")
+        logger.info("Trying external webcam (index 1)...")
         cap = cv2.VideoCapture(1)
         if cap.isOpened():
-            logging.info("Successfully connected to external webcam")
+            logger.info("Successfully connected to external webcam")
             return cap
         
         # If external webcam not available, try built-in camera (index 0)
-        logging.info("External webcam not found, trying built-in camera (index 0)...")
+        logger.info("External webcam not found, trying built-in camera (index 0)...")
         cap = cv2.VideoCapture(0)
         if cap.isOpened():
-            logging.info("Successfully connected to built-in camera")
+            logger.info("Successfully connected to built-in camera")
             return cap
             
         # If no camera is available, return None
-        logging.error("No cameras available")
+        logger.error("No cameras available")
         return None
 
     def _process_frames_continuously(self, date: str):
         """Continuously process frames in a separate thread"""
-        logging.info("Starting continuous frame processing")
+        logger.info("Starting continuous frame processing")
         while self.is_monitoring:
             try:
                 result = self.process_frame()
-                if result:
-                    logging.info(f"Processed frame: {result}")
+                if result and self._frame_log_limiter.allow(('processed', result['force_id'])):
+                    logger.debug("Processed frame: %s", result)
+                self._watch_camera()
                 time.sleep(0.1)  # Small delay to prevent excessive CPU usage
             except Exception as e:
-                logging.error(f"Error in continuous processing: {e}")
+                logger.error(f"Error in continuous processing: {e}")
                 
-        logging.info("Stopped continuous frame processing")
+        logger.info("Stopped continuous frame processing")
         self.is_monitoring = False
 
+    def _open_camera(self) -> bool:
+        """Open the camera, or start the capture process, for the current mode"""
+        if self._use_capture_process:
+            capture = FrameCaptureProcess.from_env()
+            if not capture.start():
+                return False
+            self.capture = capture
+            self._last_frame_seq = 0
+            return True
+        self.cap = self._find_available_camera()
+        return self.cap is not None
+
+    def _release_camera(self):
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+        self._stop_capture()
+
+    def _record_camera_read(self, ok: bool):
+        if not self.camera_health:
+            return
+        if ok:
+            outage = self.camera_health.record_frame()
+            if outage:
+                self._end_outage(outage)
+        else:
+            outage = self.camera_health.record_failure()
+            if outage:
+                self._begin_outage(outage)
+
+    def _watch_camera(self):
+        """Detect a stalled camera and reopen it with exponential backoff"""
+        health = self.camera_health
+        if not health or not self.is_monitoring:
+            return
+        outage = health.check()
+        if outage:
+            self._begin_outage(outage)
+        if health.should_reconnect():
+            logger.info(f"Reconnecting camera (attempt {health.current_outage.reconnect_attempts + 1})...")
+            self._release_camera()
+            success = self._open_camera()
+            if not self.is_monitoring:
+                # stop_monitoring gave up waiting for us; don't leave the device open
+                self._release_camera()
+                return
+            health.record_reconnect(success)
+            if not success:
+                logger.warning("Camera reconnect failed")
+
+    def _begin_outage(self, outage: Outage):
+        logger.warning(f"Camera outage started ({outage.reason}) in session {self.monitoring_id}")
+        self.events.publish('camera', {'status': 'down', 'reason': outage.reason, 'monitoring_id': self.monitoring_id})
+        conn = None
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO camera_outages (monitoring_id, started_at, reason)
+                VALUES (%s, %s, %s)
+            """, (self.monitoring_id, outage.started_at, outage.reason))
+            outage.outage_id = cursor.lastrowid
+            conn.commit()
+        except Exception as e:
+            logger.error(f"Error recording camera outage: {e}")
+        finally:
+            if conn:
+                conn.close()
+
+    def _end_outage(self, outage: Outage):
+        duration = (outage.ended_at - outage.started_at).total_seconds()
+        logger.info(f"Camera recovered after {duration:.1f}s ({outage.reconnect_attempts} reconnect attempts)")
+        self.events.publish('camera', {'status': 'up', 'downtime_s': round(duration, 1),
+                                       'monitoring_id': self.monitoring_id})
+        if outage.outage_id is None:
+            return
+        conn = None
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE camera_outages
+                SET ended_at = %s, reconnect_attempts = %s
+                WHERE outage_id = %s
+            """, (outage.ended_at, outage.reconnect_attempts, outage.outage_id))
+            conn.commit()
+        except Exception as e:
+            logger.error(f"Error recording camera recovery: {e}")
+        finally:
+            if conn:
+                conn.close()
+
+    def status(self) -> Dict:
+        """Monitoring state and camera health metrics"""
+        return {
+            'is_monitoring': self.is_monitoring,
+            'monitoring_id': self.monitoring_id,
+            'camera': self.camera_health.metrics() if self.camera_health else None
+        }
+
     def start_monitoring(self, date: str) -> bool:
         """Start a new monitoring session"""
         conn = None
         
         if self.is_monitoring:
-            logging.warning("Monitoring is already running")
+            logger.warning("Monitoring is already running")
             return False
             
         # Ensure camera is released if it was previously open
         if self.cap:
-            logging.info("Releasing previously open camera...")
+            logger.info("Releasing previously open camera...")
             self.cap.release()
             cv2.destroyAllWindows()
             self.cap = None
+        self._stop_capture()
             
         try:
             # Initialize video capture with available camera
-            logging.info("Initializing video capture...")
-            self.cap = self._find_available_camera()
-            if not self.cap:
+            logger.info("Initializing video capture...")
+            self._use_capture_process = os.getenv('CCTV_CAPTURE_PROCESS', 'false').lower() == 'true'
+            if not self._open_camera():
                 raise Exception("Could not find any available camera - please connect a camera")
             
-            logging.info("Connecting to database...")
+            logger.info("Connecting to database...")
             # Get database connection
             conn = get_connection()
             cursor = conn.cursor()
             
             try:
-                logging.info(f"Creating monitoring session for date: {date}")
+                logger.info(f"Creating monitoring session for date: {date}")
                 # Set end_time to 23:59:59 initially
                 cursor.execute("""
                     INSERT INTO cctv_daily_monitoring (date, start_time, end_time, status)
@@ -104,8 +220,9 @@ def start_monitoring(self, date: str) -> bool:
                 self.monitoring_id = cursor.fetchone()[0]
                 conn.commit()
                 
-                logging.info("Starting monitoring thread...")
+                logger.info("Starting monitoring thread...")
                 # Start the monitoring thread
+                self.camera_health = CameraHealthMonitor.from_env()
                 self.is_monitoring = True
                 self.monitor_thread = threading.Thread(
                     target=self._process_frames_continuously,
@@ -114,30 +231,32 @@ def start_monitoring(self, date: str) -> bool:
                 )
                 self.monitor_thread.start()
                 
-                logging.info(f"Successfully started monitoring session {self.monitoring_id}")
+                logger.info(f"Successfully started monitoring session {self.monitoring_id}")
+                self.events.publish('monitoring', {'status': 'started', 'monitoring_id': self.monitoring_id, 'date': date})
                 return True
                 
             except Exception as e:
-                logging.error(f"Database error in start_monitoring: {str(e)}")
+                logger.error(f"Database error in start_monitoring: {str(e)}")
                 if conn:
                     conn.rollback()
                 raise Exception(f"Database error: {str(e)}")
         except Exception as e:
             error_msg = f"Failed to start monitoring: {str(e)}"
-            logging.error(error_msg)
+            logger.error(error_msg)
             # Clean up resources
             if self.cap:
                 self.cap.release()
                 cv2.destroyAllWindows()
                 self.cap = None
-                logging.info("Released camera capture device")
+                logger.info("Released camera capture device")
+            self._stop_capture()
             self.is_monitoring = False
             self.monitoring_id = None
             raise Exception(error_msg)
         finally:
             if conn:
                 conn.close()
-                logging.info("Closed database connection")
+                logger.info("Closed database connection")
                 
     def stop_monitoring(self):
         """Stop monitoring session and calculate final daily averages"""
@@ -146,11 +265,25 @@ def stop_monitoring(self):
 
         self.is_monitoring = False
 
+        # Let the thread finish its iteration first: _watch_camera may be reopening
+        # the camera or recording an outage
+        if self.monitor_thread and self.monitor_thread is not threading.current_thread():
+            self.monitor_thread.join(self.STOP_TIMEOUT)
+            if self.monitor_thread.is_alive():
+                logger.warning(f"Monitoring thread did not stop within {self.STOP_TIMEOUT}s")
+        self.monitor_thread = None
+
         # Stop video capture
         if self.cap and self.cap.isOpened():
             self.cap.release()
+        self._stop_capture()
         cv2.destroyAllWindows()
 
+        # An outage lasting until the end is closed with the session
+        outage = self.camera_health.close_outage() if self.camera_health else None
+        if outage:
+            self._end_outage(outage)
+
         # Calculate and store daily averages for each soldier
         try:
             conn = get_connection()
@@ -174,85 +307,107 @@ def stop_monitoring(self):
                         SELECT AVG(depression_score) 
                         FROM cctv_detections 
                         WHERE force_id = %s 
-                        AND DATE(detection_timestamp) = %s
-                    """, (force_id, monitoring_date))
+                        AND detection_timestamp >= %s
+                        AND detection_timestamp < %s + INTERVAL 1 DAY
+                    """, (force_id, monitoring_date, monitoring_date))
                     
                     daily_avg = cursor.fetchone()[0]
                     if daily_avg is not None:
-                        # Check if an entry already exists for this soldier today
+                        # One row per soldier and day (unique key), whichever writer comes first
                         cursor.execute("""
-                            SELECT id FROM daily_depression_scores 
-                            WHERE force_id = %s AND score_date = %s
-                        """, (force_id, monitoring_date))
-                        
-                        existing_entry = cursor.fetchone()
-                        
-                        if existing_entry:
-                            # Update existing entry
-                            cursor.execute("""
-                                UPDATE daily_depression_scores 
-                                SET depression_score = %s 
-                                WHERE force_id = %s AND score_date = %s
-                            """, (daily_avg, force_id, monitoring_date))
-                        else:
-                            # Insert new entry
-                            cursor.execute("""
-                                INSERT INTO daily_depression_scores 
-                                (force_id, score_date, depression_score)
-                                VALUES (%s, %s, %s)
-                            """, (force_id, monitoring_date, daily_avg))
-                        
-                        logging.info(f"Stored daily average for soldier {force_id}: {daily_avg:.2f}")
+                            INSERT INTO daily_depression_scores
+                            (force_id, date, avg_depression_score)
+                            VALUES (%s, %s, %s)
+                            ON DUPLICATE KEY UPDATE
+                            avg_depression_score = VALUES(avg_depression_score)
+                        """, (force_id, monitoring_date, daily_avg))
+
+                        logger.info(f"Stored daily average for soldier {force_id}: {daily_avg:.2f}")
+
+                # Close the session; 'partial' if the camera was down part of the time
+                camera = self.camera_health.metrics() if self.camera_health else None
+                if camera is None or camera['outages'] == 0:
+                    status = 'completed'
+                else:
+                    status = 'partial' if camera['frames'] else 'failed'
+                cursor.execute("""
+                    UPDATE cctv_daily_monitoring
+                    SET end_time = %s, status = %s, camera_uptime_ratio = %s
+                    WHERE monitoring_id = %s
+                """, (datetime.now().time(), status, camera['uptime_ratio'] if camera else None, self.monitoring_id))
 
                 conn.commit()
-                logging.info("All daily averages calculated and stored successfully")
+                logger.info("All daily averages calculated and stored successfully")
 
             except Exception as e:
-                logging.error(f"Database error in stop_monitoring: {str(e)}")
+                logger.error(f"Database error in stop_monitoring: {str(e)}")
                 if conn:
                     conn.rollback()
                 raise
 
         except Exception as e:
-            logging.error(f"Error in stop_monitoring: {str(e)}")
+            logger.error(f"Error in stop_monitoring: {str(e)}")
             return False
 
         finally:
             if conn:
                 conn.close()
 
+        self.events.publish('monitoring', {'status': 'stopped', 'monitoring_id': self.monitoring_id})
+
         # Clear monitoring state
         self.monitoring_id = None
-        self.detection_buffer = defaultdict(list)
-        self.last_average_time = defaultdict(float)
+        self.smoother.clear()
+        self.last_average_time = {}
+        self.crop_archiver.flush(timeout=10)
         self.emotion_detection_service = None
 
         return True
 
+    def _stop_capture(self):
+        if self.capture:
+            self.capture.stop()
+            self.capture = None
+
     def process_frame(self) -> Optional[Dict]:
         """Process a single frame from the video feed"""
-        if not self.cap or not self.monitoring_id:
+        if not (self.cap or self.capture) or not self.monitoring_id:
             return None
 
-        ret, frame = self.cap.read()
-        if not ret:
-            return None
+        if self.capture:
+            # Frames arrive already resized; only the ones processed here are
+            # copied out of shared memory, and that copy is also drawn on
+            shared = self.capture.ring.wait(self._last_frame_seq, timeout=1.0, copy=True)
+            self._record_camera_read(shared is not None)
+            if shared is None:
+                return None
+            self._last_frame_seq = shared.seq
+            frame = display_frame = shared.image
+        else:
+            ret, frame = self.cap.read()
+            self._record_camera_read(ret)
+            if not ret:
+                return None
 
-        # Create a copy for display
-        display_frame = frame.copy()
-        
-        # Resize frame for faster processing
-        frame = cv2.resize(frame, (1280, 720))
-        display_frame = cv2.resize(display_frame, (1280, 720))
+            # Create a copy for display
+            display_frame = frame.copy()
+
+            # Resize frame for faster processing
+            frame = cv2.resize(frame, (1280, 720))
+            display_frame = cv2.resize(display_frame, (1280, 720))
 
         # Detect face and emotion
         result = self.emotion_service.detect_face_and_emotion(frame)
         if result:
-            force_id, emotion, score, face_coords = result
-            logging.info(f"Detected soldier {force_id} with emotion {emotion} and score {score}")
+            force_id, emotion, score, face_coords, probabilities = result
+            if self._frame_log_limiter.allow(('detected', force_id)):
+                logger.info("Detected soldier %s with emotion %s and score %s", force_id, emotion, score)
+
+            x, y, w, h = face_coords
+            # Taken before drawing, as frame is also the display frame with a capture process
+            face_crop = frame[y:y+h, x:x+w].copy()
             
             # Draw rectangle around face
-            x, y, w, h = face_coords
             cv2.rectangle(display_frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
             cv2.putText(display_frame, f"ID: {force_id}", (x, y-10), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 0), 2)
@@ -264,23 +419,21 @@ def process_frame(self) -> Optional[Dict]:
             cv2.waitKey(1)  # Update window, wait 1ms
 
             current_time = time.time()
+            self.events.publish('detection', {
+                'monitoring_id': self.monitoring_id,
+                'force_id': force_id,
+                'emotion': emotion,
+                'score': score
+            })
 
-            # Initialize buffer if needed
-            if force_id not in self.detection_buffer:
-                self.detection_buffer[force_id] = []
+            if force_id not in self.last_average_time:
                 self.last_average_time[force_id] = current_time
 
-            # Add detection to buffer
-            self.detection_buffer[force_id].append({
-                'score': score,
-                'emotion': emotion,
-                'timestamp': current_time,
-                'face_coords': face_coords
-            })
+            self.smoother.add(force_id, probabilities, score, current_time)
 
             # Calculate and store average if 3 seconds have passed
             if current_time - self.last_average_time[force_id] >= self.AVERAGE_INTERVAL:
-                self._calculate_and_store_average(force_id, current_time)
+                self._calculate_and_store_average(force_id, current_time, face_crop)
 
             return {
                 "force_id": force_id,
@@ -293,58 +446,42 @@ def process_frame(self) -> Optional[Dict]:
             cv2.waitKey(1)
             return None
 
-    def _calculate_and_store_average(self, force_id: str, current_time: float):
+    def _calculate_and_store_average(self, force_id: str, current_time: float, face_crop=None):
         """Calculate and store 3-second average for a soldier in cctv_detections"""
-        buffer = self.detection_buffer[force_id]
-        if not buffer:
+        stats = self.smoother.stats(force_id, current_time)
+        if not stats.count:
             return
 
-        # Calculate average score
-        avg_score = sum(d['score'] for d in buffer) / len(buffer)
-        
-        # Get most frequent emotion
-        emotions = [d['emotion'] for d in buffer]
-        most_common_emotion = max(set(emotions), key=emotions.count)
+        # Frames the emotion model was more certain about count for more
+        avg_score = stats.weighted_score if stats.weighted_score is not None else stats.mean_score
+        most_common_emotion = stats.dominant_emotion
 
-        try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            
-            try:
-                # Store only in cctv_detections table
-                cursor.execute("""
-                    INSERT INTO cctv_detections 
-                    (monitoring_id, force_id, detection_timestamp, depression_score)
-                    VALUES (%s, %s, %s, %s)
-                """, (self.monitoring_id, force_id, datetime.now(), avg_score))
-                
-                conn.commit()
-                logging.info(f"Stored detection for soldier {force_id}: score={avg_score:.2f}, emotion={most_common_emotion}")
-                
-            except Exception as e:
-                logging.error(f"Database error in _calculate_and_store_average: {str(e)}")
-                if conn:
-                    conn.rollback()
-                raise
-                
-        except Exception as e:
-            logging.error(f"Error in _calculate_and_store_average: {str(e)}")
+        # Only a sampled crop is archived, to disk; the row keeps its hash
+        crop_hash = self.crop_archiver.submit(force_id, face_crop)
+
+        # The window's probability vector is kept so scores can be recomputed later
+        if not self.emotion_service.store_detection(self.monitoring_id, force_id, avg_score, stats.probabilities,
+                                                    face_crop_hash=crop_hash):
             return
-            
-        finally:
-            if conn:
-                conn.close()
+        logger.debug("Stored detection for soldier %s: score=%.2f, emotion=%s",
+                     force_id, avg_score, most_common_emotion)
+        self.events.publish('average', {
+            'monitoring_id': self.monitoring_id,
+            'force_id': force_id,
+            'score': avg_score,
+            'emotion': most_common_emotion,
+            'histogram': stats.histogram,
+            'detections': stats.count
+        })
 
-        # Clear buffer and update last average time
-        self.detection_buffer[force_id] = []
         self.last_average_time[force_id] = current_time
 
     def calculate_daily_scores(self, date: str) -> bool:
         """Calculate daily scores for all soldiers"""
         try:
             results = self.emotion_service.calculate_daily_scores(date)
-            logging.info(f"Calculated daily scores for {len(results)} soldiers on {date}")
+            logger.info(f"Calculated daily scores for {len(results)} soldiers on {date}")
             return True
         except Exception as e:
-            logging.error(f"Error calculating daily scores: {e}")
+            logger.error(f"Error calculating daily scores: {e}")
             return False
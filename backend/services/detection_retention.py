@@ -0,0 +1,195 @@
+import argparse
+import logging
+import os
+import time
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+from db.connection import get_connection
+from services.aggregation_service import AggregationService
+from services.blob_store import BlobStore, get_face_crop_store
+
+logger = logging.getLogger(__name__)
+
+TABLE = 'cctv_detections'
+
+# Rows per DELETE when the table is not partitioned
+DELETE_BATCH_SIZE = 10000
+
+
+def add_months(day: date, months: int) -> date:
+    """First day of the month `months` after day's month"""
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+class DetectionRetentionService:
+    """
+    Keeps cctv_detections bounded.
+
+    Raw detections are kept for `retention_months` full months; older history
+    survives only in the per-day soldier_daily_summary rollup. On a
+    partitioned table expired months are removed with DROP PARTITION, which
+    is a metadata operation instead of a huge DELETE, and the next
+    `months_ahead` monthly partitions are created in advance so inserts never
+    land in the catch-all partition. History from before the first monthly
+    partition shares that partition with newer rows, so it is removed with
+    batched deletes once, as is everything on an unpartitioned table
+    (migration 002 not applied). Archived face crops not
+    stored again since the cutoff are removed with them.
+    """
+
+    def __init__(self, retention_months: Optional[int] = None, months_ahead: int = 2,
+                 aggregation_service: Optional[AggregationService] = None,
+                 crop_store: Optional[BlobStore] = None):
+        self.retention_months = retention_months or int(os.getenv('DETECTION_RETENTION_MONTHS', 3))
+        self.months_ahead = months_ahead
+        self.aggregation_service = aggregation_service or AggregationService()
+        self.crop_store = crop_store or get_face_crop_store()
+
+    def _get_partitions(self, cursor) -> List[Tuple[str, Optional[int]]]:
+        """(name, exclusive upper bound as a UNIX timestamp or None for MAXVALUE) in order"""
+        cursor.execute("""
+            SELECT PARTITION_NAME, PARTITION_DESCRIPTION
+            FROM information_schema.PARTITIONS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+            ORDER BY PARTITION_ORDINAL_POSITION
+        """, (TABLE,))
+        return [
+            (name, None if description == 'MAXVALUE' else int(description))
+            for name, description in cursor.fetchall()
+        ]
+
+    def ensure_partitions(self, today: Optional[date] = None) -> List[str]:
+        """
+        Split monthly partitions off the catch-all partition up to `months_ahead` months ahead
+
+        Returns:
+            list: Names of the partitions created
+        """
+        today = today or date.today()
+        created = []
+        conn = None
+        cursor = None
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            partitions = self._get_partitions(cursor)
+            if not partitions:
+                logger.warning(f"{TABLE} is not partitioned; apply db/migrations/002 to enable partition maintenance")
+                return created
+
+            existing = {name for name, _ in partitions}
+            for offset in range(self.months_ahead + 1):
+                month = add_months(today, offset)
+                name = f"p{month:%Y%m}"
+                if name in existing:
+                    continue
+                # Only the catch-all partition is split, so rows already in it
+                # before the first monthly partition stay in the oldest month
+                # (prune deletes them once they expire)
+                cursor.execute(f"""
+                    ALTER TABLE {TABLE} REORGANIZE PARTITION p_future INTO (
+                        PARTITION {name} VALUES LESS THAN (UNIX_TIMESTAMP('{add_months(month, 1).isoformat()}')),
+                        PARTITION p_future VALUES LESS THAN MAXVALUE
+                    )
+                """)
+                created.append(name)
+            return created
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+    def prune(self, today: Optional[date] = None) -> Dict:
+        """
+        Roll expired detections into the summaries and remove them
+
+        Returns:
+            dict: cutoff date and the partitions dropped or rows deleted
+        """
+        cutoff = add_months(today or date.today(), -self.retention_months)
+        result = {'cutoff': cutoff.isoformat(), 'dropped_partitions': [], 'deleted_rows': 0}
+
+        # Everything about to be removed must already be in soldier_daily_summary
+        self.aggregation_service.refresh()
+
+        conn = None
+        cursor = None
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT MAX(detection_id) FROM {TABLE} WHERE detection_timestamp < %s",
+                (cutoff,)
+            )
+            expired_max_id = cursor.fetchone()[0]
+            if expired_max_id is None:
+                return result
+            cursor.execute(
+                "SELECT last_id FROM summary_watermarks WHERE source_table = %s", (TABLE,)
+            )
+            row = cursor.fetchone()
+            if not row or row[0] < expired_max_id:
+                raise Exception(f"Expired detections up to {expired_max_id} are not yet summarized")
+
+            partitions = self._get_partitions(cursor)
+            if partitions:
+                cursor.execute("SELECT UNIX_TIMESTAMP(%s)", (cutoff,))
+                cutoff_ts = cursor.fetchone()[0]
+                expired = [name for name, bound in partitions if bound is not None and bound <= cutoff_ts]
+                if expired:
+                    cursor.execute(f"ALTER TABLE {TABLE} DROP PARTITION {', '.join(expired)}")
+                    result['dropped_partitions'] = expired
+                # Rows older than the first monthly partition live in it until it expires
+                cursor.execute(f"SELECT 1 FROM {TABLE} WHERE detection_timestamp < %s LIMIT 1", (cutoff,))
+                if cursor.fetchone():
+                    result['deleted_rows'] = self._delete_before(conn, cursor, cutoff)
+            else:
+                result['deleted_rows'] = self._delete_before(conn, cursor, cutoff)
+
+            logger.info(f"Pruned {TABLE}: {result}")
+            return result
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+    def _delete_before(self, conn, cursor, cutoff: date) -> int:
+        deleted = 0
+        while True:
+            cursor.execute(
+                f"DELETE FROM {TABLE} WHERE detection_timestamp < %s LIMIT {DELETE_BATCH_SIZE}",
+                (cutoff,)
+            )
+            conn.commit()
+            deleted += cursor.rowcount
+            if cursor.rowcount < DELETE_BATCH_SIZE:
+                return deleted
+
+    def prune_face_crops(self, today: Optional[date] = None) -> int:
+        """Remove archived face crops last stored before the retention cutoff"""
+        cutoff = add_months(today or date.today(), -self.retention_months)
+        removed = self.crop_store.prune(time.mktime(datetime.combine(cutoff, datetime.min.time()).timetuple()))
+        if removed:
+            logger.info(f"Removed {removed} face crops stored before {cutoff}")
+        return removed
+
+    def run(self) -> Dict:
+        """Create upcoming partitions and expire old detections and face crops"""
+        created = self.ensure_partitions()
+        result = self.prune()
+        result['created_partitions'] = created
+        result['removed_face_crops'] = self.prune_face_crops()
+        return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain cctv_detections partitions and retention")
+    parser.add_argument('--retention-months', type=int, help='full months of raw detections to keep')
+    parser.add_argument('--partitions-only', action='store_true', help='only create upcoming partitions')
+    args = parser.parse_args()
+
+    service = DetectionRetentionService(retention_months=args.retention_months)
+    print(service.ensure_partitions() if args.partitions_only else service.run())
@@ -5,9 +5,17 @@
 import logging
 import os
 import pickle
+import time
 from datetime import datetime
 from db.connection import get_connection
+from services.roi_face_detector import RoiFaceDetector, load_face_cascade
 from typing import Dict, Optional, Tuple, List
+from utils.logging_config import LogRateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks for a retrained face recognition model
+GALLERY_CHECK_INTERVAL = 5.0
 
 class EmotionDetectionService:
     def __init__(self):
@@ -19,16 +27,13 @@ def __init__(self):
             "Angry": 2, "Disgusted": 2, "Fearful": 2,
             "Happy": -1, "Neutral": 0, "Sad": 3, "Surprised": 1
         }
-        self.setup_logging()
+        self._frame_log_limiter = LogRateLimiter(interval=5.0)
+        # Set by _load_models; without a gallery file there is nothing to reload
+        self.gallery_path = None
+        self._gallery_stamp = None
+        self._next_gallery_check = 0.0
         self._load_models()
         
-    def setup_logging(self):
-        logging.basicConfig(
-            filename="emotion_detection.log",
-            level=logging.DEBUG,
-            format='%(asctime)s - %(levelname)s - %(message)s'
-        )
-        
     def _load_models(self):
         try:
             # Load emotion model
@@ -39,27 +44,56 @@ def _load_models(self):
             self.emotion_model.load_weights("model/emotion_model.h5")
             
             # Load face recognition model
-            model_path = os.path.join('storage', 'models', 'face_recognition_model.pkl')
-            with open(model_path, "rb") as f:
-                self.known_face_encodings, self.known_force_ids = pickle.load(f)
+            self.gallery_path = os.path.join('storage', 'models', 'face_recognition_model.pkl')
+            self._load_gallery()
             
             # Load face cascade
-            self.face_detector = cv2.CascadeClassifier('haarcascades/haarcascade_frontalface_default.xml')
+            self.face_detector = load_face_cascade()
+            # Full-frame or region-of-interest scanning, per FACE_DETECTION_MODE
+            self.face_locator = RoiFaceDetector.from_env(self.face_detector)
             
-            logging.info("All models loaded successfully")
+            logger.info("All models loaded successfully")
         except Exception as e:
-            logging.error(f"Error loading models: {e}")
+            logger.error(f"Error loading models: {e}")
             raise
             
-    def detect_face_and_emotion(self, frame) -> Optional[Tuple[str, str, float, tuple]]:
-        """Detect face, identify soldier and detect emotion"""
+    def _load_gallery(self):
+        stat = os.stat(self.gallery_path)
+        with open(self.gallery_path, "rb") as f:
+            self.known_face_encodings, self.known_force_ids = pickle.load(f)
+        self._gallery_stamp = (stat.st_mtime_ns, stat.st_size)
+        self._next_gallery_check = time.monotonic() + GALLERY_CHECK_INTERVAL
+
+    def reload_gallery_if_changed(self) -> bool:
+        """
+        Reload the face recognition model when enrollment jobs replaced it
+        (checked at most every GALLERY_CHECK_INTERVAL seconds), so added,
+        retrained and deleted soldiers apply without restarting monitoring
+        """
+        if self.gallery_path is None or time.monotonic() < self._next_gallery_check:
+            return False
+        self._next_gallery_check = time.monotonic() + GALLERY_CHECK_INTERVAL
+        try:
+            stat = os.stat(self.gallery_path)
+            if (stat.st_mtime_ns, stat.st_size) == self._gallery_stamp:
+                return False
+            self._load_gallery()
+        except Exception as e:
+            # Keep matching against the gallery already loaded
+            logger.error(f"Error reloading face recognition model: {e}")
+            return False
+        logger.info(f"Reloaded face recognition model with {len(set(self.known_force_ids))} soldiers")
+        return True
+
+    def detect_face_and_emotion(self, frame) -> Optional[Tuple[str, str, float, tuple, np.ndarray]]:
+        """
+        Detect face, identify soldier and detect emotion. Returns
+        (force_id, emotion, score, face_coords, probabilities), the last being
+        the model's probability per emotion in emotion_dict order.
+        """
+        self.reload_gallery_if_changed()
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.face_detector.detectMultiScale(
-            gray,
-            scaleFactor=1.1,
-            minNeighbors=5,
-            minSize=(30, 30)
-        )
+        faces = self.face_locator.detect(gray)
         
         if len(faces) == 0:
             return None
@@ -81,7 +115,8 @@ def detect_face_and_emotion(self, frame) -> Optional[Tuple[str, str, float, tupl
         # Find matching soldier
         matches = face_recognition.compare_faces(self.known_face_encodings, face_encoding, tolerance=0.6)
         if not any(matches):
-            logging.warning("Face detected but not recognized as any known soldier")
+            if self._frame_log_limiter.allow('unrecognized'):
+                logger.warning("Face detected but not recognized as any known soldier")
             return None
             
         force_id = next(fid for match, fid in zip(matches, self.known_force_ids) if match)
@@ -105,10 +140,11 @@ def detect_face_and_emotion(self, frame) -> Optional[Tuple[str, str, float, tupl
         top_2_idx = np.argsort(emotion_prediction)[-2:][::-1]
         top_2_probs = emotion_prediction[top_2_idx]
         
-        # Log probabilities for debugging
-        emotions_probs = {self.emotion_dict[i]: f"{emotion_prediction[i]:.2f}" 
-                         for i in range(len(emotion_prediction))}
-        logging.debug(f"Emotion probabilities: {emotions_probs}")
+        # Log probabilities for debugging (only built when DEBUG is enabled)
+        if logger.isEnabledFor(logging.DEBUG):
+            emotions_probs = {self.emotion_dict[i]: f"{emotion_prediction[i]:.2f}"
+                              for i in range(len(emotion_prediction))}
+            logger.debug("Emotion probabilities: %s", emotions_probs)
         
         # Only choose non-neutral if probability is significantly higher
         if top_2_idx[0] != 4 and top_2_probs[0] > 0.4:  # If highest non-neutral emotion > 40%
@@ -123,34 +159,35 @@ def detect_face_and_emotion(self, frame) -> Optional[Tuple[str, str, float, tupl
         
         depression_score = self.emotion_mapping[emotion_label]
         
-        logging.info(f"Detected soldier {force_id} with {emotion_label} emotion (score: {depression_score})")
-        return force_id, emotion_label, float(depression_score), face_coords
+        if self._frame_log_limiter.allow(force_id):
+            logger.info("Detected soldier %s with %s emotion (score: %s)", force_id, emotion_label, depression_score)
+        return force_id, emotion_label, float(depression_score), face_coords, emotion_prediction
             
-    def store_detection(self, force_id: str, score: float, emotion: str, 
-                       face_image: np.ndarray, date: str, monitoring_id: int,
-                       is_average: bool = False) -> bool:
-        """Store emotion detection data in database"""
+    def store_detection(self, monitoring_id: int, force_id: str, score: float,
+                        probabilities: Optional[bytes] = None,
+                        timestamp: Optional[datetime] = None,
+                        face_crop_hash: Optional[str] = None) -> bool:
+        """
+        Store an (averaged) emotion detection in the database. `probabilities`
+        is the emotion probability vector packed with pack_probabilities();
+        `face_crop_hash` refers to a crop archived by FaceCropArchiver.
+        """
         conn = None
         try:
             conn = get_connection()
             cursor = conn.cursor()
             
-            # Convert image to bytes for storage
-            _, img_encoded = cv2.imencode('.jpg', face_image)
-            image_bytes = img_encoded.tobytes()
-            
-            # Store detection with is_average flag
             cursor.execute("""
                 INSERT INTO cctv_detections 
-                (monitoring_id, force_id, detection_timestamp, depression_score, emotion, face_image, is_average)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """, (monitoring_id, force_id, datetime.now(), score, emotion, image_bytes, is_average))
+                (monitoring_id, force_id, detection_timestamp, depression_score, emotion_probs, face_crop_hash)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, (monitoring_id, force_id, timestamp or datetime.now(), score, probabilities, face_crop_hash))
             
             conn.commit()
             return True
             
         except Exception as e:
-            logging.error(f"Error storing detection: {e}")
+            logger.error(f"Error storing detection: {e}")
             if conn:
                 conn.rollback()
             return False
@@ -171,16 +208,22 @@ def calculate_daily_scores(self, date: str) -> List[Dict]:
                 FROM cctv_detections cd
                 JOIN cctv_daily_monitoring cdm ON cd.monitoring_id = cdm.monitoring_id
                 WHERE DATE(cdm.date) = %s
+                AND cd.detection_timestamp >= %s
+                AND cd.detection_timestamp < %s + INTERVAL 1 DAY
                 GROUP BY force_id
-            """, (date,))
+            """, (date, date, date))
             
             results = []
             for row in cursor.fetchall():
                 force_id, avg_score, count = row
+                # stop_monitoring may already have written the day's row
                 cursor.execute("""
-                    INSERT INTO daily_depression_scores 
+                    INSERT INTO daily_depression_scores
                     (force_id, date, avg_depression_score, detection_count)
                     VALUES (%s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                    avg_depression_score = VALUES(avg_depression_score),
+                    detection_count = VALUES(detection_count)
                 """, (force_id, date, avg_score, count))
                 
                 results.append({
@@ -193,7 +236,7 @@ def calculate_daily_scores(self, date: str) -> List[Dict]:
             return results
             
         except Exception as e:
-            logging.error(f"Error calculating daily scores: {e}")
+            logger.error(f"Error calculating daily scores: {e}")
             if conn:
                 conn.rollback()
             return []
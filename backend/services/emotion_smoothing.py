@@ -0,0 +1,200 @@
+import os
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+# Probability vectors are stored as uint8 counts out of this total (BINARY(7))
+QUANTIZATION_LEVELS = 255
+
+
+def pack_probabilities(probs: Sequence[float]) -> bytes:
+    """
+    Quantize a probability vector to one byte per class for the
+    emotion_probs column. Largest-remainder rounding makes the bytes sum to
+    exactly 255, so the vector stays normalized and each class is off by at
+    most 1/255.
+    """
+    probs = np.clip(np.asarray(probs, dtype=np.float64), 0, None)
+    total = probs.sum()
+    if total <= 0:
+        raise ValueError("Probability vector has no mass")
+    scaled = probs / total * QUANTIZATION_LEVELS
+    counts = np.floor(scaled).astype(np.int64)
+    remainder = QUANTIZATION_LEVELS - int(counts.sum())
+    if remainder:
+        counts[np.argsort(counts - scaled, kind='stable')[:remainder]] += 1
+    return counts.astype(np.uint8).tobytes()
+
+
+def unpack_probabilities(blobs: Iterable[Optional[bytes]], classes: int = 7) -> np.ndarray:
+    """
+    Decode emotion_probs values into an (n, classes) float32 array; NULLs
+    become rows of NaN. For rescoring stored detections offline, e.g.
+    unpack_probabilities(blobs) @ weights.
+    """
+    blobs = list(blobs)
+    probs = np.full((len(blobs), classes), np.nan, dtype=np.float32)
+    for row, blob in enumerate(blobs):
+        if blob is not None:
+            probs[row] = np.frombuffer(bytes(blob), dtype=np.uint8, count=classes)
+    return probs / QUANTIZATION_LEVELS
+
+
+class EmotionStats(NamedTuple):
+    count: int
+    mean_score: Optional[float]
+    weighted_score: Optional[float]  # Weighted by each frame's top-1 probability
+    ewma_score: Optional[float]
+    histogram: Dict[str, float]  # Mean probability per emotion over the window
+    dominant_emotion: Optional[str]
+
+    @property
+    def probabilities(self) -> Optional[bytes]:
+        """The histogram packed for the emotion_probs column"""
+        return pack_probabilities(list(self.histogram.values())) if self.histogram else None
+
+
+class EmotionWindow:
+    """
+    Per-soldier ring buffer of the last `size` detections (emotion
+    probability vector, score, confidence, time) in preallocated NumPy
+    arrays, with running sums so adding a detection and reading the window
+    statistics are O(1). Detections older than `max_age` seconds are evicted
+    as well, so the window covers at most the last `max_age` seconds.
+    The EWMA runs over every detection ever added.
+    """
+
+    def __init__(self, size: int, classes: int, max_age: Optional[float] = None, alpha: float = 0.2):
+        self.size = size
+        self.max_age = max_age
+        self.alpha = alpha
+        self._probs = np.zeros((size, classes), dtype=np.float32)
+        self._scores = np.zeros(size, dtype=np.float32)
+        self._confidence = np.zeros(size, dtype=np.float32)
+        self._times = np.zeros(size, dtype=np.float64)
+        self._head = 0  # Next slot to write
+        self._count = 0
+        self._adds = 0
+        self._prob_sum = np.zeros(classes, dtype=np.float64)
+        self._score_sum = 0.0
+        self._weighted_sum = 0.0
+        self._confidence_sum = 0.0
+        self.ewma_score = None
+        self.ewma_probs = None
+
+    def __len__(self):
+        return self._count
+
+    def _evict_oldest(self):
+        tail = (self._head - self._count) % self.size
+        self._prob_sum -= self._probs[tail]
+        self._score_sum -= float(self._scores[tail])
+        self._weighted_sum -= float(self._scores[tail] * self._confidence[tail])
+        self._confidence_sum -= float(self._confidence[tail])
+        self._count -= 1
+
+    def expire(self, now: float):
+        """Evict detections older than max_age (amortized O(1): each one is evicted once)"""
+        if self.max_age is None:
+            return
+        while self._count and self._times[(self._head - self._count) % self.size] < now - self.max_age:
+            self._evict_oldest()
+
+    def _resum(self):
+        # Recompute the running sums from the buffer so float drift cannot accumulate
+        slots = (self._head - 1 - np.arange(self._count)) % self.size
+        self._prob_sum = self._probs[slots].sum(axis=0, dtype=np.float64)
+        self._score_sum = float(self._scores[slots].sum(dtype=np.float64))
+        self._weighted_sum = float((self._scores[slots] * self._confidence[slots]).sum(dtype=np.float64))
+        self._confidence_sum = float(self._confidence[slots].sum(dtype=np.float64))
+
+    def add(self, probs: np.ndarray, score: float, timestamp: float):
+        self.expire(timestamp)
+        if self._count == self.size:
+            self._evict_oldest()
+
+        slot = self._head
+        self._probs[slot] = probs
+        self._scores[slot] = score
+        confidence = self._probs[slot].max()
+        self._confidence[slot] = confidence
+        self._times[slot] = timestamp
+        self._head = (slot + 1) % self.size
+        self._count += 1
+
+        self._prob_sum += self._probs[slot]
+        self._score_sum += float(self._scores[slot])
+        self._weighted_sum += float(self._scores[slot] * confidence)
+        self._confidence_sum += float(confidence)
+
+        if self.ewma_score is None:
+            self.ewma_score = float(score)
+            self.ewma_probs = self._probs[slot].astype(np.float64)
+        else:
+            self.ewma_score += self.alpha * (float(score) - self.ewma_score)
+            self.ewma_probs += self.alpha * (self._probs[slot] - self.ewma_probs)
+
+        self._adds += 1
+        if self._adds % self.size == 0:
+            self._resum()
+
+    def stats(self, labels: Sequence[str]) -> EmotionStats:
+        if not self._count:
+            return EmotionStats(0, None, None, self.ewma_score, {}, None)
+        histogram = self._prob_sum / self._count
+        return EmotionStats(
+            count=self._count,
+            mean_score=self._score_sum / self._count,
+            weighted_score=self._weighted_sum / self._confidence_sum if self._confidence_sum > 0 else None,
+            ewma_score=self.ewma_score,
+            histogram={label: float(p) for label, p in zip(labels, histogram)},
+            dominant_emotion=labels[int(np.argmax(histogram))]
+        )
+
+
+class EmotionSmoother:
+    """
+    Streaming per-soldier emotion statistics for the monitoring loop. Memory
+    is one EmotionWindow (`window_size` detections) per soldier seen, however
+    long they stay in frame.
+    """
+
+    def __init__(self, labels: Sequence[str], window_size: int = 32, window_seconds: Optional[float] = 3.0,
+                 alpha: float = 0.2):
+        self.labels = list(labels)
+        self.window_size = window_size
+        self.window_seconds = window_seconds
+        self.alpha = alpha
+        self._windows = {}
+
+    @classmethod
+    def from_env(cls, labels: Sequence[str], window_seconds: Optional[float] = 3.0) -> 'EmotionSmoother':
+        """EMOTION_WINDOW_SIZE (detections, default 32) and EMOTION_EWMA_ALPHA (default 0.2)"""
+        return cls(
+            labels,
+            window_size=int(os.getenv('EMOTION_WINDOW_SIZE', 32)),
+            window_seconds=window_seconds,
+            alpha=float(os.getenv('EMOTION_EWMA_ALPHA', 0.2))
+        )
+
+    def add(self, force_id: str, probs: np.ndarray, score: float, timestamp: Optional[float] = None):
+        window = self._windows.get(force_id)
+        if window is None:
+            window = self._windows[force_id] = EmotionWindow(
+                self.window_size, len(self.labels), self.window_seconds, self.alpha
+            )
+        window.add(probs, score, time.time() if timestamp is None else timestamp)
+
+    def stats(self, force_id: str, now: Optional[float] = None) -> EmotionStats:
+        window = self._windows.get(force_id)
+        if window is None:
+            return EmotionStats(0, None, None, None, {}, None)
+        window.expire(time.time() if now is None else now)
+        return window.stats(self.labels)
+
+    def soldiers(self) -> List[str]:
+        return list(self._windows)
+
+    def clear(self):
+        self._windows = {}
@@ -0,0 +1,156 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """
+    One client's bounded buffer of serialized batches. When the client falls
+    more than `max_batches` behind, the oldest batches are discarded and
+    counted in `dropped`, so a slow consumer never holds up the others or
+    grows memory.
+    """
+
+    def __init__(self, broker: 'EventBroker', max_batches: int):
+        self._broker = broker
+        self._batches = deque()
+        self._max_batches = max_batches
+        self._cond = threading.Condition()
+        self.dropped = 0
+        self.closed = False
+
+    def offer(self, frame: bytes):
+        with self._cond:
+            if len(self._batches) >= self._max_batches:
+                self._batches.popleft()
+                self.dropped += 1
+            self._batches.append(frame)
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """The next batch as an SSE frame, or None on timeout or close"""
+        with self._cond:
+            if not self._batches and not self.closed:
+                self._cond.wait(timeout)
+            return self._batches.popleft() if self._batches else None
+
+    def iter_sse(self, keepalive: float = 15.0, max_seconds: Optional[float] = None) -> Iterator[bytes]:
+        """
+        Server-Sent Events body: batches as they arrive, a comment line every
+        `keepalive` seconds while idle, and a 'dropped' event after batches
+        were discarded. Ends after `max_seconds`; EventSource clients then
+        reconnect on their own.
+        """
+        deadline = None if max_seconds is None else time.monotonic() + max_seconds
+        reported_dropped = 0
+        try:
+            yield b'retry: 3000\n\n'
+            while not self.closed and (deadline is None or time.monotonic() < deadline):
+                frame = self.get(timeout=keepalive)
+                if self.dropped != reported_dropped:
+                    yield f'event: dropped\ndata: {{"batches": {self.dropped - reported_dropped}}}\n\n'.encode()
+                    reported_dropped = self.dropped
+                yield frame if frame is not None else b': keepalive\n\n'
+        finally:
+            self.close()
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+        self._broker.unsubscribe(self)
+
+
+class EventBroker:
+    """
+    In-process pub/sub for monitoring events.
+
+    publish() only appends to a pending list. A flusher thread collects the
+    events every `batch_interval` seconds, serializes them once into a
+    single SSE frame (`id: <seq>`, `event: batch`, data {"seq", "events"})
+    and hands that same bytes object to every subscriber, so the cost of a
+    batch does not depend on the number of clients. At most `max_pending`
+    events are kept between flushes.
+    """
+
+    def __init__(self, batch_interval: float = 0.25, max_pending: int = 5000, client_buffer: int = 40):
+        self.batch_interval = batch_interval
+        self.client_buffer = client_buffer
+        self._pending = deque(maxlen=max_pending)
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._seq = 0
+        self._thread = None
+
+    def publish(self, event_type: str, data: Dict):
+        self._pending.append({'type': event_type, 'time': time.time(), 'data': data})
+        if self._thread is None:
+            self._start()
+
+    def publish_frame(self, frame: bytes):
+        """Fan out an already serialized frame (e.g. relayed from another process)"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.offer(frame)
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self, self.client_buffer)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='event-broker', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.batch_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing monitoring events: {e}")
+
+    def flush(self):
+        """Send the events published since the last flush as one batch"""
+        events = []
+        while self._pending:
+            events.append(self._pending.popleft())
+        if not events or not self._subscribers:
+            return
+        self._seq += 1
+        payload = json.dumps({'seq': self._seq, 'events': events}, default=str, separators=(',', ':'))
+        self.publish_frame(f'id: {self._seq}\nevent: batch\ndata: {payload}\n\n'.encode())
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_event_broker() -> EventBroker:
+    """Return the process-wide EventBroker (batching interval from EVENT_BATCH_MS, default 250)"""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = EventBroker(
+                batch_interval=int(os.getenv('EVENT_BATCH_MS', 250)) / 1000,
+                client_buffer=int(os.getenv('EVENT_CLIENT_BUFFER', 40))
+            )
+        return _broker
@@ -0,0 +1,245 @@
+import argparse
+import io
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Dict, Iterator, Optional
+from db.connection import get_connection
+
+logger = logging.getLogger(__name__)
+
+# Exportable tables: columns in order, the timestamp used for date partitions
+# and range filters, and the primary key the scan follows (clustered-index
+# order, so MySQL streams rows without sorting)
+EXPORT_TABLES = {
+    'cctv_detections': {
+        'columns': [
+            ('detection_id', 'int64'), ('monitoring_id', 'int64'), ('force_id', 'string'),
+            ('detection_timestamp', 'timestamp'), ('depression_score', 'float64'),
+            ('emotion_probs', 'probabilities')
+        ],
+        'timestamp': 'detection_timestamp',
+        'key': 'detection_id'
+    },
+    'weekly_sessions': {
+        'columns': [
+            ('session_id', 'int64'), ('force_id', 'string'), ('questionnaire_id', 'int64'),
+            ('year', 'int64'), ('start_timestamp', 'timestamp'), ('completion_timestamp', 'timestamp'),
+            ('status', 'string'), ('nlp_avg_score', 'float64'), ('image_avg_score', 'float64'),
+            ('combined_avg_score', 'float64')
+        ],
+        'timestamp': 'start_timestamp',
+        'key': 'session_id'
+    },
+    'question_responses': {
+        'columns': [
+            ('response_id', 'int64'), ('session_id', 'int64'), ('question_id', 'int64'),
+            ('answer_text', 'string'), ('nlp_depression_score', 'float64'),
+            ('image_depression_score', 'float64'), ('combined_depression_score', 'float64'),
+            ('timestamp', 'timestamp')
+        ],
+        'timestamp': 'timestamp',
+        'key': 'response_id'
+    }
+}
+
+EXPORT_FORMATS = ('parquet', 'arrow')
+
+
+def _arrow():
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError:
+        raise Exception("pyarrow is required for exports; install it with 'pip install pyarrow'")
+
+
+def get_export_schema(table: str):
+    pa = _arrow()
+    types = {
+        'int64': pa.int64(),
+        'float64': pa.float64(),
+        'string': pa.string(),
+        'timestamp': pa.timestamp('s'),
+        'probabilities': pa.binary(7)  # Decode with emotion_smoothing.unpack_probabilities
+    }
+    return pa.schema([(name, types[kind]) for name, kind in EXPORT_TABLES[table]['columns']])
+
+
+class HistoryExporter:
+    """
+    Streams monitoring and survey history out of MySQL as compressed columnar data.
+
+    Rows are read with an unbuffered (server-side) cursor in chunks of
+    `chunk_size` inside a read-only consistent snapshot, converted to Arrow
+    record batches and written out immediately, so memory use depends on the
+    chunk size and not on the table size. File exports keep at most
+    `max_open_writers` date partitions open at a time.
+    """
+
+    def __init__(self, chunk_size: int = 50000, compression: str = 'zstd', max_open_writers: int = 4):
+        self.chunk_size = chunk_size
+        self.compression = compression
+        self.max_open_writers = max_open_writers
+
+    def iter_batches(self, table: str, start: Optional[date] = None,
+                     end: Optional[date] = None) -> Iterator:
+        """Yield Arrow record batches of rows with start <= timestamp < end"""
+        if table not in EXPORT_TABLES:
+            raise ValueError(f"Unknown export table: {table}")
+        pa = _arrow()
+        spec = EXPORT_TABLES[table]
+        schema = get_export_schema(table)
+        names = [name for name, _ in spec['columns']]
+
+        conditions = []
+        params = []
+        if start:
+            conditions.append(f"`{spec['timestamp']}` >= %s")
+            params.append(start)
+        if end:
+            conditions.append(f"`{spec['timestamp']}` < %s")
+            params.append(end)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        conn = None
+        cursor = None
+        try:
+            conn = get_connection()
+            conn.start_transaction(consistent_snapshot=True, readonly=True)
+            cursor = conn.cursor(buffered=False)
+            cursor.execute(
+                f"SELECT {', '.join(f'`{name}`' for name in names)} FROM {table} {where} "
+                f"ORDER BY `{spec['key']}`",
+                tuple(params)
+            )
+            while True:
+                rows = cursor.fetchmany(self.chunk_size)
+                if not rows:
+                    break
+                columns = [list(column) for column in zip(*rows)]
+                yield pa.RecordBatch.from_arrays(
+                    [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                    schema=schema
+                )
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.rollback()
+                conn.close()
+
+    def export_files(self, table: str, output_dir: str, start: Optional[date] = None,
+                     end: Optional[date] = None, fmt: str = 'parquet') -> Dict:
+        """
+        Export a table to files partitioned by date:
+        <output_dir>/<table>/date=YYYY-MM-DD/part-<n>.<fmt>
+
+        The scan follows the primary key, which is only roughly in date
+        order, so rows of a day can still arrive after other days. Only the
+        `max_open_writers` most recently written days keep their file open;
+        older ones are closed (releasing the descriptor and buffered row
+        group metadata), and a day that shows up again after its file was
+        closed continues in a new part file.
+
+        Returns:
+            dict: table, rows, files written, elapsed seconds and rows_per_sec
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        pa = _arrow()
+        import pyarrow.compute as pc
+        schema = get_export_schema(table)
+        timestamp_column = EXPORT_TABLES[table]['timestamp']
+
+        writers = OrderedDict()  # day -> open writer, least recently written first
+        parts = {}  # day -> files written so far
+        rows = 0
+        start_time = time.perf_counter()
+        try:
+            for batch in self.iter_batches(table, start, end):
+                days = pc.strftime(batch.column(timestamp_column), format='%Y-%m-%d')
+                for day in pc.unique(days).to_pylist():
+                    mask = pc.is_null(days) if day is None else pc.equal(days, day)
+                    part = batch.filter(mask)
+                    writer = writers.get(day)
+                    if writer is None:
+                        if len(writers) >= self.max_open_writers:
+                            writers.popitem(last=False)[1].close()
+                        writer = self._open_writer(output_dir, table, day or 'unknown', parts.get(day, 0),
+                                                   fmt, schema)
+                        writers[day] = writer
+                        parts[day] = parts.get(day, 0) + 1
+                    else:
+                        writers.move_to_end(day)
+                    writer.write_table(pa.Table.from_batches([part]))
+                rows += batch.num_rows
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        elapsed = time.perf_counter() - start_time
+        result = {
+            'table': table,
+            'format': fmt,
+            'rows': rows,
+            'files': sum(parts.values()),
+            'elapsed_s': round(elapsed, 3),
+            'rows_per_sec': round(rows / elapsed, 1) if elapsed > 0 else None
+        }
+        logger.info(f"Exported {result}")
+        return result
+
+    def _open_writer(self, output_dir: str, table: str, day: str, part: int, fmt: str, schema):
+        pa = _arrow()
+        directory = os.path.join(output_dir, table, f"date={day}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"part-{part}.{fmt}")
+        if fmt == 'parquet':
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(path, schema, compression=self.compression)
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        return pa.ipc.new_file(path, schema, options=options)
+
+    def stream_ipc(self, table: str, start: Optional[date] = None,
+                   end: Optional[date] = None) -> Iterator[bytes]:
+        """Yield an Arrow IPC stream of the table chunk by chunk, for HTTP responses"""
+        pa = _arrow()
+        sink = io.BytesIO()
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        writer = pa.ipc.new_stream(sink, get_export_schema(table), options=options)
+
+        def drain():
+            # Hand over what was written so far and empty the buffer
+            data = sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+            return data
+
+        for batch in self.iter_batches(table, start, end):
+            writer.write_batch(batch)
+            yield drain()
+        writer.close()
+        yield drain()
+
+
+def parse_date(value: Optional[str]) -> Optional[date]:
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export monitoring and survey history as columnar files")
+    parser.add_argument('tables', nargs='*', default=list(EXPORT_TABLES), choices=list(EXPORT_TABLES))
+    parser.add_argument('--output', default=os.path.join('storage', 'exports'))
+    parser.add_argument('--start', help='first date to export (YYYY-MM-DD)')
+    parser.add_argument('--end', help='date to stop before (YYYY-MM-DD)')
+    parser.add_argument('--format', default='parquet', choices=EXPORT_FORMATS)
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    args = parser.parse_args()
+
+    exporter = HistoryExporter(chunk_size=args.chunk_size)
+    for table in args.tables:
+        print(exporter.export_files(table, args.output, parse_date(args.start),
+                                    parse_date(args.end), args.format))
@@ -2,24 +2,32 @@
 import os
 import pickle
 import logging
+from collections import OrderedDict
 from datetime import datetime
 from db.connection import get_connection
+from services.roi_face_detector import load_face_cascade
+from utils.file_lock import FileLock
 import shutil
 import cv2
 
-# Configure logging
-logging.basicConfig(
-    filename="face_recognition_training.log",
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+logger = logging.getLogger(__name__)
 
 class FaceRecognitionService:
-    def __init__(self):
+    def __init__(self, detector=None, detection_scale=None):
         self.uploads_dir = os.path.join('storage', 'uploads')
         self.model_dir = os.path.join('storage', 'models')
         self.profile_pics_dir = os.path.join('storage', 'profile_pics')
         self.model_filename = os.path.join(self.model_dir, 'face_recognition_model.pkl')
+        # Serializes gallery updates across job workers and API processes
+        self.model_lock = FileLock(os.path.join(self.model_dir, 'face_recognition_model.lock'))
+        
+        # Face detection for encoding: 'haar' or 'hog' run on a downscaled copy,
+        # 'full' lets face_encodings run HOG on the full-resolution image
+        self.detector = detector or os.getenv('FACE_DETECTOR', 'haar')
+        self.detection_scale = detection_scale or float(os.getenv('FACE_DETECTION_SCALE', 0.25))
+        self.face_cascade = None
+        if self.detector == 'haar':
+            self.face_cascade = load_face_cascade()
         
         # Ensure required directories exist
         for directory in [self.model_dir, self.profile_pics_dir]:
@@ -48,135 +56,303 @@ def get_untrained_soldiers(self):
             if conn:
                 conn.close()
 
-    def mark_soldiers_as_trained(self, force_ids, model_version):
-        """Mark soldiers as trained in the database"""
-        if not force_ids:
-            return
-            
+    def save_profile_picture(self, force_id: str, source_path: str) -> bool:
+        """Save a profile picture for a soldier"""
+        try:
+            # Read the source image
+            image = cv2.imread(source_path)
+            if image is None:
+                logger.error(f"Could not read image {source_path}")
+                return False
+                
+            # Save as PNG for better quality
+            profile_pic_path = os.path.join(self.profile_pics_dir, f"{force_id}.png")
+            cv2.imwrite(profile_pic_path, image)
+            logger.info(f"Saved profile picture for soldier {force_id}")
+            return True
+        except Exception as e:
+            logger.error(f"Error saving profile picture for soldier {force_id}: {e}")
+            return False
+                
+    def _load_gallery(self):
+        """Load the saved model as an ordered mapping of force_id -> list of encodings"""
+        gallery = OrderedDict()
+        if not os.path.exists(self.model_filename):
+            return gallery
+        try:
+            with open(self.model_filename, "rb") as f:
+                known_face_encodings, known_force_ids = pickle.load(f)
+        except Exception as e:
+            logger.error(f"Error loading existing model: {e}")
+            raise
+        for encoding, force_id in zip(known_face_encodings, known_force_ids):
+            gallery.setdefault(force_id, []).append(encoding)
+        logger.info(f"Loaded existing model with {len(gallery)} soldiers")
+        return gallery
+
+    def _save_gallery(self, gallery, trained_force_ids, removed_force_ids, model_version):
+        """
+        Write a new model version and record it in trained_soldiers as one unit.
+
+        The model is written to a temporary file and trained_soldiers is
+        updated in one transaction. The new file is moved into place before
+        that transaction commits, and the previous model is restored if the
+        commit fails. A crash in between leaves the file ahead of the
+        database: newly trained soldiers are still listed as untrained (their
+        images are only deleted after this returns) and are simply encoded
+        again by the next training run. Running monitoring picks the new
+        file up by itself (EmotionDetectionService.reload_gallery_if_changed).
+        """
+        known_face_encodings = []
+        known_force_ids = []
+        for force_id, encodings in gallery.items():
+            known_face_encodings.extend(encodings)
+            known_force_ids.extend([force_id] * len(encodings))
+
+        temp_filename = f"{self.model_filename}.{model_version}.tmp"
+        previous_filename = f"{self.model_filename}.prev"
+        with open(temp_filename, "wb") as f:
+            pickle.dump((known_face_encodings, known_force_ids), f)
+            f.flush()
+            os.fsync(f.fileno())
+
         conn = None
         cursor = None
+        replaced = False
         try:
             conn = get_connection()
             cursor = conn.cursor()
             
-            # Create batch insert query
-            values = [(force_id, model_version) for force_id in force_ids]
-            cursor.executemany(
-                "INSERT INTO trained_soldiers (force_id, model_version) VALUES (%s, %s)",
-                values
-            )
+            changed_force_ids = list(trained_force_ids) + list(removed_force_ids)
+            if changed_force_ids:
+                placeholders = ", ".join(["%s"] * len(changed_force_ids))
+                cursor.execute(
+                    f"DELETE FROM trained_soldiers WHERE force_id IN ({placeholders})",
+                    changed_force_ids
+                )
+            if trained_force_ids:
+                cursor.executemany(
+                    "INSERT INTO trained_soldiers (force_id, model_version) VALUES (%s, %s)",
+                    [(force_id, model_version) for force_id in trained_force_ids]
+                )
             
+            # Keep the live model to restore if the commit fails
+            if os.path.exists(self.model_filename):
+                shutil.copy2(self.model_filename, previous_filename)
+            os.replace(temp_filename, self.model_filename)
+            replaced = True
             conn.commit()
-        except Exception as e:
+        except Exception:
             if conn:
                 conn.rollback()
-            raise e
+            if not replaced:
+                os.remove(temp_filename)
+            elif os.path.exists(previous_filename):
+                os.replace(previous_filename, self.model_filename)
+            else:
+                os.remove(self.model_filename)
+            raise
         finally:
             if cursor:
                 cursor.close()
             if conn:
                 conn.close()
 
-    def save_profile_picture(self, force_id: str, source_path: str) -> bool:
-        """Save a profile picture for a soldier"""
+        if os.path.exists(previous_filename):
+            os.remove(previous_filename)
+        logger.info(f"Saved model version {model_version} with {len(gallery)} total soldiers")
+
+    def locate_face(self, image):
+        """
+        Find the largest face on a downscaled copy of an RGB image
+
+        Returns:
+            list: [(top, right, bottom, left)] in full-resolution coordinates, or [] if none found
+        """
+        scale = self.detection_scale
+        small = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+        if self.detector == 'haar':
+            gray = cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+            faces = self.face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(20, 20))
+            locations = [(y, x + w, y + h, x) for (x, y, w, h) in faces]
+        else:
+            locations = face_recognition.face_locations(small, model='hog')
+
+        if len(locations) == 0:
+            return []
+
+        top, right, bottom, left = max(locations, key=lambda loc: (loc[2] - loc[0]) * (loc[1] - loc[3]))
+        height, width = image.shape[:2]
+        return [(
+            max(0, int(top / scale)),
+            min(width, int(right / scale)),
+            min(height, int(bottom / scale)),
+            max(0, int(left / scale))
+        )]
+
+    def encode_face(self, image):
+        """
+        Compute the face encoding of the main face in an RGB image
+
+        Uses the fast downscaled detector when configured and falls back to the
+        full-resolution HOG detector when it finds nothing.
+
+        Returns:
+            numpy.ndarray or None: 128-d encoding, or None if no face was found
+        """
+        if self.detector != 'full':
+            locations = self.locate_face(image)
+            if locations:
+                encodings = face_recognition.face_encodings(image, known_face_locations=locations)
+                if encodings:
+                    return encodings[0]
+
+        encodings = face_recognition.face_encodings(image)
+        return encodings[0] if encodings else None
+
+    def _encode_soldier_images(self, force_id):
+        """
+        Encode every enrollment image uploaded for a soldier
+
+        Returns:
+            tuple: (list of encodings, path of the first usable image or None)
+        """
+        soldier_dir = os.path.join(self.uploads_dir, force_id)
+        if not os.path.exists(soldier_dir):
+            logger.warning(f"No images found for soldier {force_id}")
+            return [], None
+
+        encodings = []
+        first_valid_image = None
+        for filename in sorted(os.listdir(soldier_dir)):
+            if filename.lower().endswith(('.jpg', '.jpeg', '.png')):
+                image_path = os.path.join(soldier_dir, filename)
+                try:
+                    image = face_recognition.load_image_file(image_path)
+                    face_encoding = self.encode_face(image)
+                    if face_encoding is not None:
+                        # Store first valid image path for profile picture
+                        if not first_valid_image:
+                            first_valid_image = image_path
+                        encodings.append(face_encoding)
+                        logger.info(f"Processed image {filename} for soldier {force_id}")
+                except Exception as e:
+                    logger.error(f"Error processing image {image_path}: {e}")
+        return encodings, first_valid_image
+
+    def _finish_enrollment(self, force_id, first_valid_image):
+        """Save the profile picture and delete the soldier's training images"""
+        # Save profile picture before deleting training images
+        if first_valid_image:
+            self.save_profile_picture(force_id, first_valid_image)
+        
+        # Delete the soldier's image folder after successful processing
+        soldier_dir = os.path.join(self.uploads_dir, force_id)
         try:
-            # Read the source image
-            image = cv2.imread(source_path)
-            if image is None:
-                logging.error(f"Could not read image {source_path}")
-                return False
-                
-            # Save as PNG for better quality
-            profile_pic_path = os.path.join(self.profile_pics_dir, f"{force_id}.png")
-            cv2.imwrite(profile_pic_path, image)
-            logging.info(f"Saved profile picture for soldier {force_id}")
-            return True
+            shutil.rmtree(soldier_dir)
+            logger.info(f"Deleted images for soldier {force_id}")
         except Exception as e:
-            logging.error(f"Error saving profile picture for soldier {force_id}: {e}")
-            return False
-                
-    def train_model(self):
-        """Train the face recognition model on new soldiers"""
+            logger.error(f"Error deleting images for soldier {force_id}: {e}")
+
+    def train_model(self, progress_callback=None):
+        """
+        Train the face recognition model on new soldiers
+        
+        Args:
+            progress_callback (callable, optional): Called as (fraction, message) after each soldier
+        """
         # Get untrained soldiers
         untrained_soldiers = self.get_untrained_soldiers()
         if not untrained_soldiers:
-            logging.info("No new soldiers to train")
+            logger.info("No new soldiers to train")
             return {"message": "No new soldiers to train"}
 
-        known_face_encodings = []
-        known_force_ids = []
-        trained_force_ids = []
+        # Encode outside the model lock; only the gallery update needs it
+        new_encodings = OrderedDict()
+        first_images = {}
+        for index, force_id in enumerate(untrained_soldiers):
+            if progress_callback:
+                progress_callback(index / len(untrained_soldiers), f"Encoding images for soldier {force_id}")
+            encodings, first_valid_image = self._encode_soldier_images(force_id)
+            if encodings:
+                new_encodings[force_id] = encodings
+                first_images[force_id] = first_valid_image
+
+        if not new_encodings:
+            return {"message": "No new soldiers were successfully trained"}
+
         model_version = datetime.now().strftime("%Y%m%d_%H%M%S")
+        with self.model_lock:
+            gallery = self._load_gallery()
+            gallery.update(new_encodings)
+            self._save_gallery(gallery, list(new_encodings), [], model_version)
+
+        for force_id, first_valid_image in first_images.items():
+            self._finish_enrollment(force_id, first_valid_image)
+
+        trained_force_ids = list(new_encodings)
+        return {
+            "message": f"Successfully trained model on {len(trained_force_ids)} new soldiers",
+            "trained_soldiers": trained_force_ids,
+            "model_version": model_version
+        }
 
-        # Load existing model if it exists
-        if os.path.exists(self.model_filename):
-            try:
-                with open(self.model_filename, "rb") as f:
-                    known_face_encodings, known_force_ids = pickle.load(f)
-                logging.info(f"Loaded existing model with {len(known_force_ids)} soldiers")
-            except Exception as e:
-                logging.error(f"Error loading existing model: {e}")
-                known_face_encodings = []
-                known_force_ids = []
-
-        # Process each untrained soldier
-        for force_id in untrained_soldiers:
-            soldier_dir = os.path.join(self.uploads_dir, force_id)
-            if not os.path.exists(soldier_dir):
-                logging.warning(f"No images found for soldier {force_id}")
-                continue
-
-            processed = False
-            first_valid_image = None
+    def add_soldier(self, force_id, replace=False):
+        """
+        Encode one soldier's uploaded images and add them to the gallery,
+        leaving every other soldier's encodings untouched
+        
+        Args:
+            force_id (str): The soldier to enroll
+            replace (bool): Replace existing encodings instead of refusing
             
-            for filename in os.listdir(soldier_dir):
-                if filename.lower().endswith(('.jpg', '.jpeg', '.png')):
-                    image_path = os.path.join(soldier_dir, filename)
-                    try:
-                        image = face_recognition.load_image_file(image_path)
-                        face_encodings = face_recognition.face_encodings(image)
-                        if face_encodings:
-                            # Store first valid image path for profile picture
-                            if not first_valid_image:
-                                first_valid_image = image_path
-                                
-                            known_face_encodings.append(face_encodings[0])
-                            known_force_ids.append(force_id)
-                            processed = True
-                            logging.info(f"Processed image {filename} for soldier {force_id}")
-                    except Exception as e:
-                        logging.error(f"Error processing image {image_path}: {e}")
-
-            if processed:
-                trained_force_ids.append(force_id)
-                
-                # Save profile picture before deleting training images
-                if first_valid_image:
-                    self.save_profile_picture(force_id, first_valid_image)
-                
-                # Delete the soldier's image folder after successful processing
-                try:
-                    shutil.rmtree(soldier_dir)
-                    logging.info(f"Deleted images for soldier {force_id}")
-                except Exception as e:
-                    logging.error(f"Error deleting images for soldier {force_id}: {e}")
-
-        # Save the updated model
-        if trained_force_ids:
-            try:
-                with open(self.model_filename, "wb") as f:
-                    pickle.dump((known_face_encodings, known_force_ids), f)
-                logging.info(f"Saved model with {len(known_force_ids)} total soldiers")
-                
-                # Mark soldiers as trained in database
-                self.mark_soldiers_as_trained(trained_force_ids, model_version)
-                
-                return {
-                    "message": f"Successfully trained model on {len(trained_force_ids)} new soldiers",
-                    "trained_soldiers": trained_force_ids
-                }
-            except Exception as e:
-                logging.error(f"Error saving model: {e}")
-                raise
-        else:
-            return {"message": "No new soldiers were successfully trained"}
+        Returns:
+            dict: Result message, encoding count and model version
+        """
+        encodings, first_valid_image = self._encode_soldier_images(force_id)
+        if not encodings:
+            raise ValueError(f"No usable face images found for soldier {force_id}")
+
+        model_version = datetime.now().strftime("%Y%m%d_%H%M%S")
+        with self.model_lock:
+            gallery = self._load_gallery()
+            if force_id in gallery and not replace:
+                raise ValueError(f"Soldier {force_id} is already in the model")
+            # Re-inserting moves a replaced soldier to the end; order doesn't matter for matching
+            gallery.pop(force_id, None)
+            gallery[force_id] = encodings
+            self._save_gallery(gallery, [force_id], [], model_version)
+
+        self._finish_enrollment(force_id, first_valid_image)
+        return {
+            "message": f"{'Replaced' if replace else 'Added'} soldier {force_id} in the model",
+            "force_id": force_id,
+            "encodings": len(encodings),
+            "model_version": model_version
+        }
+
+    def replace_soldier(self, force_id):
+        """Re-enroll one soldier from freshly uploaded images"""
+        return self.add_soldier(force_id, replace=True)
+
+    def delete_soldier(self, force_id):
+        """
+        Remove a soldier's encodings from the gallery
+        
+        Returns:
+            dict: Result message and model version
+        """
+        model_version = datetime.now().strftime("%Y%m%d_%H%M%S")
+        with self.model_lock:
+            gallery = self._load_gallery()
+            if force_id not in gallery:
+                raise ValueError(f"Soldier {force_id} is not in the model")
+            del gallery[force_id]
+            self._save_gallery(gallery, [], [force_id], model_version)
+
+        return {
+            "message": f"Removed soldier {force_id} from the model",
+            "force_id": force_id,
+            "model_version": model_version
+        }
@@ -0,0 +1,268 @@
+import logging
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FRAME_SHAPE = (720, 1280, 3)  # What CCTVMonitoringService processes
+
+_MAGIC = 0x46524D42  # 'FRMB'
+_HEADER_FIELDS = 8
+# Header fields (int64)
+_H_MAGIC, _H_HEIGHT, _H_WIDTH, _H_CHANNELS, _H_SLOTS, _H_WRITE_SEQ, _H_STATE = range(7)
+
+# Producer states
+STATE_STARTING, STATE_RUNNING, STATE_STOPPED, STATE_FAILED = range(4)
+
+
+def _align(offset: int, to: int = 64) -> int:
+    return (offset + to - 1) // to * to
+
+
+class Frame(NamedTuple):
+    seq: int
+    timestamp: float
+    image: np.ndarray
+
+
+class SharedFrameRing:
+    """
+    Fixed-size ring of frames in a multiprocessing.shared_memory segment.
+
+    One producer publishes frames with increasing sequence numbers (from 1);
+    any number of consumers in other processes read the latest one. The
+    segment holds a small header, a sequence number and timestamp per slot
+    and `slots` frame buffers, so a frame crosses the process boundary
+    without pickling: the producer copies it into its slot once and
+    consumers get a numpy view of that slot.
+
+    A view stays valid until the producer wraps around to the same slot
+    (`slots` frames later); `is_valid(frame)` tells whether that has
+    happened. Pass copy=True to latest() for a private copy instead.
+
+        ring = SharedFrameRing.create(slots=8)      # owner
+        ring = SharedFrameRing.attach(ring.name)    # in the other process
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self._shm = shm
+        self.owner = owner
+        self._header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        if self._header[_H_MAGIC] != _MAGIC:
+            raise ValueError(f"Shared memory segment {shm.name} is not a frame ring")
+        self.shape = tuple(int(v) for v in self._header[_H_HEIGHT:_H_CHANNELS + 1])
+        self.slots = int(self._header[_H_SLOTS])
+
+        offset = _HEADER_FIELDS * 8
+        self._slot_seq = np.ndarray((self.slots,), dtype=np.int64, buffer=shm.buf, offset=offset)
+        offset += self.slots * 8
+        self._slot_time = np.ndarray((self.slots,), dtype=np.float64, buffer=shm.buf, offset=offset)
+        offset = _align(offset + self.slots * 8)
+        self._frames = np.ndarray((self.slots, *self.shape), dtype=np.uint8, buffer=shm.buf, offset=offset)
+
+    @staticmethod
+    def _size(shape: Tuple[int, int, int], slots: int) -> int:
+        return _align(_HEADER_FIELDS * 8 + slots * 16) + slots * int(np.prod(shape))
+
+    @classmethod
+    def create(cls, shape: Tuple[int, int, int] = FRAME_SHAPE, slots: int = 8,
+               name: Optional[str] = None) -> 'SharedFrameRing':
+        """Allocate a new ring; the creating process should unlink() it when done"""
+        if slots < 2:
+            raise ValueError("A frame ring needs at least 2 slots")
+        shm = shared_memory.SharedMemory(name=name, create=True, size=cls._size(shape, slots))
+        header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[_H_HEIGHT:_H_CHANNELS + 1] = shape
+        header[_H_SLOTS] = slots
+        header[_H_MAGIC] = _MAGIC
+        del header
+        ring = cls(shm, owner=True)
+        ring._slot_seq[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedFrameRing':
+        """
+        Open an existing ring. Meant for processes started from the owner with
+        multiprocessing, which share its resource tracker: the segment is then
+        only removed when the owner unlinks it (or the whole process tree exits).
+        """
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def state(self) -> int:
+        return int(self._header[_H_STATE])
+
+    @state.setter
+    def state(self, value: int):
+        self._header[_H_STATE] = value
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the newest frame (0 before the first)"""
+        return int(self._header[_H_WRITE_SEQ])
+
+    def publish(self, image: np.ndarray, timestamp: Optional[float] = None) -> int:
+        """Copy a frame into the next slot and return its sequence number (single producer)"""
+        if image.shape != self.shape:
+            raise ValueError(f"Frame shape {image.shape} does not match ring shape {self.shape}")
+        seq = self.last_seq + 1
+        slot = (seq - 1) % self.slots
+        # Mark the slot as being written so readers of the old frame notice
+        self._slot_seq[slot] = 0
+        np.copyto(self._frames[slot], image, casting='unsafe')
+        self._slot_time[slot] = time.time() if timestamp is None else timestamp
+        self._slot_seq[slot] = seq
+        self._header[_H_WRITE_SEQ] = seq
+        return seq
+
+    def latest(self, after: int = 0, copy: bool = False) -> Optional[Frame]:
+        """The newest frame if its sequence number is greater than `after`, else None"""
+        while True:
+            seq = self.last_seq
+            if seq <= after:
+                return None
+            slot = (seq - 1) % self.slots
+            timestamp = float(self._slot_time[slot])
+            image = self._frames[slot].copy() if copy else self._frames[slot]
+            if self._slot_seq[slot] == seq:
+                return Frame(seq, timestamp, image)
+            # The producer lapped us while reading; take the newer frame
+
+    def wait(self, after: int = 0, timeout: Optional[float] = None, copy: bool = False,
+             poll_interval: float = 0.001) -> Optional[Frame]:
+        """Block until a frame newer than `after` is published or the producer stops"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            frame = self.latest(after, copy)
+            if frame is not None:
+                return frame
+            if self.state in (STATE_STOPPED, STATE_FAILED):
+                return None
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(poll_interval)
+
+    def is_valid(self, frame: Frame) -> bool:
+        """Whether a view returned by latest() still holds that frame"""
+        return self._slot_seq[(frame.seq - 1) % self.slots] == frame.seq
+
+    def close(self):
+        # Drop our views before closing, or the buffer cannot be released
+        self._header = self._slot_seq = self._slot_time = self._frames = None
+        self._shm.close()
+
+    def unlink(self):
+        self._shm.unlink()
+
+
+def run_capture(ring_name: str, camera_indices: Sequence[int], stop_event, fps: Optional[float] = None):
+    """
+    Capture process body: read the first camera in `camera_indices` that
+    opens and publish its frames, resized to the ring shape, until
+    `stop_event` is set.
+    """
+    import cv2
+
+    ring = SharedFrameRing.attach(ring_name)
+    height, width = ring.shape[:2]
+    cap = None
+    try:
+        for index in camera_indices:
+            cap = cv2.VideoCapture(index)
+            if cap.isOpened():
+                logger.info(f"Capture process using camera {index}")
+                break
+            cap.release()
+            cap = None
+        if cap is None:
+            logger.error("Capture process found no available camera")
+            ring.state = STATE_FAILED
+            return
+
+        ring.state = STATE_RUNNING
+        interval = 1.0 / fps if fps else 0.0
+        next_frame = time.monotonic()
+        while not stop_event.is_set():
+            ret, frame = cap.read()
+            if not ret:
+                time.sleep(0.05)
+                continue
+            if frame.shape[:2] != (height, width):
+                frame = cv2.resize(frame, (width, height))
+            ring.publish(frame)
+            if interval:
+                next_frame += interval
+                time.sleep(max(0.0, next_frame - time.monotonic()))
+        ring.state = STATE_STOPPED
+    finally:
+        if cap is not None:
+            cap.release()
+        ring.close()
+
+
+class FrameCaptureProcess:
+    """
+    Owns a SharedFrameRing and a separate (spawned) process that fills it
+    from the camera, so capture and decoding never wait on inference.
+    """
+
+    def __init__(self, camera_indices: Sequence[int] = (1, 0), shape: Tuple[int, int, int] = FRAME_SHAPE,
+                 slots: int = 8, fps: Optional[float] = None):
+        self.camera_indices = tuple(camera_indices)
+        self.shape = shape
+        self.slots = slots
+        self.fps = fps
+        self.ring = None
+        self._process = None
+        self._stop_event = None
+
+    @classmethod
+    def from_env(cls) -> 'FrameCaptureProcess':
+        """CCTV_FRAME_SLOTS (default 8) and CCTV_CAPTURE_FPS (default: camera rate)"""
+        fps = os.getenv('CCTV_CAPTURE_FPS')
+        return cls(slots=int(os.getenv('CCTV_FRAME_SLOTS', 8)), fps=float(fps) if fps else None)
+
+    def start(self, timeout: float = 15.0) -> bool:
+        """Start capturing; False if no camera could be opened within `timeout`"""
+        self.ring = SharedFrameRing.create(self.shape, self.slots)
+        # Spawn rather than fork: the parent typically has TensorFlow loaded
+        context = multiprocessing.get_context('spawn')
+        self._stop_event = context.Event()
+        self._process = context.Process(
+            target=run_capture,
+            args=(self.ring.name, self.camera_indices, self._stop_event, self.fps),
+            name='frame-capture',
+            daemon=True
+        )
+        self._process.start()
+
+        deadline = time.monotonic() + timeout
+        while self.ring.state == STATE_STARTING and self._process.is_alive() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if self.ring.state == STATE_RUNNING:
+            return True
+        self.stop()
+        return False
+
+    def stop(self, timeout: float = 5.0):
+        if self._process is not None:
+            self._stop_event.set()
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+        if self.ring is not None:
+            self.ring.close()
+            self.ring.unlink()
+            self.ring = None
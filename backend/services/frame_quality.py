@@ -0,0 +1,114 @@
+import cv2
+import math
+import numpy as np
+from typing import List, Optional, Tuple
+from services.roi_face_detector import FACE_CASCADE_PATH, load_face_cascade
+
+class FrameQuality:
+    """Quality assessment of a single enrollment frame"""
+
+    __slots__ = ('blur', 'face_box', 'face_fraction', 'phash', 'score')
+
+    def __init__(self, blur: float, face_box: Tuple[int, int, int, int], face_fraction: float,
+                 phash: int, score: float):
+        self.blur = blur
+        self.face_box = face_box
+        self.face_fraction = face_fraction
+        self.phash = phash
+        self.score = score
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+def difference_hash(gray_image, hash_size: int = 8) -> int:
+    """64-bit difference hash (dHash): compares horizontally adjacent pixels of a 9x8 thumbnail"""
+    resized = cv2.resize(gray_image, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    diff = resized[:, 1:] > resized[:, :-1]
+    return int.from_bytes(np.packbits(diff.flatten()).tobytes(), 'big')
+
+class FrameQualityGate:
+    """
+    Rejects enrollment frames with no usable face and scores the rest.
+
+    A frame passes when exactly one face of at least `min_face_size` is found
+    and the face region is sharp enough (variance of the Laplacian above
+    `min_blur`). Detection runs on a downscaled copy for speed.
+    """
+
+    def __init__(self, cascade_path: str = FACE_CASCADE_PATH,
+                 min_blur: float = 60.0, min_face_size: Tuple[int, int] = (60, 60),
+                 detection_scale: float = 0.5):
+        self.face_detector = load_face_cascade(cascade_path)
+        self.min_blur = min_blur
+        self.min_face_size = min_face_size
+        self.detection_scale = detection_scale
+
+    def assess(self, frame) -> Optional[FrameQuality]:
+        """Return the frame's quality, or None if it should be discarded"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        small = cv2.resize(gray, None, fx=self.detection_scale, fy=self.detection_scale,
+                           interpolation=cv2.INTER_AREA)
+        min_size = tuple(max(1, int(side * self.detection_scale)) for side in self.min_face_size)
+        faces = self.face_detector.detectMultiScale(small, scaleFactor=1.1, minNeighbors=5, minSize=min_size)
+
+        # Enrollment frames should contain only the soldier being enrolled
+        if len(faces) != 1:
+            return None
+
+        x, y, w, h = (int(round(v / self.detection_scale)) for v in faces[0])
+        face = gray[y:y + h, x:x + w]
+        if face.size == 0:
+            return None
+
+        blur = float(cv2.Laplacian(face, cv2.CV_64F).var())
+        if blur < self.min_blur:
+            return None
+
+        face_fraction = (w * h) / float(gray.shape[0] * gray.shape[1])
+        # Sharper and larger faces carry more detail for the encoder
+        score = math.log1p(blur) * math.sqrt(face_fraction)
+        return FrameQuality(blur, (x, y, w, h), face_fraction, difference_hash(face), score)
+
+class PoseFrameSelector:
+    """
+    Keeps the `keep` best frames of a pose, skipping near-duplicates.
+
+    A frame whose face hash is within `max_hash_distance` bits of a kept
+    frame only replaces that frame if it scores higher; otherwise the worst
+    kept frame is evicted when a better, distinct frame arrives.
+    """
+
+    def __init__(self, keep: int, max_hash_distance: int = 6):
+        self.keep = keep
+        self.max_hash_distance = max_hash_distance
+        self._selected = []  # (sequence, frame, quality)
+        self._sequence = 0
+
+    def offer(self, frame, quality: FrameQuality) -> bool:
+        """Offer a frame; return True if it is currently kept"""
+        self._sequence += 1
+        entry = (self._sequence, frame, quality)
+
+        for index, (_, _, kept) in enumerate(self._selected):
+            if hamming_distance(kept.phash, quality.phash) <= self.max_hash_distance:
+                if quality.score > kept.score:
+                    self._selected[index] = entry
+                    return True
+                return False
+
+        if len(self._selected) < self.keep:
+            self._selected.append(entry)
+            return True
+
+        worst = min(range(len(self._selected)), key=lambda i: self._selected[i][2].score)
+        if quality.score > self._selected[worst][2].score:
+            self._selected[worst] = entry
+            return True
+        return False
+
+    def selected(self) -> List[Tuple[object, FrameQuality]]:
+        """Kept frames in capture order"""
+        return [(frame, quality) for _, frame, quality in sorted(self._selected, key=lambda e: e[0])]
+
+    def __len__(self):
+        return len(self._selected)
@@ -0,0 +1,92 @@
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from utils.hash import check_password, hash_password
+
+logger = logging.getLogger(__name__)
+
+
+class HashingOverloadedError(Exception):
+    """Raised when the hashing queue is full and a request is rejected"""
+
+
+class HashingService:
+    """
+    Runs bcrypt work in a dedicated process pool so request threads only wait
+    on a future instead of holding the GIL for the full hash.
+
+    At most `max_pending` jobs may be queued or running; beyond that new
+    requests are rejected with HashingOverloadedError rather than piling up.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 timeout: float = 10.0):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.max_workers * 8
+        self.timeout = timeout
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            logger.info(f"Started hashing pool with {self.max_workers} processes")
+        return self._executor
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._pending -= 1
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HashingOverloadedError("Too many pending password operations, try again shortly")
+            self._pending += 1
+            try:
+                future = self._get_executor().submit(fn, *args)
+            except Exception:
+                self._pending -= 1
+                raise
+        future.add_done_callback(self._release)
+        return future
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def check_password(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against its bcrypt hash in the hashing pool"""
+        return self._submit(check_password, plain_password, hashed_password).result(timeout=self.timeout)
+
+    def hash_password(self, plain_password: str) -> str:
+        """Hash a password with bcrypt in the hashing pool"""
+        return self._submit(hash_password, plain_password).result(timeout=self.timeout)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+_default_service = None
+_default_service_lock = threading.Lock()
+
+
+def get_hashing_service() -> HashingService:
+    """Return the process-wide HashingService, creating it on first use."""
+    global _default_service
+    with _default_service_lock:
+        if _default_service is None:
+            workers = os.getenv('HASHING_WORKERS')
+            pending = os.getenv('HASHING_MAX_PENDING')
+            _default_service = HashingService(
+                max_workers=int(workers) if workers else None,
+                max_pending=int(pending) if pending else None,
+                timeout=float(os.getenv('HASHING_TIMEOUT', 10))
+            )
+        return _default_service
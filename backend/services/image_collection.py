@@ -1,9 +1,53 @@
 import cv2
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from services.frame_quality import FrameQuality, FrameQualityGate, PoseFrameSelector
+
+class FrameWriter:
+    """
+    Encodes and writes frames as JPEG on a small thread pool.
+
+    At most `max_pending` frames are held in memory; beyond that `submit`
+    blocks until a write finishes, so a very slow disk applies backpressure
+    instead of growing the queue without bound.
+    """
+
+    def __init__(self, threads=2, max_pending=32, jpeg_quality=95, max_width=None):
+        self.jpeg_quality = jpeg_quality
+        self.max_width = max_width
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='frame-writer')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._futures = []
+
+    def _write(self, frame, file_path):
+        try:
+            if self.max_width and frame.shape[1] > self.max_width:
+                scale = self.max_width / frame.shape[1]
+                frame = cv2.resize(frame, (self.max_width, int(frame.shape[0] * scale)),
+                                   interpolation=cv2.INTER_AREA)
+            ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if not ok:
+                raise IOError(f"Could not encode {file_path}")
+            with open(file_path, 'wb') as f:
+                f.write(encoded.tobytes())
+        finally:
+            self._slots.release()
+
+    def submit(self, frame, file_path):
+        self._slots.acquire()
+        self._futures.append(self._executor.submit(self._write, frame, file_path))
+
+    def close(self):
+        """Wait for all pending writes; re-raise the first write error, if any"""
+        self._executor.shutdown(wait=True)
+        for future in self._futures:
+            future.result()
 
 class ImageCollectionService:
-    def __init__(self):
+    def __init__(self, capture_interval=0.2, jpeg_quality=95, max_image_width=None,
+                 writer_threads=2, max_pending_writes=32, quality_gate=True):
         self.base_storage_path = os.path.join('storage', 'uploads')
         self.poses = [
             "Look straight at camera",
@@ -13,7 +57,18 @@ def __init__(self):
             "Stand a little away",
             "Smile"
         ]
-        self.images_per_pose = 10
+        self.images_per_pose = 10  # Frames kept per pose
+        self.candidates_per_pose = 15  # Frames that pass the quality gate before choosing the best
+        self.capture_interval = capture_interval  # Seconds between candidate frames
+        self.countdown = 2  # Seconds to get into position before each pose
+        self.jpeg_quality = jpeg_quality
+        self.max_image_width = max_image_width  # Downscale wider frames before saving
+        self.writer_threads = writer_threads
+        self.max_pending_writes = max_pending_writes
+        # Rejects blurry/faceless frames and near-duplicates so training only sees useful images
+        self.quality_gate = FrameQualityGate() if quality_gate else None
+        if not self.quality_gate:
+            self.candidates_per_pose = self.images_per_pose
 
     def _find_available_camera(self):
         """Try different camera indices to find an available camera"""
@@ -26,7 +81,7 @@ def _find_available_camera(self):
                 print("Successfully connected to external webcam")
                 return cap
             cap.release()
-        
+
         # If external webcam not available, try built-in camera (index 0)
         print("External webcam not found, trying built-in camera (index 0)...")
         cap = cv2.VideoCapture(0)
@@ -36,16 +91,17 @@ def _find_available_camera(self):
                 print("Successfully connected to built-in camera")
                 return cap
             cap.release()
-            
+
         # If no camera is available, return None
         print("No cameras available")
         return None
 
-    def collect_images(self, force_id):
+    def collect_images(self, force_id, progress_callback=None):
         """
         Collects images for a soldier with different poses
         Args:
             force_id (str): The force ID of the soldier
+            progress_callback (callable, optional): Called as (fraction, message) after each captured image
         Returns:
             str: Path to the representative image
         """
@@ -60,67 +116,108 @@ def collect_images(self, force_id):
                 raise Exception("Could not find any available camera - please connect a camera")
 
             representative_image_path = None
+            total_candidates = len(self.poses) * self.candidates_per_pose
+            accepted_candidates = 0
+            writer = FrameWriter(
+                threads=self.writer_threads,
+                max_pending=self.max_pending_writes,
+                jpeg_quality=self.jpeg_quality,
+                max_width=self.max_image_width
+            )
 
             try:
                 for pose in self.poses:
-                    image_count = 0
-                    while image_count < self.images_per_pose:
+                    # Without the gate there are no hashes to compare, so keep the first frames
+                    selector = PoseFrameSelector(
+                        keep=self.images_per_pose,
+                        max_hash_distance=6 if self.quality_gate else -1
+                    )
+                    candidate_count = 0
+                    frames_seen = 0
+                    capturing = False
+                    # Give up on a pose after this many frames even if few passed the gate
+                    max_frames = self.candidates_per_pose * 3
+                    while candidate_count < self.candidates_per_pose and frames_seen < max_frames:
                         ret, frame = cap.read()
                         if not ret:
                             break
 
-                        # Add pose instruction to frame
-                        cv2.putText(frame, pose, (50, 50), 
-                                  cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2, cv2.LINE_AA)
-                        cv2.putText(frame, "Press 's' to start capturing", (50, 100), 
-                                  cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2, cv2.LINE_AA)
-                        cv2.putText(frame, "Press 'q' to quit", (50, 150), 
-                                  cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2, cv2.LINE_AA)
-                        
+                        if not capturing:
+                            preview = frame.copy()
+                            # Add pose instruction to frame
+                            cv2.putText(preview, pose, (50, 50),
+                                      cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2, cv2.LINE_AA)
+                            cv2.putText(preview, "Press 's' to start capturing", (50, 100),
+                                      cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2, cv2.LINE_AA)
+                            cv2.putText(preview, "Press 'q' to quit", (50, 150),
+                                      cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2, cv2.LINE_AA)
+                            cv2.imshow("Collecting Images", preview)
+
+                            key = cv2.waitKey(1)
+                            if key == ord('q'):  # Quit completely
+                                return None
+                            if key == ord('s'):  # Start capturing images for current pose
+                                capturing = True
+                                # Give user time to get into position, keeping the preview live
+                                next_capture = time.monotonic() + self.countdown
+                            continue
+
+                        # Show frame while capturing
                         cv2.imshow("Collecting Images", frame)
 
-                        key = cv2.waitKey(1)
+                        # Sample candidates on a fixed timestamp grid so they are evenly
+                        # spaced regardless of how long encoding and writing take
+                        now = time.monotonic()
+                        if now >= next_capture:
+                            frames_seen += 1
+                            if self.quality_gate:
+                                quality = self.quality_gate.assess(frame)
+                            else:
+                                quality = FrameQuality(0.0, None, 0.0, 0, 0.0)
+                            if quality:
+                                candidate_count += 1
+                                accepted_candidates += 1
+                                selector.offer(frame, quality)
+                                if progress_callback:
+                                    progress_callback(min(accepted_candidates / total_candidates, 1.0),
+                                                      f"{pose}: {len(selector)}/{self.images_per_pose}")
+                            # If we fell behind (slow camera), don't burst to catch up
+                            next_capture = max(next_capture + self.capture_interval, now)
 
-                        if key == ord('q'):  # Quit completely
+                        # Check for quit during capture
+                        if cv2.waitKey(1) == ord('q'):
                             return None
 
-                        if key == ord('s'):  # Start capturing images for current pose
-                            time.sleep(2)  # Give user time to get into position
-                            while image_count < self.images_per_pose:
-                                ret, frame = cap.read()
-                                if not ret:
-                                    break
-
-                                # Show frame while capturing
-                                cv2.imshow("Collecting Images", frame)
-                                
-                                # Create filename and save image
-                                filename = f"{force_id}_{pose.replace(' ', '_')}_{image_count}.jpg"
-                                file_path = os.path.join(soldier_dir, filename)
-                                cv2.imwrite(file_path, frame)
-                                print(f"Image saved: {file_path}")
-                                
-                                if image_count == 0 and pose == self.poses[0]:  # Save first image as representative
-                                    representative_image_path = file_path
-                                
-                                image_count += 1
-                                time.sleep(0.3)  # Small delay between captures
-                                
-                                # Check for quit during capture
-                                if cv2.waitKey(1) == ord('q'):
-                                    return None
-
-                    print(f"Completed capturing images for {pose}")
+                    # A pose without a single usable frame would leave a gap in
+                    # training (or no representative image), so fail the capture
+                    if not len(selector):
+                        raise Exception(f"No usable frames for pose '{pose}' ({frames_seen} frames rejected) - "
+                                        "check lighting and camera focus and try again")
+                    if len(selector) < self.images_per_pose:
+                        print(f"⚠️ Only {len(selector)} of {self.images_per_pose} frames kept for {pose}")
+
+                    # Only the selected frames reach the disk
+                    for image_count, (frame, quality) in enumerate(selector.selected()):
+                        filename = f"{force_id}_{pose.replace(' ', '_')}_{image_count}.jpg"
+                        file_path = os.path.join(soldier_dir, filename)
+                        writer.submit(frame, file_path)
+                        if representative_image_path is None:  # Save first image as representative
+                            representative_image_path = file_path
+
+                    print(f"Completed capturing images for {pose}: kept {len(selector)} of {frames_seen} frames")
 
+                # Make sure every image is on disk before reporting success
+                writer.close()
                 print(f"Image collection complete for {force_id}.")
                 return representative_image_path
 
             finally:
+                writer.close()
                 cap.release()
                 cv2.destroyAllWindows()
 
         except Exception as e:
-            if 'cap' in locals():
+            if 'cap' in locals() and cap:
                 cap.release()
             cv2.destroyAllWindows()
             raise Exception(f"Image collection failed: {str(e)}")
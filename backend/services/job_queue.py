@@ -0,0 +1,319 @@
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from utils.logging_config import restart_logging_after_fork
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """
+    Durable local job queue stored in SQLite.
+
+    Jobs move queued -> running -> completed/failed. Running jobs heartbeat
+    while they work; jobs whose worker died (stale heartbeat) are re-queued on
+    worker start-up until they run out of attempts, so queued and interrupted
+    work survives restarts.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_type TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    progress REAL NOT NULL DEFAULT 0,
+                    progress_message TEXT,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL DEFAULT 1,
+                    worker_id TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    heartbeat_at REAL,
+                    finished_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, job_id)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _to_dict(row) -> Dict:
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'])
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        for column in ('created_at', 'started_at', 'heartbeat_at', 'finished_at'):
+            if job[column] is not None:
+                job[column] = datetime.fromtimestamp(job[column]).isoformat()
+        return job
+
+    def enqueue(self, job_type: str, payload: Optional[Dict] = None, max_attempts: int = 1) -> int:
+        """Queue a job and return its id"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO jobs (job_type, payload, max_attempts, created_at) VALUES (?, ?, ?, ?)",
+                (job_type, json.dumps(payload or {}), max_attempts, time.time())
+            )
+            return cursor.lastrowid
+
+    def get(self, job_id: int) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def claim(self, worker_id: str) -> Optional[Dict]:
+        """Atomically take the oldest queued job, or return None"""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT job_id FROM jobs WHERE status = 'queued' ORDER BY job_id LIMIT 1"
+                ).fetchone()
+                if not row:
+                    conn.execute("COMMIT")
+                    return None
+                now = time.time()
+                conn.execute("""
+                    UPDATE jobs
+                    SET status = 'running', worker_id = ?, attempts = attempts + 1,
+                        started_at = ?, heartbeat_at = ?, error = NULL
+                    WHERE job_id = ?
+                """, (worker_id, now, now, row['job_id']))
+                job = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (row['job_id'],)).fetchone()
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return self._to_dict(job)
+
+    def heartbeat(self, job_id: int):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE job_id = ? AND status = 'running'",
+                (time.time(), job_id)
+            )
+
+    def update_progress(self, job_id: int, progress: float, message: Optional[str] = None):
+        """Record progress (0-1) for a running job"""
+        with self._connect() as conn:
+            conn.execute("""
+                UPDATE jobs SET progress = ?, progress_message = ?, heartbeat_at = ?
+                WHERE job_id = ? AND status = 'running'
+            """, (max(0.0, min(1.0, progress)), message, time.time(), job_id))
+
+    def complete(self, job_id: int, result=None):
+        with self._connect() as conn:
+            conn.execute("""
+                UPDATE jobs SET status = 'completed', progress = 1, result = ?, finished_at = ?
+                WHERE job_id = ?
+            """, (json.dumps(result), time.time(), job_id))
+
+    def fail(self, job_id: int, error: str):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE job_id = ?",
+                (error, time.time(), job_id)
+            )
+
+    def requeue_stale(self, heartbeat_timeout: float) -> int:
+        """
+        Re-queue running jobs whose worker stopped heartbeating; jobs that have
+        used all their attempts are failed instead. Returns the number re-queued.
+        """
+        cutoff = time.time() - heartbeat_timeout
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("""
+                UPDATE jobs SET status = 'failed', error = 'Worker stopped while running the job',
+                    finished_at = ?
+                WHERE status = 'running' AND heartbeat_at < ? AND attempts >= max_attempts
+            """, (time.time(), cutoff))
+            cursor = conn.execute("""
+                UPDATE jobs SET status = 'queued', worker_id = NULL
+                WHERE status = 'running' AND heartbeat_at < ? AND attempts < max_attempts
+            """, (cutoff,))
+            conn.execute("COMMIT")
+            return cursor.rowcount
+
+
+def _collect_images(payload: Dict, report_progress: Callable) -> Dict:
+    from services.image_collection import ImageCollectionService
+    folder_path = ImageCollectionService().collect_images(
+        payload['force_id'], progress_callback=report_progress
+    )
+    if folder_path is None:
+        # The operator quit the capture window; fail so it doesn't read as a capture
+        raise Exception("Image collection was cancelled")
+    return {'folder_path': folder_path}
+
+
+def _train_model(payload: Dict, report_progress: Callable) -> Dict:
+    from services.face_recognition_service import FaceRecognitionService
+    return FaceRecognitionService().train_model(progress_callback=report_progress)
+
+
+def _replace_soldier(payload: Dict, report_progress: Callable) -> Dict:
+    from services.face_recognition_service import FaceRecognitionService
+    return FaceRecognitionService().replace_soldier(payload['force_id'])
+
+
+def _delete_soldier(payload: Dict, report_progress: Callable) -> Dict:
+    from services.face_recognition_service import FaceRecognitionService
+    return FaceRecognitionService().delete_soldier(payload['force_id'])
+
+
+def _export_history(payload: Dict, report_progress: Callable) -> Dict:
+    from services.export_service import EXPORT_TABLES, HistoryExporter, parse_date
+    tables = payload.get('tables') or list(EXPORT_TABLES)
+    exporter = HistoryExporter()
+    results = []
+    for index, table in enumerate(tables):
+        report_progress(index / len(tables), f"Exporting {table}")
+        results.append(exporter.export_files(
+            table, payload['output_dir'], parse_date(payload.get('start')),
+            parse_date(payload.get('end')), payload.get('format', 'parquet')
+        ))
+    return {'output_dir': payload['output_dir'], 'tables': results}
+
+
+# Job type -> handler(payload, report_progress) returning a JSON-serializable result
+JOB_HANDLERS = {
+    'collect_images': _collect_images,
+    'train_model': _train_model,
+    'replace_soldier': _replace_soldier,
+    'delete_soldier': _delete_soldier,
+    'export_history': _export_history
+}
+
+
+def run_worker(db_path: str, worker_id: str, handlers: Dict[str, Callable], stop_event,
+               poll_interval: float = 1.0, heartbeat_interval: float = 5.0):
+    """Claim and run jobs until `stop_event` is set"""
+    restart_logging_after_fork()
+    queue = JobQueue(db_path)
+    logger.info(f"Job worker {worker_id} started")
+    last_stale_check = 0.0
+
+    while not stop_event.is_set():
+        job = queue.claim(worker_id)
+        if not job:
+            # Pick up jobs orphaned by a worker that crashed while this one was idle
+            if time.time() - last_stale_check > heartbeat_interval * 6:
+                queue.requeue_stale(heartbeat_timeout=heartbeat_interval * 3)
+                last_stale_check = time.time()
+            stop_event.wait(poll_interval)
+            continue
+
+        job_id = job['job_id']
+        handler = handlers.get(job['job_type'])
+        if handler is None:
+            queue.fail(job_id, f"Unknown job type: {job['job_type']}")
+            continue
+
+        # Keep the heartbeat fresh while the handler runs without reporting progress
+        done = threading.Event()
+
+        def beat():
+            while not done.wait(heartbeat_interval):
+                queue.heartbeat(job_id)
+
+        heartbeat_thread = threading.Thread(target=beat, daemon=True)
+        heartbeat_thread.start()
+
+        logger.info(f"Job worker {worker_id} running job {job_id} ({job['job_type']})")
+        try:
+            result = handler(
+                job['payload'],
+                lambda progress, message=None: queue.update_progress(job_id, progress, message)
+            )
+            queue.complete(job_id, result)
+            logger.info(f"Job {job_id} completed")
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            queue.fail(job_id, str(e))
+        finally:
+            done.set()
+            heartbeat_thread.join()
+
+    logger.info(f"Job worker {worker_id} stopped")
+
+
+class JobWorkerPool:
+    """Runs `concurrency` job worker processes against one JobQueue"""
+
+    def __init__(self, db_path: str, concurrency: int = 1, handlers: Optional[Dict[str, Callable]] = None,
+                 poll_interval: float = 1.0, heartbeat_interval: float = 5.0):
+        self.db_path = db_path
+        self.concurrency = concurrency
+        self.handlers = handlers or JOB_HANDLERS
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self._stop_event = multiprocessing.Event()
+        self._processes = []
+
+    def start(self):
+        # Anything still 'running' from a previous run lost its worker
+        requeued = JobQueue(self.db_path).requeue_stale(heartbeat_timeout=self.heartbeat_interval * 3)
+        if requeued:
+            logger.info(f"Re-queued {requeued} interrupted jobs")
+
+        for index in range(self.concurrency):
+            process = multiprocessing.Process(
+                target=run_worker,
+                args=(self.db_path, f"{os.getpid()}-{index}", self.handlers, self._stop_event,
+                      self.poll_interval, self.heartbeat_interval),
+                name=f"job-worker-{index}",
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+        logger.info(f"Started {self.concurrency} job worker processes")
+
+    def stop(self, timeout: float = 30):
+        self._stop_event.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+
+def get_job_queue_path() -> str:
+    return os.getenv('JOB_QUEUE_PATH', os.path.join('storage', 'jobs.sqlite3'))
+
+
+_default_queue = None
+_default_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide JobQueue, creating it on first use."""
+    global _default_queue
+    with _default_queue_lock:
+        if _default_queue is None:
+            _default_queue = JobQueue(get_job_queue_path())
+        return _default_queue
@@ -0,0 +1,251 @@
+import logging
+import os
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+from typing import Dict, Iterator, Optional, Tuple
+from services.event_stream import EventBroker, get_event_broker
+
+logger = logging.getLogger(__name__)
+
+# Commands the background process accepts from API workers
+COMMANDS = ('start_monitoring', 'stop_monitoring', 'calculate_daily_scores', 'process_frame', 'status',
+            'subscribe_events')
+
+# Seconds between keepalives on an idle event subscription
+EVENT_KEEPALIVE = 15
+
+DEFAULT_CONTROL_ADDRESS = '127.0.0.1:6001'
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """Parse 'host:port' into a (host, port) tuple"""
+    host, _, port = address.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+def get_control_address() -> Tuple[str, int]:
+    """MONITORING_CONTROL_ADDRESS, shared by worker.py and the API (default 127.0.0.1:6001)"""
+    return parse_address(os.getenv('MONITORING_CONTROL_ADDRESS', DEFAULT_CONTROL_ADDRESS))
+
+
+def get_authkey() -> bytes:
+    """
+    MONITORING_CONTROL_AUTHKEY. Required: the control channel unpickles what
+    it receives, so a known key would let anyone who reaches the port run
+    code in the worker.
+    """
+    authkey = os.getenv('MONITORING_CONTROL_AUTHKEY')
+    if not authkey:
+        raise RuntimeError("MONITORING_CONTROL_AUTHKEY must be set to use the monitoring control channel")
+    return authkey.encode('utf-8')
+
+
+class MonitoringControlServer:
+    """
+    Serves monitoring commands from API workers inside the single background
+    process that owns the camera and the CCTVMonitoringService.
+    """
+
+    def __init__(self, monitoring_service, address: Tuple[str, int], authkey: bytes):
+        self.monitoring_service = monitoring_service
+        self.address = address
+        self.authkey = authkey
+        self._listener = None
+        self._thread = None
+        self._lock = threading.Lock()  # The camera service is not thread-safe
+
+    def start(self):
+        self._listener = Listener(self.address, authkey=self.authkey)
+        self._thread = threading.Thread(target=self._serve, name='monitoring-control', daemon=True)
+        self._thread.start()
+        logger.info(f"Monitoring control server listening on {self.address[0]}:{self.address[1]}")
+
+    def stop(self):
+        if self._listener:
+            self._listener.close()
+            self._listener = None
+
+    def _serve(self):
+        while self._listener:
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                break  # Listener closed
+            except Exception as e:
+                logger.error(f"Rejected monitoring control connection: {e}")
+                continue
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        try:
+            command, args = conn.recv()
+            if command not in COMMANDS:
+                conn.send(('error', f"Unknown command: {command}"))
+                return
+            if command == 'subscribe_events':
+                self._stream_events(conn)
+                return
+            with self._lock:
+                result = getattr(self.monitoring_service, command)(*args)
+            conn.send(('ok', result))
+        except Exception as e:
+            logger.error(f"Error handling monitoring command: {e}")
+            try:
+                conn.send(('error', str(e)))
+            except Exception:
+                pass
+        finally:
+            conn.close()
+
+    def _stream_events(self, conn):
+        """Forward event batches over the connection until the API worker goes away"""
+        subscription = get_event_broker().subscribe()
+        try:
+            conn.send(('ok', None))
+            while self._listener:
+                # None is a keepalive, so dead connections are noticed when idle
+                conn.send(('event', subscription.get(timeout=EVENT_KEEPALIVE)))
+        except (OSError, EOFError):
+            pass
+        finally:
+            subscription.close()
+
+
+class MonitoringControlClient:
+    """Drop-in stand-in for CCTVMonitoringService that forwards calls to the background process"""
+
+    def __init__(self, address: Tuple[str, int], authkey: bytes):
+        self.address = address
+        self.authkey = authkey
+
+    def _call(self, command: str, *args):
+        try:
+            conn = Client(self.address, authkey=self.authkey)
+        except OSError as e:
+            raise Exception(f"Monitoring worker is not reachable: {e}")
+        try:
+            conn.send((command, args))
+            status, result = conn.recv()
+        finally:
+            conn.close()
+        if status == 'error':
+            raise Exception(result)
+        return result
+
+    def start_monitoring(self, date: str) -> bool:
+        return self._call('start_monitoring', date)
+
+    def stop_monitoring(self) -> bool:
+        return self._call('stop_monitoring')
+
+    def calculate_daily_scores(self, date: str) -> bool:
+        return self._call('calculate_daily_scores', date)
+
+    def process_frame(self) -> Optional[Dict]:
+        return self._call('process_frame')
+
+    def status(self) -> Dict:
+        return self._call('status')
+
+    def subscribe_events(self) -> Iterator[Optional[bytes]]:
+        """Yield event batches (SSE frames, None for keepalives) until the connection drops"""
+        try:
+            conn = Client(self.address, authkey=self.authkey)
+        except OSError as e:
+            raise Exception(f"Monitoring worker is not reachable: {e}")
+        try:
+            conn.send(('subscribe_events', ()))
+            status, result = conn.recv()
+            if status == 'error':
+                raise Exception(result)
+            while True:
+                _, frame = conn.recv()
+                yield frame
+        finally:
+            conn.close()
+
+
+class EventRelay:
+    """
+    Keeps one event subscription to the background process per API worker
+    and republishes its batches to the local broker, which fans them out to
+    this worker's SSE clients. Reconnects with exponential backoff.
+    """
+
+    def __init__(self, client: MonitoringControlClient, broker: EventBroker, max_backoff: float = 30.0):
+        self.client = client
+        self.broker = broker
+        self.max_backoff = max_backoff
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='event-relay', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        backoff = 1.0
+        while True:
+            try:
+                for frame in self.client.subscribe_events():
+                    backoff = 1.0
+                    if frame is not None:
+                        self.broker.publish_frame(frame)
+            except Exception as e:
+                logger.warning(f"Monitoring event relay disconnected: {e}")
+            time.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+
+_controller = None
+_controller_lock = threading.Lock()
+_in_process = False
+
+
+def use_in_process_monitoring():
+    """
+    Run monitoring inside this process instead of in worker.py. Only for the
+    single-process development server (app.py): every process that calls
+    this loads the models and may open the camera.
+    """
+    global _in_process
+    _in_process = True
+
+
+def get_monitoring_controller():
+    """
+    Return the monitoring service API workers should talk to.
+
+    Calls are forwarded to the dedicated background process (worker.py) at
+    MONITORING_CONTROL_ADDRESS. Only after use_in_process_monitoring() is a
+    single in-process CCTVMonitoringService created on first use instead.
+    """
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            if _in_process:
+                from services.cctv_monitoring_service import CCTVMonitoringService
+                _controller = CCTVMonitoringService()
+            else:
+                _controller = MonitoringControlClient(get_control_address(), get_authkey())
+        return _controller
+
+
+_relay = None
+
+
+def get_monitoring_events() -> EventBroker:
+    """
+    Return the broker SSE clients subscribe to. Events come from the
+    background process through one EventRelay per API worker; with
+    use_in_process_monitoring() the monitoring service publishes to it
+    directly.
+    """
+    global _relay
+    broker = get_event_broker()
+    if not _in_process:
+        with _controller_lock:
+            if _relay is None:
+                _relay = EventRelay(MonitoringControlClient(get_control_address(), get_authkey()), broker)
+                _relay.start()
+    return broker
@@ -0,0 +1,169 @@
+import argparse
+import logging
+import time
+from datetime import date, timedelta
+from typing import Dict, Optional, Tuple
+import numpy as np
+from db.connection import get_connection
+from services.aggregation_service import AggregationService
+
+logger = logging.getLogger(__name__)
+
+RISK_LEVELS = np.array(['low', 'medium', 'high', 'critical'])
+
+# CCTV depression scores use EmotionDetectionService.emotion_mapping
+# (Happy = -1 ... Sad = 3); questionnaire scores are already 0..1
+CCTV_SCORE_RANGE = (-1.0, 3.0)
+
+# Rows per INSERT statement when writing weekly_aggregated_scores
+WRITE_CHUNK_SIZE = 5000
+
+
+def iso_year_week(day: date) -> int:
+    """YEARWEEK(day, 3) as MySQL computes it, e.g. 202542"""
+    iso_year, iso_week, _ = day.isocalendar()
+    return iso_year * 100 + iso_week
+
+
+def normalize_cctv(cctv: np.ndarray, score_range: Tuple[float, float] = CCTV_SCORE_RANGE) -> np.ndarray:
+    """Map CCTV depression scores from the emotion_mapping scale onto 0..1 (NaN stays NaN)"""
+    low, high = score_range
+    return np.clip((np.asarray(cctv, dtype=np.float64) - low) / (high - low), 0.0, 1.0)
+
+
+def score_weeks(questionnaire: np.ndarray, cctv: np.ndarray,
+                questionnaire_weight: float = 0.6, cctv_weight: float = 0.4,
+                thresholds: Tuple[float, float, float] = (0.4, 0.7, 0.85)) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Combine per-soldier questionnaire and CCTV scores and classify risk.
+
+    `questionnaire` is on the 0..1 sentiment scale and `cctv` on the
+    emotion_mapping scale (-1..3); CCTV scores are rescaled to 0..1 first so
+    both weigh in on the same scale as the thresholds. Missing scores are
+    NaN; the combined score is the weighted mean of the scores that are
+    present, and NaN if neither is.
+
+    Returns:
+        tuple: (combined scores, risk levels; None where combined is NaN)
+    """
+    scores = np.stack([questionnaire, normalize_cctv(cctv)]).astype(np.float64)
+    weights = np.array([questionnaire_weight, cctv_weight])[:, np.newaxis] * ~np.isnan(scores)
+    weight_total = weights.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        combined = np.nansum(scores * weights, axis=0) / weight_total
+    combined[weight_total == 0] = np.nan
+
+    levels = RISK_LEVELS[np.digitize(np.nan_to_num(combined), thresholds)].astype(object)
+    levels[np.isnan(combined)] = None
+    return combined, levels
+
+
+class WeeklyRiskEngine:
+    """
+    Populates weekly_aggregated_scores for every soldier in one pass per week.
+
+    Per-soldier weekly CCTV and survey averages come from the materialized
+    soldier_weekly_summary (refreshed first), the scoring is vectorized, and
+    the week's rows are replaced in a single transaction, so re-running a
+    week gives the same result.
+    """
+
+    def __init__(self, questionnaire_weight: float = 0.6, cctv_weight: float = 0.4,
+                 thresholds: Tuple[float, float, float] = (0.4, 0.7, 0.85),
+                 aggregation_service: Optional[AggregationService] = None):
+        self.questionnaire_weight = questionnaire_weight
+        self.cctv_weight = cctv_weight
+        self.thresholds = thresholds
+        self.aggregation_service = aggregation_service or AggregationService()
+
+    def compute_week(self, year_week: Optional[int] = None, refresh_summaries: bool = True) -> Dict:
+        """
+        Compute and store scores for one ISO week (default: the current week)
+
+        Returns:
+            dict: year_week, soldiers, rows written, elapsed seconds and rows_per_sec
+        """
+        year_week = year_week or iso_year_week(date.today())
+        start = time.perf_counter()
+        if refresh_summaries:
+            self.aggregation_service.refresh()
+
+        conn = None
+        cursor = None
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT u.force_id, s.survey_avg_score, s.cctv_avg_score
+                FROM users u
+                LEFT JOIN soldier_weekly_summary s
+                    ON s.force_id = u.force_id AND s.year_week = %s
+                WHERE u.user_type = 'soldier'
+                ORDER BY u.force_id
+            """, (year_week,))
+            rows = cursor.fetchall()
+
+            force_ids = [row[0] for row in rows]
+            questionnaire = np.array([row[1] for row in rows], dtype=np.float64)
+            cctv = np.array([row[2] for row in rows], dtype=np.float64)
+            combined, levels = score_weeks(
+                questionnaire, cctv,
+                self.questionnaire_weight, self.cctv_weight, self.thresholds
+            )
+
+            scored = ~np.isnan(combined)
+            year, week = divmod(year_week, 100)
+            # cctv_score is stored rescaled, on the same 0..1 scale as the other two scores
+            cctv = normalize_cctv(cctv)
+            values = [
+                (force_ids[i], year, week, _nullable(questionnaire[i]), _nullable(cctv[i]),
+                 float(combined[i]), levels[i])
+                for i in np.flatnonzero(scored)
+            ]
+
+            cursor.execute(
+                "DELETE FROM weekly_aggregated_scores WHERE year = %s AND week = %s",
+                (year, week)
+            )
+            for offset in range(0, len(values), WRITE_CHUNK_SIZE):
+                cursor.executemany("""
+                    INSERT INTO weekly_aggregated_scores
+                    (force_id, year, week, questionnaire_score, cctv_score, combined_weekly_score, risk_level)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """, values[offset:offset + WRITE_CHUNK_SIZE])
+            conn.commit()
+        except Exception:
+            if conn:
+                conn.rollback()
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+        elapsed = time.perf_counter() - start
+        result = {
+            'year_week': year_week,
+            'soldiers': len(force_ids),
+            'rows': len(values),
+            'elapsed_s': round(elapsed, 3),
+            'rows_per_sec': round(len(values) / elapsed, 1) if elapsed > 0 else None
+        }
+        logger.info(f"Computed weekly risk levels: {result}")
+        return result
+
+    def compute_previous_week(self) -> Dict:
+        return self.compute_week(iso_year_week(date.today() - timedelta(days=7)))
+
+
+def _nullable(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute weekly_aggregated_scores for all soldiers")
+    parser.add_argument('--year-week', type=int, help='ISO year and week, e.g. 202542 (default: current week)')
+    args = parser.parse_args()
+
+    print(WeeklyRiskEngine().compute_week(args.year_week))
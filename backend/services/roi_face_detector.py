@@ -0,0 +1,141 @@
+import os
+from typing import List, Optional, Tuple
+
+Box = Tuple[int, int, int, int]
+
+# Resolved from this file so the cascade loads from any working directory
+FACE_CASCADE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 'haarcascades', 'haarcascade_frontalface_default.xml')
+
+
+def load_face_cascade(path: str = FACE_CASCADE_PATH):
+    """Load a Haar cascade; raises instead of returning one that silently never finds a face"""
+    import cv2
+    cascade = cv2.CascadeClassifier(path)
+    if cascade.empty():
+        raise IOError(f"Could not load face cascade from {path}")
+    return cascade
+
+
+def _iou(a: Box, b: Box) -> float:
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    iw = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    ih = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = iw * ih
+    union = aw * ah + bw * bh - inter
+    return inter / union if union else 0.0
+
+
+def _parse_size(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    """'60' or '60x80' -> (60, 60) / (60, 80)"""
+    if not value:
+        return None
+    parts = value.lower().split('x')
+    width = int(parts[0])
+    return (width, int(parts[1]) if len(parts) > 1 else width)
+
+
+class RoiFaceDetector:
+    """
+    Haar cascade detection that only scans the whole frame periodically.
+
+    Every `full_scan_interval` frames (or whenever nothing is tracked) the
+    full frame is scanned between `min_face_size` and `max_face_size`. On
+    the frames in between only windows around the last known face boxes are
+    scanned, enlarged by `roi_margin` of the box size on each side, with the
+    pyramid limited to scales near the tracked face size. The per-frame cost
+    then grows with the number of people instead of the frame area. Faces not
+    re-found for `max_misses` ROI frames are dropped; new people are picked up
+    by the next full scan. With full_scan_interval=1 this is plain full-frame
+    detection.
+    """
+
+    def __init__(self, detector, full_scan_interval: int = 10, roi_margin: float = 0.5,
+                 min_face_size: Tuple[int, int] = (30, 30), max_face_size: Optional[Tuple[int, int]] = None,
+                 scale_factor: float = 1.1, min_neighbors: int = 5, max_misses: int = 3):
+        self.detector = detector
+        self.full_scan_interval = max(1, full_scan_interval)
+        self.roi_margin = roi_margin
+        self.min_face_size = min_face_size
+        self.max_face_size = max_face_size
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.max_misses = max_misses
+        self._tracks = []  # [box, misses]
+        self._frames_since_full_scan = 0
+        self.full_scans = 0
+        self.roi_scans = 0
+
+    @classmethod
+    def from_env(cls, detector) -> 'RoiFaceDetector':
+        """
+        Configure from the camera settings:
+        FACE_DETECTION_MODE (full|roi), FACE_FULL_SCAN_INTERVAL, FACE_ROI_MARGIN,
+        CAMERA_MIN_FACE_SIZE and CAMERA_MAX_FACE_SIZE ('60' or '60x80', in pixels)
+        """
+        mode = os.getenv('FACE_DETECTION_MODE', 'full').lower()
+        return cls(
+            detector,
+            full_scan_interval=int(os.getenv('FACE_FULL_SCAN_INTERVAL', 10)) if mode == 'roi' else 1,
+            roi_margin=float(os.getenv('FACE_ROI_MARGIN', 0.5)),
+            min_face_size=_parse_size(os.getenv('CAMERA_MIN_FACE_SIZE')) or (30, 30),
+            max_face_size=_parse_size(os.getenv('CAMERA_MAX_FACE_SIZE'))
+        )
+
+    def reset(self):
+        self._tracks = []
+        self._frames_since_full_scan = 0
+
+    def _scan(self, gray, min_size, max_size) -> List[Box]:
+        kwargs = {
+            'scaleFactor': self.scale_factor,
+            'minNeighbors': self.min_neighbors,
+            'minSize': min_size
+        }
+        if max_size:
+            kwargs['maxSize'] = max_size
+        return [tuple(int(v) for v in face) for face in self.detector.detectMultiScale(gray, **kwargs)]
+
+    def _scan_roi(self, gray, box: Box) -> List[Box]:
+        x, y, w, h = box
+        frame_h, frame_w = gray.shape[:2]
+        mx, my = int(w * self.roi_margin), int(h * self.roi_margin)
+        x0, y0 = max(0, x - mx), max(0, y - my)
+        x1, y1 = min(frame_w, x + w + mx), min(frame_h, y + h + my)
+
+        # Only the pyramid levels near the tracked size, within the camera limits
+        min_size = (max(self.min_face_size[0], int(w * 0.6)), max(self.min_face_size[1], int(h * 0.6)))
+        max_size = (min(x1 - x0, int(w * 1.6)), min(y1 - y0, int(h * 1.6)))
+        if self.max_face_size:
+            max_size = (min(max_size[0], self.max_face_size[0]), min(max_size[1], self.max_face_size[1]))
+        if min_size[0] > max_size[0] or min_size[1] > max_size[1]:
+            return []
+
+        faces = self._scan(gray[y0:y1, x0:x1], min_size, max_size)
+        return [(fx + x0, fy + y0, fw, fh) for fx, fy, fw, fh in faces]
+
+    def detect(self, gray) -> List[Box]:
+        """Face boxes (x, y, w, h) in a grayscale frame"""
+        if not self._tracks or self._frames_since_full_scan >= self.full_scan_interval - 1:
+            faces = self._scan(gray, self.min_face_size, self.max_face_size)
+            self._tracks = [[face, 0] for face in faces]
+            self._frames_since_full_scan = 0
+            self.full_scans += 1
+            return faces
+
+        self._frames_since_full_scan += 1
+        self.roi_scans += 1
+        faces = []
+        tracks = []
+        for box, misses in self._tracks:
+            found = [face for face in self._scan_roi(gray, box) if all(_iou(face, f) < 0.5 for f in faces)]
+            if found:
+                # The detection closest to the tracked box continues the track
+                best = max(found, key=lambda face: _iou(face, box))
+                tracks.append([best, 0])
+                faces.extend(found)
+            elif misses + 1 < self.max_misses:
+                tracks.append([box, misses + 1])
+        self._tracks = tracks
+        return faces
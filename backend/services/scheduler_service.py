@@ -2,22 +2,23 @@
 import logging
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from services.aggregation_service import AggregationService
 from services.cctv_monitoring_service import CCTVMonitoringService
+from services.detection_retention import DetectionRetentionService
+from services.risk_engine import WeeklyRiskEngine
+
+logger = logging.getLogger(__name__)
 
 class MonitoringScheduler:
-    def __init__(self):
+    def __init__(self, monitoring_service=None):
         self.scheduler = BackgroundScheduler()
-        self.monitoring_service = CCTVMonitoringService()
-        self.setup_logging()
+        self.monitoring_service = monitoring_service or CCTVMonitoringService()
+        self.aggregation_service = AggregationService()
+        self.risk_engine = WeeklyRiskEngine(aggregation_service=self.aggregation_service)
+        self.retention_service = DetectionRetentionService(aggregation_service=self.aggregation_service)
         self._configure_schedules()
 
-    def setup_logging(self):
-        logging.basicConfig(
-            filename="scheduler.log",
-            level=logging.DEBUG,
-            format='%(asctime)s - %(levelname)s - %(message)s'
-        )
-
     def _configure_schedules(self):
         """Configure daily monitoring schedules"""
         # Start monitoring at 9 AM every day
@@ -34,17 +35,48 @@ def _configure_schedules(self):
             id='end_monitoring'
         )
 
+        # Fold new detections and surveys into the dashboard summaries
+        self.scheduler.add_job(
+            self._refresh_summaries,
+            IntervalTrigger(minutes=5),
+            id='refresh_summaries',
+            max_instances=1,
+            coalesce=True
+        )
+
+        # Update this week's risk levels once the day's detections are scored
+        self.scheduler.add_job(
+            self._compute_weekly_risk,
+            CronTrigger(hour=17, minute=30),
+            id='weekly_risk_current'
+        )
+
+        # Finalize last week's risk levels early on Monday
+        self.scheduler.add_job(
+            self._compute_weekly_risk,
+            CronTrigger(day_of_week='mon', hour=0, minute=30),
+            args=[True],
+            id='weekly_risk_previous'
+        )
+
+        # Add upcoming monthly partitions and expire old raw detections
+        self.scheduler.add_job(
+            self._maintain_detections,
+            CronTrigger(hour=1, minute=0),
+            id='detection_retention'
+        )
+
     def _start_daily_monitoring(self):
         """Start daily monitoring automatically"""
         try:
             today = datetime.now().date()
             success = self.monitoring_service.start_monitoring(str(today))
             if success:
-                logging.info(f"Started daily monitoring for {today}")
+                logger.info(f"Started daily monitoring for {today}")
             else:
-                logging.error(f"Failed to start monitoring for {today}")
+                logger.error(f"Failed to start monitoring for {today}")
         except Exception as e:
-            logging.error(f"Error in auto-start monitoring: {e}")
+            logger.error(f"Error in auto-start monitoring: {e}")
 
     def _end_daily_monitoring(self):
         """End daily monitoring automatically"""
@@ -52,29 +84,58 @@ def _end_daily_monitoring(self):
             today = datetime.now().date()
             if self.monitoring_service.stop_monitoring():
                 if self.monitoring_service.calculate_daily_scores(str(today)):
-                    logging.info(f"Ended monitoring and calculated scores for {today}")
+                    logger.info(f"Ended monitoring and calculated scores for {today}")
                 else:
-                    logging.error(f"Failed to calculate scores for {today}")
+                    logger.error(f"Failed to calculate scores for {today}")
+            else:
+                logger.error(f"Failed to stop monitoring for {today}")
+        except Exception as e:
+            logger.error(f"Error in auto-end monitoring: {e}")
+
+    def _refresh_summaries(self):
+        """Incrementally refresh the materialized dashboard summaries"""
+        try:
+            self.aggregation_service.refresh()
+        except Exception as e:
+            logger.error(f"Error refreshing dashboard summaries: {e}")
+
+    def _compute_weekly_risk(self, previous_week=False):
+        """Recompute weekly_aggregated_scores for the current or previous week"""
+        try:
+            if previous_week:
+                result = self.risk_engine.compute_previous_week()
             else:
-                logging.error(f"Failed to stop monitoring for {today}")
+                result = self.risk_engine.compute_week()
+            logger.info(f"Weekly risk levels for {result['year_week']}: "
+                         f"{result['rows']} rows at {result['rows_per_sec']} rows/s")
+        except Exception as e:
+            logger.error(f"Error computing weekly risk levels: {e}")
+
+    def _maintain_detections(self):
+        """Run cctv_detections partition maintenance and retention"""
+        try:
+            result = self.retention_service.run()
+            logger.info(f"Detection retention: {result}")
         except Exception as e:
-            logging.error(f"Error in auto-end monitoring: {e}")
+            logger.error(f"Error in detection retention: {e}")
 
     def start(self):
         """Start the scheduler"""
         try:
             self.scheduler.start()
-            logging.info("Monitoring scheduler started")
+            logger.info("Monitoring scheduler started")
         except Exception as e:
-            logging.error(f"Error starting scheduler: {e}")
+            logger.error(f"Error starting scheduler: {e}")
 
     def stop(self):
         """Stop the scheduler"""
+        if not self.scheduler.running:
+            return
         try:
             self.scheduler.shutdown()
-            logging.info("Monitoring scheduler stopped")
+            logger.info("Monitoring scheduler stopped")
         except Exception as e:
-            logging.error(f"Error stopping scheduler: {e}")
+            logger.error(f"Error stopping scheduler: {e}")
 
     def get_next_run_time(self, job_id: str) -> datetime:
         """Get next scheduled run time for a job"""
@@ -2,8 +2,6 @@
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import statistics
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 # Initialize sentiment analyzer
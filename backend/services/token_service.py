@@ -0,0 +1,272 @@
+import logging
+import os
+import secrets
+import threading
+import time
+import uuid
+from typing import Dict, Optional, Tuple
+
+import jwt
+
+logger = logging.getLogger(__name__)
+
+# Revocations committed this long before the previous sync are fetched again,
+# covering clock and commit delays on the database side
+SYNC_OVERLAP = 60
+
+
+class RevocationStoreError(Exception):
+    """Raised when a revocation cannot be written to the shared store"""
+
+
+class DatabaseRevocationStore:
+    """
+    Revoked token ids in the revoked_tokens table, shared by every API
+    worker. add() inserts on the jti primary key, so when the same refresh
+    token is presented to two workers at once exactly one of them wins.
+    """
+
+    def add(self, jti: str, exp: float) -> bool:
+        """Record a revocation; False if the jti was already revoked"""
+        import mysql.connector
+        from db.connection import get_connection
+        conn = None
+        cursor = None
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO revoked_tokens (jti, expires_at) VALUES (%s, FROM_UNIXTIME(%s))",
+                (jti, int(exp))
+            )
+            conn.commit()
+            return True
+        except mysql.connector.IntegrityError:
+            return False
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+    def revoked_since(self, since: Optional[float]) -> Tuple[Dict[str, float], float]:
+        """
+        Unexpired revocations recorded at or after the database time `since`
+        (all of them if None), and the database's current time
+        """
+        from db.connection import get_connection
+        conn = None
+        cursor = None
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT UNIX_TIMESTAMP()")
+            db_now = float(cursor.fetchone()[0])
+            cursor.execute(
+                """
+                SELECT jti, UNIX_TIMESTAMP(expires_at) FROM revoked_tokens
+                WHERE expires_at > NOW() AND revoked_at >= FROM_UNIXTIME(%s)
+                """,
+                (int(since or 0),)
+            )
+            return {jti: float(exp) for jti, exp in cursor.fetchall()}, db_now
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+    def prune(self):
+        """Delete revocations of tokens that have expired anyway"""
+        from db.connection import get_connection
+        conn = None
+        cursor = None
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM revoked_tokens WHERE expires_at < NOW()")
+            conn.commit()
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+
+class TokenService:
+    """
+    Issues and verifies stateless HS256-signed access and refresh tokens.
+
+    Verification checks the signature, expiry and a local copy of the
+    revocation set. With a `revocation_store` the set is shared between
+    processes: revocations are written through to the store, the local copy
+    is refreshed from it at most every `sync_interval` seconds (so a logout
+    takes effect on other workers within that interval), and refresh tokens
+    are claimed in the store so each can be used once across all workers.
+    Authenticated requests therefore touch the database at most once per
+    interval and never repeat a bcrypt check. Without a store, revocation
+    and single-use refresh only hold within this process.
+    """
+
+    ALGORITHM = 'HS256'
+
+    def __init__(self, secret_key: Optional[str] = None, access_ttl: int = 15 * 60,
+                 refresh_ttl: int = 7 * 24 * 60 * 60, enable_revocation: bool = True,
+                 revocation_store: Optional[DatabaseRevocationStore] = None, sync_interval: float = 5.0):
+        secret_key = secret_key or os.getenv('JWT_SECRET_KEY')
+        if not secret_key:
+            # Tokens won't survive a restart or be shared between workers;
+            # wsgi.py refuses to start without the key
+            logger.warning("JWT_SECRET_KEY is not set, using a random per-process key")
+            secret_key = secrets.token_hex(32)
+        self.secret_key = secret_key
+        self.access_ttl = access_ttl
+        self.refresh_ttl = refresh_ttl
+        self.enable_revocation = enable_revocation
+        self.revocation_store = revocation_store
+        self.sync_interval = sync_interval
+        self._revoked = {}  # jti -> exp, pruned once the token would have expired anyway
+        self._lock = threading.Lock()
+        self._synced_until = None  # Database time of the last successful sync
+        self._next_sync = 0.0
+        self._next_prune = 0.0
+
+    def _encode(self, force_id: str, role: str, token_type: str, ttl: int) -> str:
+        now = int(time.time())
+        claims = {
+            'sub': force_id,
+            'role': role,
+            'type': token_type,
+            'jti': uuid.uuid4().hex,
+            'iat': now,
+            'exp': now + ttl
+        }
+        return jwt.encode(claims, self.secret_key, algorithm=self.ALGORITHM)
+
+    def issue_tokens(self, force_id: str, role: str) -> Dict:
+        """
+        Issue an access/refresh token pair for a user
+
+        Returns:
+            dict: access_token, refresh_token and expires_in (seconds)
+        """
+        return {
+            'access_token': self._encode(force_id, role, 'access', self.access_ttl),
+            'refresh_token': self._encode(force_id, role, 'refresh', self.refresh_ttl),
+            'token_type': 'Bearer',
+            'expires_in': self.access_ttl
+        }
+
+    def verify(self, token: str, token_type: str = 'access') -> Dict:
+        """
+        Verify a token and return its claims
+
+        Raises:
+            jwt.InvalidTokenError: If the token is malformed, expired, of the
+                wrong type or revoked
+        """
+        claims = jwt.decode(
+            token,
+            self.secret_key,
+            algorithms=[self.ALGORITHM],
+            options={'require': ['sub', 'exp', 'jti', 'type']}
+        )
+        if claims['type'] != token_type:
+            raise jwt.InvalidTokenError(f"Expected a {token_type} token")
+        if self.enable_revocation and self._is_revoked(claims['jti']):
+            raise jwt.InvalidTokenError("Token has been revoked")
+        return claims
+
+    def _is_revoked(self, jti: str) -> bool:
+        if self.revocation_store is not None and time.monotonic() >= self._next_sync:
+            self._sync()
+        return jti in self._revoked
+
+    def _sync(self):
+        """Merge revocations made by other processes into the local set"""
+        with self._lock:
+            if time.monotonic() < self._next_sync:
+                return
+            self._next_sync = time.monotonic() + self.sync_interval
+            since = None if self._synced_until is None else self._synced_until - SYNC_OVERLAP
+            try:
+                revoked, self._synced_until = self.revocation_store.revoked_since(since)
+                if time.monotonic() >= self._next_prune:
+                    self._next_prune = time.monotonic() + 3600
+                    self.revocation_store.prune()
+            except Exception as e:
+                # Keep verifying against the local set; retried next interval
+                logger.error(f"Failed to sync revoked tokens: {e}")
+                return
+            now = time.time()
+            self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+            self._revoked.update(revoked)
+
+    def _record(self, claims: Dict) -> bool:
+        """Add a revocation locally and to the store; False if it was already revoked"""
+        now = time.time()
+        with self._lock:
+            self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+            known = claims['jti'] in self._revoked
+            self._revoked[claims['jti']] = claims['exp']
+        if self.revocation_store is not None:
+            try:
+                return self.revocation_store.add(claims['jti'], claims['exp']) and not known
+            except Exception as e:
+                # Not recorded anywhere, so a retry must not find it revoked locally
+                if not known:
+                    with self._lock:
+                        self._revoked.pop(claims['jti'], None)
+                logger.error(f"Failed to record revoked token: {e}")
+                raise RevocationStoreError("Revocation store unavailable") from e
+        return not known
+
+    def revoke(self, claims: Dict):
+        """
+        Revoke a verified token until it expires
+
+        Raises:
+            RevocationStoreError: If the shared store cannot be written
+        """
+        if self.enable_revocation:
+            self._record(claims)
+
+    def refresh(self, refresh_token: str) -> Dict:
+        """
+        Exchange a refresh token for a new token pair. The old refresh token
+        is revoked so each one can only be used once.
+
+        Raises:
+            jwt.InvalidTokenError: If the token is invalid or was already used
+            RevocationStoreError: If the shared store cannot be written
+        """
+        claims = self.verify(refresh_token, token_type='refresh')
+        if self.enable_revocation and not self._record(claims):
+            # Another request (possibly on another worker) already used it
+            raise jwt.InvalidTokenError("Token has been revoked")
+        return self.issue_tokens(claims['sub'], claims['role'])
+
+
+_default_service = None
+_default_service_lock = threading.Lock()
+
+
+def get_token_service() -> TokenService:
+    """
+    Return the process-wide TokenService, creating it on first use.
+
+    Revocations are shared through the revoked_tokens table unless
+    JWT_REVOCATION_STORE=memory, which only suits a single process.
+    """
+    global _default_service
+    with _default_service_lock:
+        if _default_service is None:
+            shared = os.getenv('JWT_REVOCATION_STORE', 'database') != 'memory'
+            _default_service = TokenService(
+                access_ttl=int(os.getenv('JWT_ACCESS_TTL', 15 * 60)),
+                refresh_ttl=int(os.getenv('JWT_REFRESH_TTL', 7 * 24 * 60 * 60)),
+                enable_revocation=os.getenv('JWT_REVOCATION', '1') != '0',
+                revocation_store=DatabaseRevocationStore() if shared else None,
+                sync_interval=float(os.getenv('JWT_REVOCATION_SYNC_SECONDS', 5))
+            )
+        return _default_service
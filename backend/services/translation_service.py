@@ -1,14 +1,231 @@
-from googletrans import Translator
+import json
+import logging
+import os
+import sqlite3
+import threading
+import unicodedata
+import urllib.request
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for use as a translation cache key (NFC, collapsed whitespace)."""
+    return unicodedata.normalize('NFC', ' '.join(text.split()))
+
+
+class GoogleTranslateBackend:
+    """Remote backend using googletrans. One Translator is reused for all calls."""
+
+    def __init__(self):
+        self._translator = None
+        self._lock = threading.Lock()
+
+    def _get_translator(self):
+        if self._translator is None:
+            from googletrans import Translator
+            self._translator = Translator()
+        return self._translator
+
+    def translate_batch(self, texts: List[str], src: str, dest: str) -> List[str]:
+        # googletrans' Translator shares one HTTP client, so calls are serialized
+        with self._lock:
+            results = self._get_translator().translate(list(texts), src=src, dest=dest)
+        return [result.text for result in results]
+
+
+class HttpTranslationBackend:
+    """
+    Backend for a self-hosted LibreTranslate-compatible server.
+
+    POSTs {"q": [...], "source": src, "target": dest} to `<base_url>/translate`
+    and expects {"translatedText": [...]} back.
+    """
+
+    def __init__(self, base_url: str, timeout: float = 10.0):
+        self.url = base_url.rstrip('/') + '/translate'
+        self.timeout = timeout
+
+    def translate_batch(self, texts: List[str], src: str, dest: str) -> List[str]:
+        payload = json.dumps({
+            'q': list(texts),
+            'source': src,
+            'target': dest,
+            'format': 'text'
+        }).encode('utf-8')
+        request = urllib.request.Request(
+            self.url,
+            data=payload,
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            result = json.loads(response.read().decode('utf-8'))
+        translated = result['translatedText']
+        if isinstance(translated, str):
+            translated = [translated]
+        return translated
+
+
+class LocalTranslationBackend:
+    """
+    Offline stand-in backend for tests and development.
+
+    Looks texts up in a fixed dictionary keyed by (src, dest, text) and falls
+    back to returning the input unchanged. Every call is recorded in `calls`.
+    """
+
+    def __init__(self, translations: Optional[Dict[Tuple[str, str, str], str]] = None):
+        self.translations = dict(translations or {})
+        self.calls = []
+
+    def translate_batch(self, texts: List[str], src: str, dest: str) -> List[str]:
+        self.calls.append((list(texts), src, dest))
+        return [self.translations.get((src, dest, text), text) for text in texts]
+
+
+class TranslationMemory:
+    """
+    Persistent translation cache: an in-memory LRU in front of a SQLite store
+    keyed by (src, dest, normalized text).
+    """
+
+    def __init__(self, db_path: str, lru_size: int = 1024):
+        self.db_path = db_path
+        self.lru_size = lru_size
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS translations (
+                src TEXT NOT NULL,
+                dest TEXT NOT NULL,
+                source_text TEXT NOT NULL,
+                translated_text TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (src, dest, source_text)
+            )
+        """)
+        self._conn.commit()
+
+    def _remember(self, key: Tuple[str, str, str], value: str):
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def get_many(self, keys: Sequence[Tuple[str, str, str]]) -> Dict[Tuple[str, str, str], str]:
+        """Return cached translations for the given (src, dest, normalized text) keys"""
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    found[key] = self._lru[key]
+                    continue
+                row = self._conn.execute(
+                    "SELECT translated_text FROM translations "
+                    "WHERE src = ? AND dest = ? AND source_text = ?",
+                    key
+                ).fetchone()
+                if row:
+                    found[key] = row[0]
+                    self._remember(key, row[0])
+        return found
+
+    def put_many(self, items: Dict[Tuple[str, str, str], str]):
+        """Store translations for the given (src, dest, normalized text) keys"""
+        if not items:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO translations (src, dest, source_text, translated_text) "
+                "VALUES (?, ?, ?, ?)",
+                [(src, dest, text, value) for (src, dest, text), value in items.items()]
+            )
+            self._conn.commit()
+            for key, value in items.items():
+                self._remember(key, value)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class TranslationService:
+    def __init__(self, backend=None, memory: Optional[TranslationMemory] = None):
+        if backend is None:
+            backend_url = os.getenv('TRANSLATION_BACKEND_URL')
+            backend = HttpTranslationBackend(backend_url) if backend_url else GoogleTranslateBackend()
+        self.backend = backend
+        self.memory = memory or TranslationMemory(
+            os.getenv(
+                'TRANSLATION_CACHE_PATH',
+                os.path.join('storage', 'translations', 'translation_memory.sqlite3')
+            )
+        )
+
+    def translate_batch(self, texts: Sequence[str], src: str, dest: str) -> List[str]:
+        """
+        Translate a list of texts, sending only cache misses to the backend
+
+        Args:
+            texts (list): Texts to translate
+            src (str): Source language code
+            dest (str): Destination language code
+
+        Returns:
+            list: Translations in the same order as `texts`
+        """
+        keys = [(src, dest, normalize_text(text)) for text in texts]
+        cached = self.memory.get_many(set(keys))
+
+        # Deduplicate misses so repeated texts cost one backend lookup
+        misses = [key for key in dict.fromkeys(keys) if key not in cached and key[2]]
+        if misses:
+            logger.info(f"Translating {len(misses)} uncached texts ({src} -> {dest})")
+            translated = self.backend.translate_batch([key[2] for key in misses], src, dest)
+            fresh = dict(zip(misses, translated))
+            self.memory.put_many(fresh)
+            cached.update(fresh)
+
+        return [cached.get(key, '') for key in keys]
+
+    def translate(self, text: str, src: str, dest: str) -> str:
+        return self.translate_batch([text], src, dest)[0]
+
+
+_default_service = None
+_default_service_lock = threading.Lock()
+
+
+def get_translation_service() -> TranslationService:
+    """Return the process-wide TranslationService, creating it on first use."""
+    global _default_service
+    with _default_service_lock:
+        if _default_service is None:
+            _default_service = TranslationService()
+        return _default_service
+
+
+def set_translation_service(service: Optional[TranslationService]):
+    """Replace the process-wide TranslationService (e.g. with a local backend in tests)."""
+    global _default_service
+    with _default_service_lock:
+        _default_service = service
 
 
 def translate_to_hindi(text: str) -> str:
-    """Translate English text to Hindi using googletrans."""
-    translator = Translator()
-    result = translator.translate(text, src='en', dest='hi')
-    return result.text
+    """Translate English text to Hindi, using the translation memory when possible."""
+    return get_translation_service().translate(text, src='en', dest='hi')
 
 def translate_to_english(text: str) -> str:
-    """Translate Hindi text to English using googletrans."""
-    translator = Translator()
-    result = translator.translate(text, src='hi', dest='en')
-    return result.text
+    """Translate Hindi text to English, using the translation memory when possible."""
+    return get_translation_service().translate(text, src='hi', dest='en')
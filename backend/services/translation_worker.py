@@ -0,0 +1,141 @@
+import asyncio
+import concurrent.futures
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+from services.translation_service import get_translation_service, normalize_text
+
+logger = logging.getLogger(__name__)
+
+
+class TranslationWorker:
+    """
+    Asyncio-based translation worker running on its own event loop thread.
+
+    Identical in-flight requests (same src, dest and normalized text) are
+    coalesced into a single backend call, at most `max_concurrency` backend
+    calls run at once, and each call is bounded by `timeout` seconds.
+    """
+
+    def __init__(self, service=None, max_concurrency: int = 4, timeout: float = 10.0):
+        self._service = service
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._loop = None
+        self._thread = None
+        self._executor = None
+        self._semaphore = None
+        self._in_flight = {}
+        self._start_lock = threading.Lock()
+
+    @property
+    def service(self):
+        return self._service or get_translation_service()
+
+    def start(self):
+        """Start the event loop thread if it is not already running"""
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._loop = asyncio.new_event_loop()
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency,
+                thread_name_prefix='translation'
+            )
+            ready = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run_loop,
+                args=(ready,),
+                name='translation-worker',
+                daemon=True
+            )
+            self._thread.start()
+            ready.wait()
+            logger.info("Translation worker started")
+
+    def _run_loop(self, ready: threading.Event):
+        asyncio.set_event_loop(self._loop)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        ready.set()
+        self._loop.run_forever()
+
+    def stop(self):
+        """Stop the event loop thread and its executor"""
+        with self._start_lock:
+            if not self._loop:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._executor.shutdown(wait=False)
+            self._loop = None
+            self._thread = None
+            self._in_flight = {}
+            logger.info("Translation worker stopped")
+
+    async def _translate(self, text: str, src: str, dest: str) -> str:
+        key = (src, dest, normalize_text(text))
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._call_backend(text, src, dest))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            logger.debug(f"Coalesced translation request ({src} -> {dest})")
+        # Shield so one caller's cancellation doesn't cancel the shared call
+        return await asyncio.shield(task)
+
+    async def _call_backend(self, text: str, src: str, dest: str) -> str:
+        # A timeout only stops the waiting, not the executor thread, so the slot
+        # is held until the backend call itself returns
+        await self._semaphore.acquire()
+        try:
+            call = self._loop.run_in_executor(self._executor, self.service.translate, text, src, dest)
+        except BaseException:
+            self._semaphore.release()
+            raise
+        call.add_done_callback(self._release_slot)
+        return await asyncio.wait_for(asyncio.shield(call), timeout=self.timeout)
+
+    def _release_slot(self, call: asyncio.Future):
+        self._semaphore.release()
+        if not call.cancelled():
+            call.exception()  # Retrieved here when nobody awaits a timed-out call
+
+    def submit(self, text: str, src: str, dest: str) -> Future:
+        """Submit a translation and return a concurrent.futures.Future for its result"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(self._translate(text, src, dest), self._loop)
+
+    def translate(self, text: str, src: str, dest: str, timeout: Optional[float] = None) -> str:
+        """
+        Translate text through the worker, waiting at most `timeout` seconds
+
+        Raises:
+            concurrent.futures.TimeoutError: If no result arrives in time
+        """
+        future = self.submit(text, src, dest)
+        try:
+            return future.result(timeout=timeout if timeout is not None else self.timeout)
+        except (asyncio.TimeoutError, concurrent.futures.TimeoutError):
+            future.cancel()
+            raise concurrent.futures.TimeoutError(f"Translation timed out ({src} -> {dest})")
+
+
+_default_worker = None
+_default_worker_lock = threading.Lock()
+
+
+def get_translation_worker() -> TranslationWorker:
+    """Return the process-wide TranslationWorker, creating it on first use."""
+    global _default_worker
+    with _default_worker_lock:
+        if _default_worker is None:
+            _default_worker = TranslationWorker(
+                max_concurrency=int(os.getenv('TRANSLATION_MAX_CONCURRENCY', 4)),
+                timeout=float(os.getenv('TRANSLATION_TIMEOUT', 10))
+            )
+        return _default_worker
@@ -0,0 +1,116 @@
+from datetime import date
+
+from services import aggregation_service
+from services.aggregation_service import AggregationService
+
+
+class FakeCursor:
+    """Answers the safety-lag and watermark queries of _refresh_source"""
+
+    def __init__(self, settled_id, watermark):
+        self.settled_id = settled_id
+        self.watermark = watermark
+        self.lag = None
+        self._result = None
+
+    def execute(self, query, params=None):
+        if "ORDER BY" in query:
+            self.lag = params[0]
+            self._result = (self.settled_id,)
+        elif query.lstrip().startswith("SELECT last_id"):
+            self._result = (self.watermark,)
+        elif "summary_watermarks" in query:
+            self.watermark = params[1]
+
+    def fetchone(self):
+        return self._result
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def test_refresh_stops_at_the_last_id_past_the_safety_lag():
+    cursor = FakeCursor(settled_id=100, watermark=90)
+    folds = []
+    service = AggregationService(safety_lag=120)
+
+    folded = service._refresh_source(FakeConnection(cursor), "weekly_sessions", "session_id", "start_timestamp",
+                                     lambda cur, low, high: folds.append((low, high)))
+
+    assert cursor.lag == 120
+    assert folds == [(90, 100)] and folded == 10 and cursor.watermark == 100
+
+
+class PageCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.params = None
+
+    def execute(self, query, params=None):
+        self.params = params
+
+    def fetchall(self):
+        return [dict(row) for row in self.rows]
+
+    def close(self):
+        pass
+
+
+class PageConnection:
+    def __init__(self, rows):
+        self.page_cursor = PageCursor(rows)
+
+    def cursor(self, dictionary=False):
+        assert dictionary
+        return self.page_cursor
+
+    def close(self):
+        pass
+
+
+def serve(monkeypatch, rows):
+    conn = PageConnection(rows)
+    monkeypatch.setattr(aggregation_service, "get_connection", lambda: conn)
+    return conn.page_cursor
+
+
+def test_unit_daily_pages_by_date(monkeypatch):
+    rows = [{'summary_date': date(2025, 6, day), 'soldiers_detected': 3} for day in (29, 28)]
+    cursor = serve(monkeypatch, rows)
+
+    page = AggregationService().get_unit_daily(date(2025, 6, 30), limit=2)
+    assert cursor.params == (date(2025, 6, 30), 2)
+    assert [row['summary_date'] for row in page['rows']] == ['2025-06-29', '2025-06-28']
+    assert page['next_before'] == '2025-06-28'
+
+    page = AggregationService().get_unit_daily(limit=30)
+    assert cursor.params == (date.max, 30) and page['next_before'] is None
+
+
+def test_weekly_pages_by_force_id_and_year_week(monkeypatch):
+    rows = [{'force_id': force_id, 'year_week': 202526, 'week_start': date(2025, 6, 23)}
+            for force_id in ('100000001', '100000002')]
+    cursor = serve(monkeypatch, rows)
+
+    page = AggregationService().get_weekly_overview(202526, '100000000', limit=2)
+    assert cursor.params == (202526, '100000000', 2)
+    assert page['next_after'] == '100000002' and page['rows'][0]['week_start'] == '2025-06-23'
+    assert AggregationService().get_weekly_overview(202526, limit=50)['next_after'] is None
+
+    rows[1]['year_week'] = 202525
+    page = AggregationService().get_soldier_weekly('100000001', limit=2)
+    assert cursor.params == ('100000001', 999999, 2) and page['next_before'] == 202525
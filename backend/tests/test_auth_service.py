@@ -0,0 +1,49 @@
+import pytest
+
+pytest.importorskip("bcrypt")
+
+from services import auth_service
+from services.auth_service import AuthService
+
+
+class FakeCursor:
+    def __init__(self, row):
+        self.row = row
+
+    def execute(self, query, params=None):
+        pass
+
+    def fetchone(self):
+        return self.row
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, row):
+        self.row = row
+        self.closed = False
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self.row)
+
+    def close(self):
+        self.closed = True
+
+
+def test_connection_is_released_before_the_password_check(monkeypatch):
+    conn = FakeConnection({'force_id': '100000001', 'password_hash': 'hash', 'user_type': 'soldier'})
+    checked = []
+
+    class FakeHashingService:
+        def check_password(self, password, stored_hash):
+            checked.append(conn.closed)
+            return password == 'secret'
+
+    monkeypatch.setattr(auth_service, 'get_connection', lambda: conn)
+    monkeypatch.setattr(auth_service, 'get_hashing_service', FakeHashingService)
+
+    assert AuthService().verify_login('100000001', 'secret') == {'force_id': '100000001', 'role': 'soldier'}
+    assert AuthService().verify_login('100000001', 'wrong') is None
+    assert checked == [True, True]
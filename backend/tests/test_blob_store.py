@@ -0,0 +1,63 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from services.blob_store import BlobStore, FaceCropArchiver
+
+
+def test_put_is_content_addressed_and_deduplicated(tmp_path):
+    store = BlobStore(str(tmp_path), suffix='.jpg')
+    digest, written = store.put(b'crop')
+    assert written
+    assert store.path(digest) == os.path.join(str(tmp_path), digest[:2], digest[2:4], digest + '.jpg')
+    assert store.get(digest) == b'crop'
+    assert store.put(b'crop') == (digest, False)
+    assert [name for _, _, files in os.walk(tmp_path) for name in files] == [digest + '.jpg']
+
+
+def test_prune_keeps_recently_stored_blobs(tmp_path):
+    store = BlobStore(str(tmp_path))
+    old, _ = store.put(b'old')
+    kept, _ = store.put(b'kept')
+    week_ago = time.time() - 7 * 86400
+    os.utime(store.path(old), (week_ago, week_ago))
+    os.utime(store.path(kept), (week_ago, week_ago))
+    store.put(b'kept')  # Stored again: still referenced
+
+    assert store.prune(time.time() - 86400) == 1
+    assert not store.exists(old) and store.exists(kept)
+
+
+def test_archiver_samples_every_nth_crop_per_soldier_per_day(tmp_path):
+    pytest.importorskip("cv2")
+    from datetime import date
+
+    archiver = FaceCropArchiver(BlobStore(str(tmp_path), suffix='.jpg'), sample_every=3)
+    crop = np.full((40, 40, 3), 128, dtype=np.uint8)
+    day = date(2025, 10, 14)
+    kept = [archiver.submit('111111111', crop, day) for _ in range(7)]
+    assert [digest is not None for digest in kept] == [True, False, False, True, False, False, True]
+    assert archiver.submit('222222222', crop, day) is not None
+    assert archiver.submit('111111111', crop, date(2025, 10, 15)) is not None
+
+    assert archiver.flush(timeout=10)
+    assert archiver.store.exists(kept[0])
+    assert archiver.stats['written'] == 1 and archiver.stats['deduplicated'] == 4
+
+
+def test_failed_crop_writes_are_counted_and_read_as_missing(tmp_path):
+    pytest.importorskip("cv2")
+
+    class FailingStore(BlobStore):
+        def put(self, data, digest=None):
+            raise OSError("disk full")
+
+    archiver = FaceCropArchiver(FailingStore(str(tmp_path), suffix='.jpg'), sample_every=1)
+    crops = [np.full((40, 40, 3), shade, dtype=np.uint8) for shade in range(0, 200, 10)]
+    digests = [archiver.submit('111111111', crop) for crop in crops]
+    assert archiver.flush(timeout=10)
+
+    assert archiver.stats['sampled'] == archiver.stats['failed'] == len(crops)
+    assert all(archiver.store.get_if_exists(digest) is None for digest in digests)
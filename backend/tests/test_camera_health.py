@@ -0,0 +1,96 @@
+from services.camera_health import CameraHealthMonitor
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def monitor(clock, **kwargs):
+    return CameraHealthMonitor(stale_after=5, failure_threshold=3, initial_backoff=1, max_backoff=4,
+                               clock=clock, **kwargs)
+
+
+def test_consecutive_failures_open_and_a_frame_closes_an_outage():
+    clock = FakeClock()
+    health = monitor(clock)
+    health.record_frame()
+    assert health.record_failure() is None
+    health.record_frame()  # A good frame resets the count
+    assert health.record_failure() is None and health.record_failure() is None
+    outage = health.record_failure()
+    assert outage.reason == 'read_failures' and not health.healthy
+
+    clock.now += 10
+    assert health.record_frame() is outage
+    assert health.healthy and outage.duration(clock.now) == 10
+    metrics = health.metrics()
+    assert (metrics['state'], metrics['outages'], metrics['downtime_s']) == ('up', 1, 10)
+    assert metrics['uptime_ratio'] == 0.0  # The whole monitored time so far was down
+
+
+def test_stalled_feed_reconnects_with_exponential_backoff():
+    clock = FakeClock()
+    health = monitor(clock)
+    health.record_frame()
+    clock.now += 6
+    outage = health.check()
+    assert outage.reason == 'stale'
+    assert health.check() is None  # Already down
+
+    waits = []
+    for _ in range(5):
+        assert health.should_reconnect()
+        health.record_reconnect(success=False)
+        start = clock.now
+        while not health.should_reconnect():
+            clock.now += 0.5
+        waits.append(clock.now - start)
+    assert waits == [1, 2, 4, 4, 4]
+    assert outage.reconnect_attempts == 5
+
+    # A reopened device gets stale_after seconds to deliver its first frame
+    health.record_reconnect(success=True)
+    clock.now += 4
+    assert not health.should_reconnect()
+    health.record_frame()
+    assert health.healthy and health.metrics()['reconnects'] == 6
+
+
+def test_open_outage_is_closed_when_monitoring_stops():
+    clock = FakeClock()
+    health = monitor(clock)
+    clock.now += 6
+    health.check()
+    clock.now += 4
+    outage = health.close_outage()
+    assert outage.ended_at is not None and outage.duration(clock.now) == 10
+    assert health.metrics()['frames'] == 0
+
+
+def test_reopened_camera_without_frames_backs_off_until_a_frame_arrives():
+    clock = FakeClock()
+    health = CameraHealthMonitor(stale_after=2, failure_threshold=3, initial_backoff=1, max_backoff=16, clock=clock)
+    clock.now += 3
+    health.check()
+
+    waits = []
+    for _ in range(5):
+        assert health.should_reconnect()
+        health.record_reconnect(success=True)  # Opens, but no frame follows
+        start = clock.now
+        while not health.should_reconnect():
+            clock.now += 0.5
+        waits.append(clock.now - start)
+    assert waits == [2, 2, 4, 8, 16]
+
+    # Only a frame resets the backoff
+    health.record_frame()
+    clock.now += 3
+    health.check()
+    health.record_reconnect(success=False)
+    clock.now += 1
+    assert health.should_reconnect()
@@ -0,0 +1,67 @@
+import ast
+import os
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+from benchmarks.db_benchmark import compare
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def stats(p95):
+    return {'iterations': 10, 'p50_ms': p95 / 2, 'p95_ms': p95, 'p99_ms': p95 * 1.2, 'rows_per_sec': 100.0}
+
+
+def test_compare_flags_p95_regressions_beyond_tolerance():
+    baseline = {'100': {'submit_survey': stats(10.0), 'stop_monitoring': stats(50.0)}}
+    results = {'100': {'submit_survey': stats(13.0), 'stop_monitoring': stats(55.0)}}
+    regressions = compare(results, baseline, tolerance=0.2)
+    assert [(r['size'], r['path']) for r in regressions] == [('100', 'submit_survey')]
+    assert regressions[0]['change'] == '+30%'
+
+
+def test_compare_ignores_tiny_absolute_changes_and_new_paths():
+    baseline = {'100': {'get_active_questionnaire': stats(0.5)}}
+    results = {
+        '100': {'get_active_questionnaire': stats(1.0), 'submit_survey': stats(10.0)},
+        '1000': {'submit_survey': stats(20.0)}
+    }
+    assert compare(results, baseline, tolerance=0.2) == []
+
+
+# Where each benchmark path's statements really live
+SOURCES = {
+    'get_active_questionnaire': 'api/survey/routes.py',
+    'submit_survey': 'api/survey/routes.py',
+    'stop_monitoring': 'services/cctv_monitoring_service.py',
+    'calculate_daily_scores': 'services/emotion_detection_service.py',
+    'calculate_and_store_average': 'services/emotion_detection_service.py',
+    'update_session_scores': 'update_sentiment_scores.py',
+}
+
+
+def sql_literals(node):
+    """Whitespace-normalized string literals passed to cursor.execute under node"""
+    statements = set()
+    for call in ast.walk(node):
+        if (isinstance(call, ast.Call) and isinstance(call.func, ast.Attribute)
+                and call.func.attr in ('execute', 'executemany') and call.args
+                and isinstance(call.args[0], ast.Constant) and isinstance(call.args[0].value, str)):
+            statements.add(" ".join(call.args[0].value.split()))
+    return statements
+
+
+def parse(path):
+    with open(os.path.join(BACKEND_DIR, path)) as f:
+        return ast.parse(f.read())
+
+
+@pytest.mark.parametrize('path', sorted(SOURCES))
+def test_benchmark_sql_matches_the_source(path):
+    benchmark = parse('benchmarks/db_benchmark.py')
+    function = next(node for node in benchmark.body if isinstance(node, ast.FunctionDef) and node.name == path)
+    statements = sql_literals(function)
+    assert statements
+    assert statements <= sql_literals(parse(SOURCES[path]))
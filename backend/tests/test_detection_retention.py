@@ -0,0 +1,157 @@
+from datetime import date, datetime
+
+import pytest
+
+from services import detection_retention
+from services.detection_retention import DELETE_BATCH_SIZE, DetectionRetentionService, add_months
+
+
+def test_add_months_returns_first_of_month():
+    assert add_months(date(2025, 10, 19), 0) == date(2025, 10, 1)
+    assert add_months(date(2025, 10, 19), 1) == date(2025, 11, 1)
+
+
+def test_add_months_crosses_years():
+    assert add_months(date(2025, 11, 30), 2) == date(2026, 1, 1)
+    assert add_months(date(2025, 2, 28), -3) == date(2024, 11, 1)
+    assert add_months(date(2025, 1, 1), -12) == date(2024, 1, 1)
+
+
+def ts(day):
+    return int(datetime.combine(day, datetime.min.time()).timestamp())
+
+
+class FakeCursor:
+    """Answers the retention queries from a few fixed facts and records the rest"""
+
+    def __init__(self, partitions=(), expired_max_id=None, watermark=None, leftover_rows=0):
+        self.partitions = list(partitions)
+        self.expired_max_id = expired_max_id
+        self.watermark = watermark
+        self.leftover_rows = leftover_rows
+        self.statements = []
+        self.rowcount = 0
+        self._result = None
+
+    def execute(self, query, params=None):
+        query = " ".join(query.split())
+        self.statements.append((query, params))
+        if "information_schema.PARTITIONS" in query:
+            self._result = [(name, 'MAXVALUE' if bound is None else str(bound)) for name, bound in self.partitions]
+        elif query.startswith("SELECT MAX(detection_id)"):
+            self._result = (self.expired_max_id,)
+        elif query.startswith("SELECT last_id"):
+            self._result = (self.watermark,) if self.watermark is not None else None
+        elif query.startswith("SELECT UNIX_TIMESTAMP"):
+            self._result = (ts(params[0]),)
+        elif query.startswith("SELECT 1"):
+            self._result = (1,) if self.leftover_rows else None
+        elif query.startswith("DELETE"):
+            self.rowcount = min(self.leftover_rows, DELETE_BATCH_SIZE)
+            self.leftover_rows -= self.rowcount
+
+    def fetchone(self):
+        return self._result
+
+    def fetchall(self):
+        return self._result
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeAggregation:
+    def __init__(self):
+        self.refreshed = 0
+
+    def refresh(self):
+        self.refreshed += 1
+
+
+def service_with(monkeypatch, cursor):
+    monkeypatch.setattr(detection_retention, "get_connection", lambda: FakeConnection(cursor))
+    return DetectionRetentionService(retention_months=3, months_ahead=1, aggregation_service=FakeAggregation(),
+                                     crop_store=object())
+
+
+def statements(cursor, prefix):
+    return [query for query, _ in cursor.statements if query.startswith(prefix)]
+
+
+def test_ensure_partitions_splits_missing_months_off_p_future(monkeypatch):
+    cursor = FakeCursor(partitions=[('p202510', ts(date(2025, 11, 1))), ('p_future', None)])
+    created = service_with(monkeypatch, cursor).ensure_partitions(date(2025, 10, 19))
+
+    assert created == ['p202511']
+    assert statements(cursor, "ALTER") == [
+        "ALTER TABLE cctv_detections REORGANIZE PARTITION p_future INTO ( "
+        "PARTITION p202511 VALUES LESS THAN (UNIX_TIMESTAMP('2025-12-01')), "
+        "PARTITION p_future VALUES LESS THAN MAXVALUE )"
+    ]
+
+
+def test_ensure_partitions_leaves_an_unpartitioned_table_alone(monkeypatch):
+    cursor = FakeCursor()
+    assert service_with(monkeypatch, cursor).ensure_partitions(date(2025, 10, 19)) == []
+    assert statements(cursor, "ALTER") == []
+
+
+def test_prune_refuses_to_remove_unsummarized_detections(monkeypatch):
+    cursor = FakeCursor(partitions=[('p202506', ts(date(2025, 7, 1))), ('p_future', None)],
+                        expired_max_id=500, watermark=499)
+    with pytest.raises(Exception, match="not yet summarized"):
+        service_with(monkeypatch, cursor).prune(date(2025, 10, 19))
+    assert statements(cursor, "ALTER") == [] and statements(cursor, "DELETE") == []
+
+
+def test_prune_drops_expired_partitions_and_deletes_older_history(monkeypatch):
+    # p202506 also holds everything from before the table was partitioned
+    cursor = FakeCursor(
+        partitions=[('p202506', ts(date(2025, 7, 1))), ('p202507', ts(date(2025, 8, 1))),
+                    ('p202508', ts(date(2025, 9, 1))), ('p_future', None)],
+        expired_max_id=500, watermark=500, leftover_rows=0
+    )
+    result = service_with(monkeypatch, cursor).prune(date(2025, 10, 19))
+    assert result['cutoff'] == '2025-07-01'
+    assert result['dropped_partitions'] == ['p202506'] and result['deleted_rows'] == 0
+    assert statements(cursor, "ALTER") == ["ALTER TABLE cctv_detections DROP PARTITION p202506"]
+    assert statements(cursor, "DELETE") == []
+
+    # Nothing expired yet as a whole partition, but old history sits in the first one
+    cursor = FakeCursor(partitions=[('p202509', ts(date(2025, 10, 1))), ('p_future', None)],
+                        expired_max_id=500, watermark=500, leftover_rows=DELETE_BATCH_SIZE + 5)
+    result = service_with(monkeypatch, cursor).prune(date(2025, 10, 19))
+    assert result['dropped_partitions'] == [] and result['deleted_rows'] == DELETE_BATCH_SIZE + 5
+    assert len(statements(cursor, "DELETE")) == 2
+
+
+def test_prune_deletes_in_batches_without_partitions(monkeypatch):
+    cursor = FakeCursor(expired_max_id=500, watermark=600, leftover_rows=2 * DELETE_BATCH_SIZE)
+    result = service_with(monkeypatch, cursor).prune(date(2025, 10, 19))
+    assert result['deleted_rows'] == 2 * DELETE_BATCH_SIZE
+    # The last full batch needs one more DELETE to find nothing left
+    assert len(statements(cursor, "DELETE")) == 3
+    assert statements(cursor, "ALTER") == []
+
+
+def test_prune_without_expired_detections_does_nothing(monkeypatch):
+    cursor = FakeCursor(partitions=[('p_future', None)])
+    result = service_with(monkeypatch, cursor).prune(date(2025, 10, 19))
+    assert result == {'cutoff': '2025-07-01', 'dropped_partitions': [], 'deleted_rows': 0}
+    assert [query for query, _ in cursor.statements] == [
+        "SELECT MAX(detection_id) FROM cctv_detections WHERE detection_timestamp < %s"
+    ]
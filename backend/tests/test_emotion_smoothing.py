@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from services.emotion_smoothing import EmotionSmoother, EmotionWindow, pack_probabilities, unpack_probabilities
+
+LABELS = ["Angry", "Disgusted", "Fearful", "Happy", "Neutral", "Sad", "Surprised"]
+
+
+def random_detections(n, seed=0):
+    rng = np.random.default_rng(seed)
+    probs = rng.dirichlet(np.ones(7), size=n).astype(np.float32)
+    scores = rng.choice([-1.0, 0.0, 1.0, 2.0, 3.0], size=n)
+    return probs, scores
+
+
+def test_window_matches_brute_force_over_last_n():
+    window = EmotionWindow(size=16, classes=7)
+    probs, scores = random_detections(100)
+    for i in range(100):
+        window.add(probs[i], scores[i], float(i))
+
+        last = slice(max(0, i - 15), i + 1)
+        stats = window.stats(LABELS)
+        confidence = probs[last].max(axis=1)
+        assert stats.count == len(scores[last])
+        assert stats.mean_score == pytest.approx(scores[last].mean(), abs=1e-5)
+        assert stats.weighted_score == pytest.approx((scores[last] * confidence).sum() / confidence.sum(), abs=1e-5)
+        histogram = probs[last].mean(axis=0)
+        assert list(stats.histogram.values()) == pytest.approx(histogram.tolist(), abs=1e-5)
+        assert stats.dominant_emotion == LABELS[int(np.argmax(histogram))]
+
+
+def test_ewma_follows_every_detection():
+    window = EmotionWindow(size=4, classes=7, alpha=0.5)
+    probs, _ = random_detections(3)
+    for score in (0.0, 2.0, 3.0):
+        window.add(probs[0], score, 0.0)
+    assert window.ewma_score == pytest.approx(2.0)  # 0 -> 1 -> 2
+
+
+def test_old_detections_expire_by_age():
+    smoother = EmotionSmoother(LABELS, window_size=32, window_seconds=3.0)
+    sad = np.eye(7, dtype=np.float32)[5]
+    happy = np.eye(7, dtype=np.float32)[3]
+    for t in range(5):
+        smoother.add('111111111', sad, 3.0, 100.0 + t * 0.5)
+    smoother.add('111111111', happy, -1.0, 200.0)
+
+    stats = smoother.stats('111111111', now=200.5)
+    assert (stats.count, stats.mean_score, stats.dominant_emotion) == (1, -1.0, "Happy")
+    assert smoother.stats('111111111', now=210.0).count == 0
+    assert smoother.stats('222222222').count == 0
+
+
+def test_probabilities_pack_into_seven_bytes():
+    probs, _ = random_detections(50, seed=1)
+    blobs = [pack_probabilities(p) for p in probs]
+    assert all(len(blob) == 7 and sum(blob) == 255 for blob in blobs)
+
+    decoded = unpack_probabilities(blobs + [None])
+    assert np.abs(decoded[:-1] - probs).max() <= 1 / 255
+    assert np.isnan(decoded[-1]).all()
@@ -0,0 +1,55 @@
+import json
+
+from services.event_stream import EventBroker
+
+
+def parse(frame):
+    lines = frame.decode().strip().split('\n')
+    fields = dict(line.split(': ', 1) for line in lines)
+    return fields['id'], json.loads(fields['data'])
+
+
+def test_events_are_batched_and_shared_by_all_clients():
+    broker = EventBroker()
+    first, second = broker.subscribe(), broker.subscribe()
+    for n in range(3):
+        broker.publish('detection', {'force_id': f'11111111{n}'})
+    broker.flush()
+
+    frame = first.get(timeout=1)
+    assert frame is second.get(timeout=1)
+    seq, batch = parse(frame)
+    assert seq == '1' and batch['seq'] == 1
+    assert [event['data']['force_id'] for event in batch['events']] == ['111111110', '111111111', '111111112']
+
+    broker.flush()  # Nothing pending: no empty batch
+    assert first.get(timeout=0.01) is None
+
+
+def test_slow_client_drops_oldest_batches():
+    broker = EventBroker(client_buffer=2)
+    slow = broker.subscribe()
+    for n in range(5):
+        broker.publish('detection', {'n': n})
+        broker.flush()
+
+    assert slow.dropped == 3
+    assert [parse(slow.get(timeout=1))[1]['events'][0]['data']['n'] for _ in range(2)] == [3, 4]
+
+
+def test_sse_stream_reports_drops_and_unsubscribes_on_close():
+    broker = EventBroker(client_buffer=1)
+    subscription = broker.subscribe()
+    stream = subscription.iter_sse(keepalive=0.01)
+    assert next(stream) == b'retry: 3000\n\n'
+    assert next(stream) == b': keepalive\n\n'
+
+    broker.publish('monitoring', {'status': 'started'})
+    broker.flush()
+    broker.publish('monitoring', {'status': 'stopped'})
+    broker.flush()
+    assert next(stream) == b'event: dropped\ndata: {"batches": 1}\n\n'
+    assert parse(next(stream))[1]['events'][0]['data'] == {'status': 'stopped'}
+
+    stream.close()
+    assert broker.subscriber_count == 0
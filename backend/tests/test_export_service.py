@@ -0,0 +1,125 @@
+import os
+from datetime import datetime
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+pytest.importorskip("mysql.connector")
+
+from services import export_service
+from services.export_service import HistoryExporter, get_export_schema
+
+ROWS = [
+    (i, 1, f"F{i:08d}", datetime(2025, 10, 14 + i % 3, 9, 0, i), 0.5 if i % 2 else None,
+     bytes([255, 0, 0, 0, 0, 0, 0]) if i % 2 else None)
+    for i in range(7)
+]
+
+
+class FakeExporter(HistoryExporter):
+    """Serves fixed rows in small chunks instead of reading MySQL"""
+
+    def iter_batches(self, table, start=None, end=None):
+        schema = get_export_schema(table)
+        for offset in range(0, len(ROWS), self.chunk_size):
+            columns = [list(column) for column in zip(*ROWS[offset:offset + self.chunk_size])]
+            yield pa.RecordBatch.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema
+            )
+
+
+def test_export_files_partitions_by_date(tmp_path):
+    result = FakeExporter(chunk_size=3).export_files('cctv_detections', str(tmp_path))
+
+    assert result['rows'] == 7
+    assert result['files'] == 3
+    table_dir = tmp_path / 'cctv_detections'
+    assert sorted(os.listdir(table_dir)) == ['date=2025-10-14', 'date=2025-10-15', 'date=2025-10-16']
+    day = pq.read_table(table_dir / 'date=2025-10-14' / 'part-0.parquet')
+    assert day.column('detection_id').to_pylist() == [0, 3, 6]
+
+
+def test_export_files_closes_days_beyond_the_open_writer_limit(tmp_path, monkeypatch):
+    open_writers = []
+    exporter = FakeExporter(chunk_size=3, max_open_writers=1)
+    original = exporter._open_writer
+
+    def tracking_open(*args):
+        writer = original(*args)
+        open_writers.append(writer)
+        close = writer.close
+        writer.close = lambda: (open_writers.remove(writer), close())
+        assert len(open_writers) <= 1
+        return writer
+
+    monkeypatch.setattr(exporter, '_open_writer', tracking_open)
+    result = exporter.export_files('cctv_detections', str(tmp_path))
+
+    assert not open_writers
+    # Days interleave in key order, so a reopened day continues in a new part
+    day_dir = tmp_path / 'cctv_detections' / 'date=2025-10-14'
+    assert result['files'] > 3 and sorted(os.listdir(day_dir)) == ['part-0.parquet', 'part-1.parquet', 'part-2.parquet']
+    day = pq.read_table(day_dir)
+    assert sorted(day.column('detection_id').to_pylist()) == [0, 3, 6]
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self._rows = list(ROWS)
+
+    def execute(self, query, params=None):
+        self.conn.queries.append((query, params))
+
+    def fetchmany(self, size):
+        chunk, self._rows = self._rows[:size], self._rows[size:]
+        return chunk
+
+    def close(self):
+        self.conn.events.append('cursor closed')
+
+
+class FakeConnection:
+    def __init__(self):
+        self.queries = []
+        self.events = []
+
+    def start_transaction(self, **options):
+        self.events.append(('snapshot', options))
+
+    def cursor(self, buffered=None):
+        self.events.append(('cursor', buffered))
+        return FakeCursor(self)
+
+    def rollback(self):
+        self.events.append('rollback')
+
+    def close(self):
+        self.events.append('closed')
+
+
+def test_iter_batches_streams_from_an_unbuffered_snapshot_cursor(monkeypatch):
+    conn = FakeConnection()
+    monkeypatch.setattr(export_service, 'get_connection', lambda: conn)
+
+    batches = HistoryExporter(chunk_size=3).iter_batches(
+        'cctv_detections', datetime(2025, 10, 14).date(), datetime(2025, 10, 17).date()
+    )
+    assert [batch.num_rows for batch in batches] == [3, 3, 1]
+
+    assert conn.events == [('snapshot', {'consistent_snapshot': True, 'readonly': True}), ('cursor', False),
+                           'cursor closed', 'rollback', 'closed']
+    (query, params), = conn.queries
+    assert 'ORDER BY `detection_id`' in query
+    assert '`detection_timestamp` >= %s AND `detection_timestamp` < %s' in query
+    assert len(params) == 2
+
+
+def test_stream_ipc_round_trips():
+    data = b''.join(FakeExporter(chunk_size=3).stream_ipc('cctv_detections'))
+    table = pa.ipc.open_stream(data).read_all()
+    assert table.num_rows == 7
+    assert table.column('depression_score').null_count == 4
+    assert table.column('emotion_probs').to_pylist()[1] == bytes([255, 0, 0, 0, 0, 0, 0])
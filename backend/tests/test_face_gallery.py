@@ -0,0 +1,143 @@
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+pytest.importorskip("face_recognition")
+pytest.importorskip("cv2")
+
+from services import face_recognition_service
+from services.face_recognition_service import FaceRecognitionService
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, query, params=None):
+        self.conn.statements.append(" ".join(query.split()))
+
+    def executemany(self, query, rows):
+        self.conn.statements.append(" ".join(query.split()))
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Records statements; on commit captures the model file already in place"""
+
+    def __init__(self, service, fail_commit=False):
+        self.service = service
+        self.fail_commit = fail_commit
+        self.statements = []
+        self.committed = None
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self)
+
+    def commit(self):
+        if self.fail_commit:
+            raise RuntimeError("lost connection")
+        self.committed = read_gallery(self.service)
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def read_gallery(service):
+    with open(service.model_filename, "rb") as f:
+        encodings, force_ids = pickle.load(f)
+    return {force_id: sum(1 for fid in force_ids if fid == force_id) for force_id in force_ids}
+
+
+@pytest.fixture
+def gallery(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    service = FaceRecognitionService(detector="full")
+    connections = []
+    options = {"fail_commit": False}
+
+    def connect():
+        conn = FakeConnection(service, options["fail_commit"])
+        connections.append(conn)
+        return conn
+
+    def encode(force_id):
+        return [np.full(128, int(force_id[-1]), dtype=np.float64)] * 3, None
+
+    monkeypatch.setattr(face_recognition_service, "get_connection", connect)
+    monkeypatch.setattr(service, "_encode_soldier_images", encode)
+    return service, connections, options
+
+
+def test_add_replace_and_delete_soldiers(gallery):
+    service, connections, _ = gallery
+    service.add_soldier("100000001")
+    service.add_soldier("100000002")
+    # The new model is in place by the time trained_soldiers commits
+    assert connections[-1].committed == {"100000001": 3, "100000002": 3}
+    assert any(s.startswith("INSERT INTO trained_soldiers") for s in connections[-1].statements)
+
+    with pytest.raises(ValueError):
+        service.add_soldier("100000001")
+    service.replace_soldier("100000001")
+    assert read_gallery(service) == {"100000002": 3, "100000001": 3}
+
+    service.delete_soldier("100000002")
+    assert read_gallery(service) == {"100000001": 3}
+    assert connections[-1].statements == ["DELETE FROM trained_soldiers WHERE force_id IN (%s)"]
+    with pytest.raises(ValueError):
+        service.delete_soldier("100000002")
+    assert sorted(os.listdir(service.model_dir)) == ["face_recognition_model.lock", "face_recognition_model.pkl"]
+
+
+def test_failed_commit_restores_the_previous_model(gallery):
+    service, _, options = gallery
+    service.add_soldier("100000001")
+
+    options["fail_commit"] = True
+    with pytest.raises(RuntimeError):
+        service.add_soldier("100000002")
+    assert read_gallery(service) == {"100000001": 3}
+    assert sorted(os.listdir(service.model_dir)) == ["face_recognition_model.lock", "face_recognition_model.pkl"]
+
+
+def test_retrain_and_delete_routes_queue_jobs(tmp_path, monkeypatch):
+    flask = pytest.importorskip("flask")
+    from api.image import routes
+    from services.job_queue import JobQueue
+
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    monkeypatch.setattr(routes, "get_job_queue", lambda: queue)
+    app = flask.Flask(__name__)
+    app.register_blueprint(routes.image_bp, url_prefix="/api/image")
+    client = app.test_client()
+
+    response = client.post("/api/image/soldiers/100000001/retrain")
+    assert response.status_code == 202
+    assert queue.get(response.get_json()["job_id"])["job_type"] == "replace_soldier"
+
+    response = client.delete("/api/image/soldiers/100000001")
+    assert response.status_code == 202
+    job = queue.get(response.get_json()["job_id"])
+    assert job["job_type"] == "delete_soldier" and job["payload"] == {"force_id": "100000001"}
+
+    assert client.delete("/api/image/soldiers/abc").status_code == 400
+
+
+def test_service_without_a_gallery_file_skips_the_reload_check():
+    pytest.importorskip("keras")
+    from services.emotion_detection_service import EmotionDetectionService
+
+    class InMemoryService(EmotionDetectionService):
+        """Like benchmarks/vision_pipeline.py: models set directly, no gallery on disk"""
+
+        def _load_models(self):
+            self.known_face_encodings, self.known_force_ids = [], []
+
+    assert InMemoryService().reload_gallery_if_changed() is False
@@ -0,0 +1,81 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from services.frame_bus import STATE_STOPPED, SharedFrameRing
+
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing.create((4, 6, 3), slots=3)
+    yield ring
+    ring.close()
+    ring.unlink()
+
+
+def frame(value):
+    return np.full((4, 6, 3), value, dtype=np.uint8)
+
+
+def test_latest_returns_newest_frame_once(ring):
+    assert ring.latest() is None
+    ring.publish(frame(1), timestamp=10.0)
+    ring.publish(frame(2), timestamp=11.0)
+
+    latest = ring.latest()
+    assert (latest.seq, latest.timestamp) == (2, 11.0)
+    assert (latest.image == 2).all()
+    assert ring.latest(after=latest.seq) is None
+
+
+def test_attached_reader_sees_frames_without_copy(ring):
+    reader = SharedFrameRing.attach(ring.name)
+    try:
+        assert (reader.shape, reader.slots) == ((4, 6, 3), 3)
+        ring.publish(frame(7))
+        view = reader.latest()
+        copied = reader.latest(copy=True)
+        assert (view.image == 7).all()
+
+        # Lapping the slot invalidates the view but not the copy
+        for value in range(3):
+            ring.publish(frame(value))
+        assert not reader.is_valid(view)
+        assert (view.image == 2).all()
+        assert (copied.image == 7).all()
+        del view
+    finally:
+        reader.close()
+
+
+def test_publish_rejects_other_shapes(ring):
+    with pytest.raises(ValueError):
+        ring.publish(np.zeros((720, 1280, 3), dtype=np.uint8))
+
+
+def test_frames_cross_process_boundary():
+    from benchmarks.frame_bus import produce_ring
+    from services.frame_bus import FRAME_SHAPE
+
+    context = multiprocessing.get_context('spawn')
+    ring = SharedFrameRing.create(FRAME_SHAPE, slots=4)
+    results = context.Queue()
+    producer = context.Process(target=produce_ring, args=(ring.name, results, 30, 0.3))
+    try:
+        producer.start()
+        seqs = []
+        last_seq = 0
+        while True:
+            received = ring.wait(last_seq, timeout=30)
+            if received is None:
+                break
+            seqs.append(received.seq)
+            last_seq = received.seq
+        stats = results.get(timeout=30)
+        producer.join(30)
+        assert ring.state == STATE_STOPPED
+        assert seqs == sorted(seqs) and seqs[-1] == stats['published']
+    finally:
+        ring.close()
+        ring.unlink()
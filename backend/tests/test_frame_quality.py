@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+
+from services.frame_quality import FrameQuality, PoseFrameSelector, difference_hash, hamming_distance
+
+
+def quality(score, phash):
+    return FrameQuality(blur=100.0, face_box=(0, 0, 10, 10), face_fraction=0.1, phash=phash, score=score)
+
+
+def test_difference_hash_tracks_image_content():
+    gradient = np.tile(np.arange(0, 180, 2, dtype=np.uint8), (80, 1))
+    assert difference_hash(gradient) == 2 ** 64 - 1
+    assert difference_hash(gradient[:, ::-1]) == 0
+
+    rng = np.random.default_rng(0)
+    noisy = np.clip(gradient + rng.integers(-1, 2, gradient.shape), 0, 255).astype(np.uint8)
+    assert hamming_distance(difference_hash(gradient), difference_hash(noisy)) <= 6
+
+
+def test_selector_keeps_best_distinct_frames_in_capture_order():
+    selector = PoseFrameSelector(keep=2, max_hash_distance=6)
+    assert selector.offer("a", quality(1.0, 0x0))
+    # Near-duplicate of "a": only replaces it when sharper
+    assert not selector.offer("a-dup", quality(0.5, 0x1))
+    assert selector.offer("a-better", quality(2.0, 0x3))
+    assert selector.offer("b", quality(1.5, 0xFFFF))
+    # Distinct but worse than everything kept
+    assert not selector.offer("c", quality(0.1, 0xFFFF0000))
+    # Distinct and better than the worst kept frame ("b")
+    assert selector.offer("d", quality(3.0, 0xFFFF00000000))
+
+    assert [frame for frame, _ in selector.selected()] == ["a-better", "d"]
+    assert len(selector) == 2
+
+
+def test_selector_without_hashes_keeps_the_first_frames():
+    selector = PoseFrameSelector(keep=2, max_hash_distance=-1)
+    for name in ("a", "b", "c"):
+        selector.offer(name, quality(0.0, 0))
+    assert [frame for frame, _ in selector.selected()] == ["a", "b"]
@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from services import job_queue
+from services.job_queue import JobQueue, JobWorkerPool
+
+
+def _echo(payload, report_progress):
+    report_progress(0.5, "halfway")
+    return {"echo": payload["value"]}
+
+
+def _boom(payload, report_progress):
+    raise ValueError("camera unplugged")
+
+
+HANDLERS = {"echo": _echo, "boom": _boom}
+
+
+def wait_for(queue, job_id, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_jobs_run_in_worker_processes(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    queue = JobQueue(db_path)
+    ok_id = queue.enqueue("echo", {"value": 42})
+    bad_id = queue.enqueue("boom")
+    assert queue.get(ok_id)["status"] == "queued"
+
+    pool = JobWorkerPool(db_path, concurrency=2, handlers=HANDLERS, poll_interval=0.05)
+    pool.start()
+    try:
+        ok = wait_for(queue, ok_id)
+        bad = wait_for(queue, bad_id)
+    finally:
+        pool.stop()
+
+    assert ok["status"] == "completed" and ok["result"] == {"echo": 42} and ok["progress"] == 1
+    assert bad["status"] == "failed" and bad["error"] == "camera unplugged"
+
+
+def test_interrupted_jobs_are_requeued_until_attempts_run_out(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    retry_id = queue.enqueue("echo", {"value": 1}, max_attempts=2)
+    once_id = queue.enqueue("echo", {"value": 2})
+    assert queue.claim("dead-worker")["job_id"] == retry_id
+    assert queue.claim("dead-worker")["job_id"] == once_id
+
+    assert queue.requeue_stale(heartbeat_timeout=-1) == 1
+    assert queue.get(retry_id)["status"] == "queued"
+    assert queue.get(once_id)["status"] == "failed"
+
+
+def test_cancelled_image_collection_fails_the_job(monkeypatch):
+    image_collection = pytest.importorskip("services.image_collection")
+
+    class CancelledCollection:
+        def collect_images(self, force_id, progress_callback=None):
+            return None  # What collect_images returns when the operator presses 'q'
+
+    monkeypatch.setattr(image_collection, "ImageCollectionService", CancelledCollection)
+    with pytest.raises(Exception, match="cancelled"):
+        job_queue._collect_images({"force_id": "100000001"}, lambda progress, message=None: None)
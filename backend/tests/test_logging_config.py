@@ -0,0 +1,46 @@
+import logging
+
+from utils import logging_config
+from utils.logging_config import LogRateLimiter, parse_levels, setup_logging, stop_logging
+
+
+def test_parse_levels():
+    assert parse_levels('services.cctv_monitoring_service=debug, urllib3=ERROR') == {
+        'services.cctv_monitoring_service': logging.DEBUG,
+        'urllib3': logging.ERROR
+    }
+    assert parse_levels(None) == {}
+
+
+def test_rate_limiter_per_key(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(logging_config.time, 'monotonic', lambda: now[0])
+    limiter = LogRateLimiter(interval=5.0)
+    assert limiter.allow('a')
+    assert not limiter.allow('a')
+    assert limiter.allow('b')
+    now[0] += 5.0
+    assert limiter.allow('a')
+
+
+def test_records_reach_component_file(tmp_path):
+    root = logging.getLogger()
+    saved_handlers, saved_level = list(root.handlers), root.level
+    try:
+        setup_logging(level='INFO', log_dir=str(tmp_path), module_levels='services.scheduler_service=DEBUG',
+                      console=False)
+        logging.getLogger('services.scheduler_service').debug("scheduled %s", 'job')
+        logging.getLogger('services.job_queue').info("queued")
+        stop_logging()
+        assert 'scheduled job' in (tmp_path / 'scheduler.log').read_text()
+        assert 'queued' not in (tmp_path / 'scheduler.log').read_text()
+        app_log = (tmp_path / 'app.log').read_text()
+        assert 'scheduled job' in app_log and 'queued' in app_log
+    finally:
+        stop_logging()
+        logging.getLogger('services.scheduler_service').setLevel(logging.NOTSET)
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        for handler in saved_handlers:
+            root.addHandler(handler)
+        root.setLevel(saved_level)
@@ -0,0 +1,94 @@
+import socket
+
+import pytest
+
+from services.event_stream import get_event_broker
+from services import monitoring_control
+from services.monitoring_control import MonitoringControlClient, MonitoringControlServer
+
+
+class FakeMonitoringService:
+    def __init__(self):
+        self.is_monitoring = False
+        self.monitoring_id = None
+
+    def start_monitoring(self, date):
+        if self.is_monitoring:
+            raise Exception("Monitoring is already running")
+        self.is_monitoring = True
+        self.monitoring_id = 1
+        return True
+
+    def stop_monitoring(self):
+        self.is_monitoring = False
+        return True
+
+    def calculate_daily_scores(self, date):
+        return True
+
+    def process_frame(self):
+        return {"force_id": "100000001", "emotion": "Neutral", "score": 0.0}
+
+    def status(self):
+        return {"is_monitoring": self.is_monitoring, "monitoring_id": self.monitoring_id}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def control():
+    service = FakeMonitoringService()
+    address = ("127.0.0.1", free_port())
+    server = MonitoringControlServer(service, address, b"test-key")
+    server.start()
+    yield service, MonitoringControlClient(address, b"test-key")
+    server.stop()
+
+
+def test_commands_are_forwarded(control):
+    service, client = control
+    assert client.start_monitoring("2025-05-12") is True
+    assert service.is_monitoring
+    assert client.status() == {"is_monitoring": True, "monitoring_id": 1}
+    assert client.process_frame()["force_id"] == "100000001"
+    assert client.stop_monitoring() is True
+
+
+def test_errors_are_raised_in_the_client(control):
+    _, client = control
+    client.start_monitoring("2025-05-12")
+    with pytest.raises(Exception, match="already running"):
+        client.start_monitoring("2025-05-12")
+
+
+def test_event_batches_are_relayed(control, monkeypatch):
+    monkeypatch.setattr(monitoring_control, 'EVENT_KEEPALIVE', 0.05)
+    _, client = control
+    events = client.subscribe_events()
+    broker = get_event_broker()
+    frame = None
+    for _ in range(100):  # Until the server has registered the subscription
+        broker.publish('monitoring', {'status': 'started'})
+        broker.flush()
+        frame = next(events)
+        if frame is not None:
+            break
+    events.close()
+    assert frame.startswith(b'id: ') and b'"status":"started"' in frame
+
+
+def test_control_channel_requires_an_authkey_and_defaults_to_the_worker(monkeypatch):
+    monkeypatch.delenv("MONITORING_CONTROL_AUTHKEY", raising=False)
+    monkeypatch.delenv("MONITORING_CONTROL_ADDRESS", raising=False)
+    monkeypatch.setattr(monitoring_control, "_controller", None)
+    with pytest.raises(RuntimeError):
+        monitoring_control.get_monitoring_controller()
+
+    monkeypatch.setenv("MONITORING_CONTROL_AUTHKEY", "test-key")
+    controller = monitoring_control.get_monitoring_controller()
+    assert isinstance(controller, MonitoringControlClient)
+    assert controller.address == ("127.0.0.1", 6001)
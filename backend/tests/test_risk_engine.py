@@ -0,0 +1,54 @@
+import math
+from datetime import date
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("mysql.connector")
+
+from services.risk_engine import iso_year_week, normalize_cctv, score_weeks
+
+
+def test_iso_year_week_uses_iso_years():
+    assert iso_year_week(date(2025, 10, 15)) == 202542
+    # 2024-12-30 belongs to ISO week 1 of 2025
+    assert iso_year_week(date(2024, 12, 30)) == 202501
+
+
+def test_score_weeks_weights_present_scores_only():
+    nan = float('nan')
+    questionnaire = np.array([0.2, 0.9, nan, nan, 0.5])
+    # emotion_mapping scale; rescaled to 0.3, 0.8 and 0.75
+    cctv = np.array([0.2, 2.2, 2.0, nan, nan])
+    combined, levels = score_weeks(questionnaire, cctv)
+
+    assert combined[0] == pytest.approx(0.6 * 0.2 + 0.4 * 0.3)
+    assert combined[1] == pytest.approx(0.6 * 0.9 + 0.4 * 0.8)
+    assert combined[2] == pytest.approx(0.75)
+    assert math.isnan(combined[3])
+    assert combined[4] == pytest.approx(0.5)
+    assert list(levels) == ['low', 'critical', 'high', None, 'medium']
+
+
+def test_score_weeks_threshold_boundaries():
+    scores = np.array([0.0, 0.4, 0.7, 0.85, 1.0])
+    _, levels = score_weeks(scores, np.full(5, np.nan))
+    assert list(levels) == ['low', 'medium', 'high', 'critical', 'critical']
+
+
+def test_score_weeks_rescales_real_range_cctv_scores():
+    # Weekly CCTV averages as stored: Happy = -1 ... Sad = 3
+    cctv = np.array([-1.0, -0.6, 0.0, 1.0, 3.0])
+    assert list(normalize_cctv(cctv)) == pytest.approx([0.0, 0.1, 0.25, 0.5, 1.0])
+
+    questionnaire = np.full(5, 0.2)
+    combined, levels = score_weeks(questionnaire, cctv)
+    # Mostly happy detections never push the combined score below zero
+    assert combined.min() >= 0
+    assert combined[0] == pytest.approx(0.12)
+    # A sad week alone is not enough for high risk when the survey is fine
+    assert combined[4] == pytest.approx(0.6 * 0.2 + 0.4 * 1.0)
+    assert list(levels) == ['low', 'low', 'low', 'low', 'medium']
+
+    _, levels = score_weeks(np.full(2, np.nan), np.array([1.0, 2.5]))
+    assert list(levels) == ['medium', 'critical']
@@ -0,0 +1,85 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from services.roi_face_detector import RoiFaceDetector, load_face_cascade
+
+
+class FakeCascade:
+    """Reports fixed faces that lie fully inside the scanned image"""
+
+    def __init__(self, faces):
+        self.faces = faces
+        self.calls = []
+
+    def detectMultiScale(self, gray, scaleFactor, minNeighbors, minSize, maxSize=None):
+        self.calls.append((gray.shape, minSize, maxSize))
+        return self.faces_in(gray)
+
+    def faces_in(self, gray):
+        # Callers pass views; recover the view's offset from the base frame
+        base = gray.base if gray.base is not None else gray
+        offset = (gray.__array_interface__['data'][0] - base.__array_interface__['data'][0])
+        oy, ox = divmod(offset, base.shape[1])
+        h, w = gray.shape
+        return [
+            (x - ox, y - oy, fw, fh) for x, y, fw, fh in self.faces
+            if x >= ox and y >= oy and x + fw <= ox + w and y + fh <= oy + h
+        ]
+
+
+def frame():
+    return np.zeros((720, 1280), dtype=np.uint8)
+
+
+def test_scans_full_frame_only_periodically():
+    cascade = FakeCascade([(100, 100, 80, 80), (900, 300, 120, 120)])
+    detector = RoiFaceDetector(cascade, full_scan_interval=5)
+    gray = frame()
+
+    for _ in range(10):
+        faces = detector.detect(gray)
+        assert sorted(faces) == [(100, 100, 80, 80), (900, 300, 120, 120)]
+
+    assert detector.full_scans == 2
+    assert detector.roi_scans == 8
+    roi_shapes = [shape for shape, _, _ in cascade.calls if shape != gray.shape]
+    assert roi_shapes and all(h * w < 0.1 * 720 * 1280 for h, w in roi_shapes)
+
+
+def test_lost_faces_trigger_a_full_scan():
+    cascade = FakeCascade([(100, 100, 80, 80)])
+    detector = RoiFaceDetector(cascade, full_scan_interval=100, max_misses=2)
+    gray = frame()
+    detector.detect(gray)
+
+    cascade.faces = []
+    assert detector.detect(gray) == []
+    assert detector.detect(gray) == []  # Second miss drops the track
+    cascade.faces = [(600, 400, 90, 90)]
+    assert detector.detect(gray) == [(600, 400, 90, 90)]
+    assert detector.full_scans == 2
+
+
+def test_interval_one_is_plain_full_frame_detection():
+    cascade = FakeCascade([(100, 100, 80, 80)])
+    detector = RoiFaceDetector(cascade, full_scan_interval=1, min_face_size=(40, 40), max_face_size=(300, 300))
+    for _ in range(3):
+        detector.detect(frame())
+    assert detector.full_scans == 3
+    assert all(call == ((720, 1280), (40, 40), (300, 300)) for call in cascade.calls)
+
+
+def test_face_cascade_loads_from_any_working_directory(tmp_path, monkeypatch):
+    pytest.importorskip("cv2")
+    face_recognition = pytest.importorskip("face_recognition")
+    from services.face_recognition_service import FaceRecognitionService
+
+    image = face_recognition.load_image_file("tests/test_images/test_soldier_100000005.jpg")
+    monkeypatch.chdir(tmp_path)
+    assert not load_face_cascade().empty()
+    with pytest.raises(IOError):
+        load_face_cascade(str(tmp_path / "missing.xml"))
+
+    locations = FaceRecognitionService(detector="haar", detection_scale=0.5).locate_face(image)
+    assert len(locations) == 1
@@ -0,0 +1,100 @@
+from datetime import date
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+import benchmarks.synthetic_data as synthetic_data
+
+
+class RecordingCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.lastrowid = 1
+        self.rowcount = 0
+        self._result = (1,)
+
+    def execute(self, query, params=None):
+        self.conn.statements.append((query, params))
+        if "FROM system_settings" in query:
+            self._result = ('true',) if self.conn.marked else None
+        elif "COUNT(*) FROM users" in query:
+            self._result = (self.conn.users,)
+        else:
+            self._result = (1,)
+
+    def executemany(self, query, rows):
+        table = query.split()[2]
+        self.conn.rows.setdefault(table, []).extend(rows)
+
+    def fetchone(self):
+        return self._result
+
+    def close(self):
+        pass
+
+
+class RecordingConnection:
+    def __init__(self, marked=True, users=0):
+        self.rows = {}
+        self.statements = []
+        self.marked = marked
+        self.users = users
+
+    def cursor(self):
+        return RecordingCursor(self)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def generate(monkeypatch, **kwargs):
+    conn = RecordingConnection()
+    monkeypatch.setattr(synthetic_data, 'get_connection', lambda **options: conn)
+    params = dict(soldiers=5, weeks=2, questions=3, detections_per_day=4, end_date=date(2025, 10, 19))
+    params.update(kwargs)
+    stats = synthetic_data.SyntheticDataGenerator(batch_size=7, **params).generate()
+    return conn.rows, {s['table']: s['rows'] for s in stats}
+
+
+def test_generation_is_deterministic(monkeypatch):
+    first, _ = generate(monkeypatch)
+    second, _ = generate(monkeypatch)
+    assert first == second
+    different, _ = generate(monkeypatch, seed=7)
+    assert different['cctv_detections'] != first['cctv_detections']
+
+
+def test_row_counts_follow_parameters(monkeypatch):
+    rows, counts = generate(monkeypatch)
+    assert counts['users'] == 6  # admin + soldiers
+    assert counts['questions'] == 3
+    assert counts['weekly_sessions'] == 5 * 2
+    completed = sum(1 for row in rows['weekly_sessions'] if row[6] == 'completed')
+    assert counts['question_responses'] == completed * 3
+    assert counts['cctv_daily_monitoring'] == 14
+    assert counts['cctv_detections'] == 5 * 14 * 4
+    assert all(len(row[1]) == 9 and row[1].isdigit() for row in rows['cctv_detections'])
+    # emotion_mapping scale, like production detections
+    assert all(-1.0 <= row[3] <= 3.0 for row in rows['cctv_detections'])
+    assert all(0.0 <= row[7] <= 1.0 for row in rows['weekly_sessions'] if row[7] is not None)
+
+
+def test_refuses_databases_not_marked_for_benchmarks(monkeypatch):
+    conn = RecordingConnection(marked=False, users=3)
+    monkeypatch.setattr(synthetic_data, 'get_connection', lambda **options: conn)
+    generator = synthetic_data.SyntheticDataGenerator(soldiers=2, weeks=1)
+    with pytest.raises(Exception, match="not marked as a benchmark database"):
+        generator.clear()
+    with pytest.raises(Exception, match="not marked as a benchmark database"):
+        generator.generate()
+    assert not any(query.lstrip().startswith("DELETE") for query, _ in conn.statements)
+
+    # An empty database is claimed for benchmarks on first use
+    conn = RecordingConnection(marked=False, users=0)
+    monkeypatch.setattr(synthetic_data, 'get_connection', lambda **options: conn)
+    generator.clear()
+    assert any("INSERT INTO system_settings" in query for query, _ in conn.statements)
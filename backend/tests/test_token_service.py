@@ -0,0 +1,109 @@
+import pytest
+
+jwt = pytest.importorskip("jwt")
+
+from services.token_service import TokenService
+
+
+def test_access_token_round_trip():
+    service = TokenService(secret_key="test-secret")
+    tokens = service.issue_tokens("100000001", "soldier")
+    claims = service.verify(tokens["access_token"])
+    assert claims["sub"] == "100000001"
+    assert claims["role"] == "soldier"
+
+
+def test_refresh_token_is_single_use():
+    service = TokenService(secret_key="test-secret")
+    tokens = service.issue_tokens("100000001", "soldier")
+
+    with pytest.raises(jwt.InvalidTokenError):
+        service.verify(tokens["refresh_token"])
+
+    refreshed = service.refresh(tokens["refresh_token"])
+    assert service.verify(refreshed["access_token"])["sub"] == "100000001"
+    with pytest.raises(jwt.InvalidTokenError):
+        service.refresh(tokens["refresh_token"])
+
+
+def test_revoked_and_expired_tokens_are_rejected():
+    service = TokenService(secret_key="test-secret", access_ttl=-1)
+    with pytest.raises(jwt.ExpiredSignatureError):
+        service.verify(service.issue_tokens("200000001", "admin")["access_token"])
+
+    service = TokenService(secret_key="test-secret")
+    token = service.issue_tokens("200000001", "admin")["access_token"]
+    service.revoke(service.verify(token))
+    with pytest.raises(jwt.InvalidTokenError):
+        service.verify(token)
+
+
+class MemoryRevocationStore:
+    """Stands in for the revoked_tokens table shared by several workers"""
+
+    def __init__(self):
+        self.rows = {}
+        self.now = 1000.0
+
+    def add(self, jti, exp):
+        if jti in self.rows:
+            return False
+        self.rows[jti] = (exp, self.now)
+        return True
+
+    def revoked_since(self, since):
+        return {jti: exp for jti, (exp, at) in self.rows.items() if since is None or at >= since}, self.now
+
+    def prune(self):
+        pass
+
+
+def test_revocations_are_shared_between_workers():
+    store = MemoryRevocationStore()
+    first = TokenService(secret_key="test-secret", revocation_store=store, sync_interval=0)
+    second = TokenService(secret_key="test-secret", revocation_store=store, sync_interval=0)
+
+    tokens = first.issue_tokens("100000001", "soldier")
+    second.verify(tokens["access_token"])
+    first.revoke(first.verify(tokens["access_token"]))
+    with pytest.raises(jwt.InvalidTokenError):
+        second.verify(tokens["access_token"])
+
+    first.refresh(tokens["refresh_token"])
+    with pytest.raises(jwt.InvalidTokenError):
+        second.refresh(tokens["refresh_token"])
+
+
+class FailingRevocationStore(MemoryRevocationStore):
+    def __init__(self):
+        super().__init__()
+        self.down = True
+
+    def add(self, jti, exp):
+        if self.down:
+            raise ConnectionError("MySQL server has gone away")
+        return super().add(jti, exp)
+
+
+def test_refresh_route_returns_503_while_the_store_is_down(monkeypatch):
+    flask = pytest.importorskip("flask")
+    pytest.importorskip("bcrypt")
+    from api.auth import routes
+
+    store = FailingRevocationStore()
+    service = TokenService(secret_key="test-secret", revocation_store=store, sync_interval=0)
+    monkeypatch.setattr(routes, "get_token_service", lambda: service)
+    app = flask.Flask(__name__)
+    app.register_blueprint(routes.auth_bp, url_prefix="/api/auth")
+    client = app.test_client()
+    refresh_token = service.issue_tokens("100000001", "soldier")["refresh_token"]
+
+    response = client.post("/api/auth/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 503 and response.headers["Retry-After"] == "1"
+
+    # The failed attempt did not use up the token
+    store.down = False
+    response = client.post("/api/auth/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 200
+    response = client.post("/api/auth/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 401
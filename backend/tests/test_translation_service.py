@@ -0,0 +1,32 @@
+from services.translation_service import (
+    LocalTranslationBackend,
+    TranslationMemory,
+    TranslationService,
+)
+
+
+def make_service(tmp_path, translations=None):
+    backend = LocalTranslationBackend(translations)
+    memory = TranslationMemory(str(tmp_path / "translation_memory.sqlite3"), lru_size=2)
+    return TranslationService(backend=backend, memory=memory), backend
+
+
+def test_batch_sends_only_misses(tmp_path):
+    service, backend = make_service(tmp_path, {("en", "hi", "Are you sleeping well?"): "क्या आप अच्छी नींद ले रहे हैं?"})
+
+    first = service.translate_batch(["Are you sleeping well?", "Hello", "Are you  sleeping well? "], "en", "hi")
+    assert first[0] == first[2] == "क्या आप अच्छी नींद ले रहे हैं?"
+    assert backend.calls == [(["Are you sleeping well?", "Hello"], "en", "hi")]
+
+    service.translate_batch(["Hello", "Are you sleeping well?"], "en", "hi")
+    assert len(backend.calls) == 1
+
+
+def test_translations_persist_across_instances(tmp_path):
+    service, _ = make_service(tmp_path, {("hi", "en", "नमस्ते"): "Hello"})
+    assert service.translate("नमस्ते", "hi", "en") == "Hello"
+    service.memory.close()
+
+    reopened, backend = make_service(tmp_path)
+    assert reopened.translate("नमस्ते", "hi", "en") == "Hello"
+    assert backend.calls == []
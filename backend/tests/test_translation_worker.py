@@ -0,0 +1,126 @@
+import concurrent.futures
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services.translation_service import HttpTranslationBackend, TranslationMemory, TranslationService
+from services.translation_worker import TranslationWorker
+
+
+class FakeTranslationServer:
+    """Local LibreTranslate-style server that upper-cases texts after a delay"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                server.requests.append(body)
+                time.sleep(server.delay)
+                payload = json.dumps({'translatedText': [q.upper() for q in body['q']]}).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def make_worker(tmp_path):
+    created = []
+
+    def factory(delay=0.0, timeout=5.0, max_concurrency=4):
+        server = FakeTranslationServer(delay)
+        service = TranslationService(
+            backend=HttpTranslationBackend(server.url),
+            memory=TranslationMemory(str(tmp_path / f"memory_{len(created)}.sqlite3"))
+        )
+        worker = TranslationWorker(service, max_concurrency=max_concurrency, timeout=timeout)
+        created.append((server, worker))
+        return server, worker
+
+    yield factory
+    for server, worker in created:
+        worker.stop()
+        server.close()
+
+
+def test_identical_in_flight_requests_are_coalesced(make_worker):
+    server, worker = make_worker(delay=0.2)
+    futures = [worker.submit("how do you feel today?", "en", "hi") for _ in range(10)]
+    assert [f.result(timeout=5) for f in futures] == ["HOW DO YOU FEEL TODAY?"] * 10
+    assert len(server.requests) == 1
+
+
+def test_concurrency_limit(make_worker):
+    server, worker = make_worker(delay=0.2, max_concurrency=2)
+    start = time.monotonic()
+    futures = [worker.submit(f"question {i}", "en", "hi") for i in range(4)]
+    for f in futures:
+        f.result(timeout=5)
+    # Four distinct texts with two slots take at least two rounds
+    assert time.monotonic() - start >= 0.4
+    assert len(server.requests) == 4
+
+
+def test_timeout(make_worker):
+    _, worker = make_worker(delay=1.0, timeout=0.2)
+    with pytest.raises(concurrent.futures.TimeoutError):
+        worker.translate("slow text", "en", "hi")
+
+
+class SlowService:
+    """Backend stand-in that records how many calls run at once"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def translate(self, text, src, dest):
+        with self.lock:
+            self.running += 1
+            self.calls += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+        return text.upper()
+
+
+def test_timed_out_calls_keep_their_slot_until_the_backend_returns():
+    service = SlowService(delay=0.5)
+    worker = TranslationWorker(service, max_concurrency=2, timeout=0.1)
+    try:
+        futures = [worker.submit(f"question {i}", "en", "hi") for i in range(6)]
+        for f in futures:
+            with pytest.raises(concurrent.futures.TimeoutError):
+                f.result(timeout=5)
+        time.sleep(0.1)
+        assert service.peak <= 2
+        assert service.running == 2 and worker._semaphore.locked()
+
+        time.sleep(0.6)
+        assert service.running == 0 and not worker._semaphore.locked()
+        assert service.calls == 6
+    finally:
+        worker.stop()
@@ -1,5 +1,9 @@
+import logging
+
 import bcrypt
 
+logger = logging.getLogger(__name__)
+
 def check_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify if a plain password matches its hashed version
@@ -12,21 +16,29 @@ def check_password(plain_password: str, hashed_password: str) -> bool:
         bool: True if password matches, False otherwise
     """
     try:
-        print(f"🔐 Checking password...")  # Debug log
-        
         # Convert strings to bytes for bcrypt
         if isinstance(plain_password, str):
             plain_password = plain_password.encode('utf-8')
         if isinstance(hashed_password, str):
             hashed_password = hashed_password.encode('utf-8')
-        
-        print(f"Plain password (bytes): {plain_password}")  # Debug log
-        print(f"Hashed password (bytes): {hashed_password}")  # Debug log
             
-        result = bcrypt.checkpw(plain_password, hashed_password)
-        print(f"Password check result: {result}")  # Debug log
-        return result
+        return bcrypt.checkpw(plain_password, hashed_password)
         
     except Exception as e:
-        print(f"❌ Error checking password: {str(e)}")  # Debug log
+        logger.error(f"Error checking password: {e}")
         return False
+
+def hash_password(plain_password: str, rounds: int = 12) -> str:
+    """
+    Hash a plain password with a fresh bcrypt salt
+    
+    Args:
+        plain_password (str): The password to hash
+        rounds (int): bcrypt cost factor
+        
+    Returns:
+        str: The hashed password, ready to store in MySQL
+    """
+    if isinstance(plain_password, str):
+        plain_password = plain_password.encode('utf-8')
+    return bcrypt.hashpw(plain_password, bcrypt.gensalt(rounds)).decode('utf-8')
@@ -0,0 +1,148 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from typing import Dict, Optional
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Logger name prefix -> file it is written to (in addition to app.log)
+LOG_FILES = {
+    'services.cctv_monitoring_service': 'cctv_monitoring.log',
+    'services.emotion_detection_service': 'emotion_detection.log',
+    'services.roi_face_detector': 'emotion_detection.log',
+    'services.scheduler_service': 'scheduler.log',
+    'services.face_recognition_service': 'face_recognition_training.log',
+}
+
+# Chatty third-party loggers kept out of the application logs unless raised explicitly
+QUIET_LOGGERS = {
+    'apscheduler': logging.WARNING,
+    'h2': logging.WARNING,
+    'hpack': logging.WARNING,
+    'httpcore': logging.WARNING,
+    'httpx': logging.WARNING,
+    'urllib3': logging.WARNING,
+    'tensorflow': logging.WARNING,
+    'werkzeug': logging.INFO,
+}
+
+_lock = threading.Lock()
+_listener = None
+_pid = None
+_config = None
+
+
+class _PrefixFilter(logging.Filter):
+    """Passes records from any of the given logger name prefixes"""
+
+    def __init__(self, prefixes):
+        super().__init__()
+        self.prefixes = tuple(prefixes)
+
+    def filter(self, record):
+        return any(record.name == p or record.name.startswith(p + '.') for p in self.prefixes)
+
+
+def parse_levels(spec: Optional[str]) -> Dict[str, int]:
+    """'services.cctv_monitoring_service=DEBUG,urllib3=ERROR' -> {name: level}"""
+    levels = {}
+    for item in (spec or '').split(','):
+        if '=' in item:
+            name, level = item.split('=', 1)
+            levels[name.strip()] = logging.getLevelName(level.strip().upper())
+    return levels
+
+
+def setup_logging(level: Optional[str] = None, log_dir: Optional[str] = None,
+                  module_levels: Optional[str] = None, console: bool = True):
+    """
+    Configure logging once per process.
+
+    Every logger writes into an in-memory queue through a QueueHandler; a
+    QueueListener thread formats the records and does the file and console
+    I/O, so callers (e.g. the frame loop) never block on disk. Records go to
+    app.log and to the component file in LOG_FILES. LOG_LEVEL sets the root
+    level, LOG_LEVELS per-logger levels ('name=LEVEL,...'), LOG_DIR the
+    directory. Calling it again is a no-op, except in a forked child, which
+    gets its own listener.
+    """
+    global _listener, _pid, _config
+    with _lock:
+        if _listener is not None and _pid == os.getpid():
+            return
+        _config = {'level': level, 'log_dir': log_dir, 'module_levels': module_levels, 'console': console}
+        log_dir = log_dir or os.getenv('LOG_DIR', '.')
+        os.makedirs(log_dir, exist_ok=True)
+        formatter = logging.Formatter(LOG_FORMAT)
+
+        handlers = []
+        app_handler = logging.FileHandler(os.path.join(log_dir, 'app.log'), encoding='utf-8', delay=True)
+        handlers.append(app_handler)
+        for filename in sorted(set(LOG_FILES.values())):
+            handler = logging.FileHandler(os.path.join(log_dir, filename), encoding='utf-8', delay=True)
+            handler.addFilter(_PrefixFilter(p for p, f in LOG_FILES.items() if f == filename))
+            handlers.append(handler)
+        if console:
+            handlers.append(logging.StreamHandler())
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue() if hasattr(queue, 'SimpleQueue') else queue.Queue()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        root.setLevel(level or os.getenv('LOG_LEVEL', 'INFO').upper())
+
+        for name, logger_level in {**QUIET_LOGGERS, **parse_levels(module_levels or os.getenv('LOG_LEVELS'))}.items():
+            logging.getLogger(name).setLevel(logger_level)
+
+        # A listener inherited through fork has no running thread in this process
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        _pid = os.getpid()
+        atexit.register(stop_logging)
+
+
+def restart_logging_after_fork():
+    """
+    In a forked child of a process that called setup_logging(), start this
+    process's own listener with the same settings (the inherited one has no
+    thread here). Does nothing otherwise.
+    """
+    if _config is not None and _pid != os.getpid():
+        setup_logging(**_config)
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    with _lock:
+        if _listener is not None and _pid == os.getpid():
+            _listener.stop()
+            _listener = None
+
+
+class LogRateLimiter:
+    """
+    Lets a message through at most once per `interval` seconds per key, for
+    messages emitted on every frame.
+
+        if limiter.allow(force_id):
+            logger.info("Detected soldier %s", force_id)
+    """
+
+    def __init__(self, interval: float = 5.0):
+        self.interval = interval
+        self._last = {}
+
+    def allow(self, key='') -> bool:
+        now = time.monotonic()
+        if now - self._last.get(key, float('-inf')) >= self.interval:
+            self._last[key] = now
+            return True
+        return False
@@ -0,0 +1,70 @@
+"""
+Dedicated background process for the monitoring scheduler, CCTV workers and
+job workers (image collection, model training).
+
+Exactly one instance may run per host (guarded by a lock file). API workers
+reach it through the monitoring control server at MONITORING_CONTROL_ADDRESS.
+
+    python worker.py
+"""
+import logging
+import os
+import signal
+import sys
+import threading
+from services.job_queue import JobWorkerPool, get_job_queue_path
+from services.monitoring_control import MonitoringControlServer, get_authkey, get_control_address
+from utils.file_lock import FileLock
+from utils.logging_config import setup_logging
+
+logger = logging.getLogger(__name__)
+
+LOCK_PATH = os.getenv('WORKER_LOCK_PATH', os.path.join('storage', 'worker.lock'))
+
+
+def main():
+    setup_logging()
+    try:
+        authkey = get_authkey()
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    lock = FileLock(LOCK_PATH)
+    if not lock.acquire(blocking=False):
+        print(f"❌ Another background worker already holds {LOCK_PATH}")
+        sys.exit(1)
+
+    # Fork job workers before TensorFlow is imported by the monitoring service
+    job_workers = JobWorkerPool(get_job_queue_path(), concurrency=int(os.getenv('JOB_CONCURRENCY', 1)))
+    job_workers.start()
+
+    from services.cctv_monitoring_service import CCTVMonitoringService
+    from services.scheduler_service import MonitoringScheduler
+    monitoring_service = CCTVMonitoringService()
+    scheduler = MonitoringScheduler(monitoring_service)
+    control_server = MonitoringControlServer(monitoring_service, get_control_address(), authkey)
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+    control_server.start()
+    scheduler.start()
+    logger.info("Background worker started")
+    print("✅ Background worker running (Ctrl+C to stop)")
+
+    try:
+        while not stop_event.wait(1):
+            pass
+    finally:
+        control_server.stop()
+        scheduler.stop()
+        job_workers.stop()
+        if monitoring_service.is_monitoring:
+            monitoring_service.stop_monitoring()
+        lock.release()
+        logger.info("Background worker stopped")
+
+
+if __name__ == '__main__':
+    main()
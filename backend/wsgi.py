@@ -0,0 +1,23 @@
+"""
+Production WSGI entry point.
+
+API processes created from here are stateless: they never start the
+monitoring scheduler or open a camera. Run the background jobs separately
+with `python worker.py`; the API reaches it at MONITORING_CONTROL_ADDRESS
+(default 127.0.0.1:6001) with MONITORING_CONTROL_AUTHKEY, which both
+processes require.
+
+    gunicorn -c gunicorn.conf.py wsgi:app                 # Linux
+    waitress-serve --port=5000 --threads=8 wsgi:app       # Windows
+"""
+import os
+
+from app_factory import create_app
+from services.monitoring_control import get_authkey
+
+if not os.getenv('JWT_SECRET_KEY'):
+    # A per-process random key would make tokens from one worker invalid on the others
+    raise RuntimeError("JWT_SECRET_KEY must be set for the production server")
+get_authkey()  # Fail at start-up rather than on the first monitoring request
+
+app = create_app()
@@ -1,4 +1,5 @@
 import React, { createContext, useState, useContext, ReactNode } from 'react';
+import { authService } from '../services/authService';
 
 // Define types
 export interface User {
@@ -60,7 +61,7 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
         setUser(null);
         setIsSidebarOpen(false);
         localStorage.removeItem('user');
-        // Additional cleanup if needed
+        authService.logout();
     };
 
     return (
@@ -4,6 +4,27 @@ import { useAuth } from '../../context/AuthContext';
 import { Bars3Icon } from '@heroicons/react/24/outline';
 import axios from 'axios';
 
+interface JobProgress {
+    job_id: number;
+    status: 'queued' | 'running' | 'completed' | 'failed';
+    progress: number;
+    progress_message: string | null;
+    error: string | null;
+}
+
+// Poll a background job until it finishes, reporting progress along the way
+const waitForJob = async (jobId: number, onProgress: (job: JobProgress) => void) => {
+    while (true) {
+        const { data } = await axios.get<JobProgress>(`http://localhost:5000/api/jobs/${jobId}/progress`);
+        onProgress(data);
+        if (data.status === 'completed' || data.status === 'failed') {
+            const { data: job } = await axios.get(`http://localhost:5000/api/jobs/${jobId}`);
+            return job;
+        }
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+    }
+};
+
 const AddSoldier: React.FC = () => {
     const { isSidebarOpen, toggleSidebar } = useAuth();
     const [forceId, setForceId] = useState('');
@@ -52,8 +73,21 @@ Please keep the window focused for key controls to work.`,
             const response = await axios.post('http://localhost:5000/api/image/collect', {
                 force_id: forceId
             });
+            const job = await waitForJob(response.data.job_id, (progress) => {
+                if (progress.status === 'running' && progress.progress_message) {
+                    setMessage({
+                        text: `Collecting images (${Math.round(progress.progress * 100)}%): ${progress.progress_message}`,
+                        type: 'info',
+                    });
+                }
+            });
 
-            if (response.data.folder_path) {
+            if (job.status === 'failed') {
+                setMessage({
+                    text: job.error || 'Failed to collect images. Please try again.',
+                    type: 'error',
+                });
+            } else if (job.result?.folder_path) {
                 setMessage({
                     text: 'Images collected successfully! You can now proceed with adding the soldier.',
                     type: 'success',
@@ -78,10 +112,15 @@ Please keep the window focused for key controls to work.`,
         setIsTraining(true);
         try {
             const response = await axios.post('http://localhost:5000/api/image/train');
-            setMessage({
-                text: 'Model training completed successfully!',
-                type: 'success',
+            const job = await waitForJob(response.data.job_id, (progress) => {
+                setMessage({
+                    text: `Training model (${Math.round(progress.progress * 100)}%)${progress.progress_message ? `: ${progress.progress_message}` : ''}`,
+                    type: 'info',
+                });
             });
+            setMessage(job.status === 'completed'
+                ? { text: job.result?.message || 'Model training completed successfully!', type: 'success' }
+                : { text: job.error || 'Failed to train model. Please try again.', type: 'error' });
         } catch (error: any) {
             setMessage({
                 text: error.response?.data?.error || 'Failed to train model. Please try again.',
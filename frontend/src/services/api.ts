@@ -1,4 +1,5 @@
 import axios from 'axios';
+import { authService } from './authService';
 
 // Translate Hindi answer to English
 export interface TranslateAnswerResponse {
@@ -25,6 +26,32 @@ const api = axios.create({
     },
 });
 
+// Attach the access token to every request
+api.interceptors.request.use((config) => {
+    const token = authService.getAccessToken();
+    if (token) {
+        config.headers.Authorization = `Bearer ${token}`;
+    }
+    return config;
+});
+
+// On an expired access token, refresh once and retry the request
+api.interceptors.response.use(
+    (response) => response,
+    async (error) => {
+        const original = error.config;
+        if (error.response?.status === 401 && original && !original._retried) {
+            original._retried = true;
+            const token = await authService.refresh();
+            if (token) {
+                original.headers.Authorization = `Bearer ${token}`;
+                return api(original);
+            }
+        }
+        return Promise.reject(error);
+    }
+);
+
 export interface SoldierData {
     force_id: string;
     password: string;
@@ -6,6 +6,9 @@ interface LoginResponse {
         role: 'soldier' | 'admin';
     };
     message: string;
+    access_token: string;
+    refresh_token: string;
+    expires_in: number;
 }
 
 class AuthService {
@@ -18,6 +21,8 @@ class AuthService {
                 password: password
             });
             
+            localStorage.setItem('auth_token', response.data.access_token);
+            localStorage.setItem('refresh_token', response.data.refresh_token);
             return response.data;
         } catch (error: any) {
             console.error('Login error:', error.response || error); // Better error logging
@@ -28,9 +33,44 @@ class AuthService {
         }
     }
 
-    logout(): void {
-        // Clear any stored tokens/session data here
+    async refresh(): Promise<string | null> {
+        const refreshToken = localStorage.getItem('refresh_token');
+        if (!refreshToken) {
+            return null;
+        }
+        try {
+            const response = await axios.post<{ access_token: string; refresh_token: string }>(
+                `${this.baseUrl}/refresh`,
+                { refresh_token: refreshToken }
+            );
+            localStorage.setItem('auth_token', response.data.access_token);
+            localStorage.setItem('refresh_token', response.data.refresh_token);
+            return response.data.access_token;
+        } catch (error) {
+            this.clearTokens();
+            return null;
+        }
+    }
+
+    getAccessToken(): string | null {
+        return localStorage.getItem('auth_token');
+    }
+
+    clearTokens(): void {
         localStorage.removeItem('auth_token');
+        localStorage.removeItem('refresh_token');
+    }
+
+    logout(): void {
+        const accessToken = this.getAccessToken();
+        if (accessToken) {
+            // Best effort: revoke tokens server-side, but always clear them locally
+            axios.post(`${this.baseUrl}/logout`,
+                { refresh_token: localStorage.getItem('refresh_token') },
+                { headers: { Authorization: `Bearer ${accessToken}` } }
+            ).catch(() => undefined);
+        }
+        this.clearTokens();
     }
 }
 